@@ -1,36 +1,146 @@
 from flask import Flask
-from werkzeug.middleware.proxy_fix import ProxyFix
-from . import models 
 from config import get_config
 from .extensions import db, migrate, login_manager
-from .blueprints.public.routes import public_bp
-from .blueprints.admin import admin_bp
-from .blueprints.staff import staff_bp
 
 
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(get_config())
 
+    configure_logging(app)
+    configure_tracing(app)
+    configure_templates(app)
+    configure_assets(app)
     register_extensions(app)
+    configure_sessions(app)
     register_blueprints(app)
+    configure_rate_limits(app)
+    register_commands(app)
     apply_middlewares(app)
 
     return app
 
 
+# Blueprints, services, forms and middleware are imported inside the register_*
+# helpers so that `import app` stays cheap for tooling that never builds the
+# app (gunicorn.conf.py, one-off scripts).
+
+
+def configure_logging(app: Flask) -> None:
+    from .logging_config import configure_logging as configure_structured_logging
+
+    configure_structured_logging(app)
+
+
+def configure_tracing(app: Flask) -> None:
+    if not app.config["TRACING_ENABLED"]:
+        return
+    from . import repositories, services
+    from .tracing import configure_tracer, instrument_classes, instrument_sql, register_request_tracing
+
+    configure_tracer(app.config)
+    instrument_classes(getattr(services, name) for name in services.__all__)
+    instrument_classes(getattr(repositories, name) for name in repositories.__all__)
+    instrument_sql()
+    register_request_tracing(app)
+
+
+def configure_templates(app: Flask) -> None:
+    from .templating import configure_templates as configure_jinja
+
+    configure_jinja(app)
+
+
+def configure_assets(app: Flask) -> None:
+    from .assets import configure_assets as configure_static_assets
+
+    configure_static_assets(app)
+
+
 def register_extensions(app: Flask) -> None:
+    from . import models  # noqa: F401  registers tables and the user loader
+
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
 
 
+def configure_sessions(app: Flask) -> None:
+    if app.config["SESSION_STORE"] == "cookie":
+        return
+    from datetime import timedelta
+
+    from .sessions import ServerSessionInterface, store_for
+
+    app.session_interface = ServerSessionInterface(
+        store_for(app.config["SESSION_STORE"]),
+        timedelta(hours=app.config["SESSION_IDLE_HOURS"]),
+    )
+
+
 def register_blueprints(app: Flask) -> None:
+    from .blueprints.public import public_bp
+    from .blueprints.admin import admin_bp
+    from .blueprints.staff import staff_bp
+    from .blueprints.api import api_bp
+
     app.register_blueprint(public_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(staff_bp)
+    app.register_blueprint(api_bp)
+
+
+def configure_rate_limits(app: Flask) -> None:
+    if not app.config["RATE_LIMIT_ENABLED"]:
+        return
+    from .rate_limit import RateLimiter, backend_for, parse_rules, register_rate_limits
+
+    backend = backend_for(app.config["RATE_LIMIT_STORAGE"], app.config["RATE_LIMIT_MAX_KEYS"])
+    register_rate_limits(app, RateLimiter(backend, parse_rules(app.config["RATE_LIMITS"])))
+
+
+def register_commands(app: Flask) -> None:
+    from .cli import register_commands as register_cli_commands
+
+    register_cli_commands(app)
 
 
 def apply_middlewares(app: Flask) -> None:
-    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
+    from werkzeug.middleware.proxy_fix import ProxyFix
+
+    from .middleware import CompressionMiddleware, ProfilingMiddleware, StaticFilesMiddleware, TracingMiddleware
 
+    if app.config["PROFILING_ENABLED"]:
+        from .profiling import ProfileStore, get_sampler
+
+        # Innermost, so profiles cover Flask (routing, views, templates, queries) only
+        app.wsgi_app = ProfilingMiddleware(
+            app.wsgi_app,
+            app.url_map,
+            ProfileStore(app.config["PROFILE_DIR"], app.config["PROFILE_KEEP"]),
+            get_sampler(app.config["PROFILE_INTERVAL_MS"] / 1000),
+            app.config["PROFILE_SAMPLE_RATE"],
+            app.config["PROFILE_TOKEN"],
+            app.config["PROFILE_MIN_DURATION_MS"],
+        )
+    if app.config["TRACING_ENABLED"]:
+        from .tracing import get_tracer
+
+        # Inside the static files, so only requests that reach Flask are traced
+        app.wsgi_app = TracingMiddleware(app.wsgi_app, get_tracer())
+    if app.config["STATIC_FILES_MIDDLEWARE"]:
+        app.wsgi_app = StaticFilesMiddleware(
+            app.wsgi_app,
+            app.static_folder,
+            app.static_url_path,
+            app.config["STATIC_MAX_AGE"],
+            autorefresh=app.debug,
+        )
+    if app.config["COMPRESS_RESPONSES"]:
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            app.config["COMPRESS_MIN_SIZE"],
+            app.config["COMPRESS_GZIP_LEVEL"],
+            app.config["COMPRESS_BROTLI_QUALITY"],
+        )
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
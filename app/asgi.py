@@ -0,0 +1,151 @@
+"""Minimal ASGI application serving read-only endpoints on the async engine.
+
+Runs alongside the gunicorn/WSGI app (``uvicorn asgi:app``) for
+high-concurrency reads; every write and every HTML page stays on Flask.
+Responses use the same shapes as the ``/api/v1`` blueprint.
+"""
+import hmac
+import re
+from urllib.parse import parse_qs
+
+from config import get_config
+
+from .async_db import dispose_async_engine
+from .blueprints.api.routes import ASSIGNMENT_FIELDS, INVENTORY_FIELDS
+from .blueprints.api.serialization import dumps, rows_to_dicts
+from .services import AssignmentService, InventoryService
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _param(query: dict, name: str, cast=str, default=None):
+    values = query.get(name)
+    if not values or values[0] == "":
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise HTTPError(400, f"{name} is invalid")
+
+
+def _fields(query: dict, allowed):
+    raw = _param(query, "fields")
+    if not raw:
+        return allowed
+    requested = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPError(400, f"Unknown fields: {', '.join(unknown)}")
+    return ("id", *(name for name in requested if name != "id"))
+
+
+class AsyncReadApp:
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.routes = [
+            (re.compile(r"^/api/v1/inventory/?$"), self.inventory_list),
+            (re.compile(r"^/api/v1/inventory/stats/?$"), self.inventory_stats),
+            (re.compile(r"^/api/v1/staff/(?P<staff_id>\d+)/assignments/?$"), self.staff_assignments),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            if scope["method"] not in ("GET", "HEAD"):
+                raise HTTPError(405, "Method not allowed")
+            handler, params = self._match(scope["path"])
+            self._authenticate(scope)
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            status, payload = 200, await handler(query, **params)
+        except HTTPError as error:
+            status, payload = error.status, {"error": error.message}
+
+        body = dumps(payload)
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"private, no-cache"),
+            ],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b"" if scope["method"] == "HEAD" else body,
+        })
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await dispose_async_engine()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _match(self, path: str):
+        for pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                return handler, {key: int(value) for key, value in match.groupdict().items()}
+        raise HTTPError(404, "Not found")
+
+    def _authenticate(self, scope):
+        headers = dict(scope.get("headers") or [])
+        header = headers.get(b"authorization", b"").decode("latin-1")
+        if header.startswith("Bearer "):
+            token = header[len("Bearer "):].strip()
+            if any(hmac.compare_digest(token, valid) for valid in self.config.API_TOKENS):
+                return
+        raise HTTPError(401, "A valid API token is required.")
+
+    def _page_args(self, query: dict):
+        after_id = _param(query, "after", int)
+        limit = _param(query, "limit", int, self.config.API_PAGE_SIZE)
+        if limit < 1:
+            raise HTTPError(400, "limit must be positive")
+        return after_id, min(limit, self.config.API_MAX_PAGE_SIZE)
+
+    @staticmethod
+    def _page(rows, fields, limit):
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "data": rows_to_dicts(rows, fields),
+            "next_after": rows[-1][0] if has_more else None,
+        }
+
+    async def inventory_list(self, query: dict):
+        fields = _fields(query, INVENTORY_FIELDS)
+        after_id, limit = self._page_args(query)
+        rows = await InventoryService.get_items_page_async(
+            fields, after_id, limit + 1, _param(query, "q")
+        )
+        return self._page(rows, fields, limit)
+
+    async def inventory_stats(self, query: dict):
+        return {"data": await InventoryService.get_stats_async()}
+
+    async def staff_assignments(self, query: dict, staff_id: int):
+        fields = _fields(query, ASSIGNMENT_FIELDS)
+        after_id, limit = self._page_args(query)
+        rows = await AssignmentService.get_assignments_page_async(
+            fields, after_id, limit + 1, _param(query, "status"), staff_id
+        )
+        return self._page(rows, fields, limit)
+
+
+def create_asgi_app(config=None) -> AsyncReadApp:
+    return AsyncReadApp(config)
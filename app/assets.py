@@ -0,0 +1,116 @@
+"""Static asset build: fingerprinted, minified and precompressed copies of app/static
+
+`flask assets build` writes them to ``<static>/dist`` together with a
+``manifest.json``; `configure_assets` then rewrites ``url_for('static', ...)``
+to the fingerprinted names so they can be cached forever.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Dict
+
+from flask import Flask
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+BUILD_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_EXTENSIONS = frozenset({
+    ".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+    ".woff", ".woff2",
+})
+COMPRESSIBLE_EXTENSIONS = frozenset({".css", ".js", ".svg", ".json", ".txt"})
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+# Only after a colon: "a :hover" and "a:hover" are different selectors
+_CSS_COLON = re.compile(r":\s+")
+
+
+def minify_css(source: str) -> str:
+    """Strip comments and insignificant whitespace"""
+    source = _CSS_COMMENT.sub("", source)
+    source = _CSS_SPACE.sub(" ", source)
+    source = _CSS_PUNCTUATION.sub(r"\1", source)
+    source = _CSS_COLON.sub(":", source)
+    return source.replace(";}", "}").strip()
+
+
+def _fingerprinted(relative_path: str, content: bytes) -> str:
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def _write_compressed(path: str, content: bytes) -> None:
+    with open(path + ".gz", "wb") as fh:
+        # mtime=0 keeps the output byte-identical across builds
+        fh.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as fh:
+            fh.write(brotli.compress(content, quality=11))
+
+
+def build_assets(static_folder: str) -> Dict[str, str]:
+    """Rebuild ``<static>/dist`` and return the manifest (source path -> built path)"""
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    shutil.rmtree(build_root, ignore_errors=True)
+
+    manifest = {}
+    for directory, subdirs, files in os.walk(static_folder):
+        if os.path.abspath(directory) == os.path.abspath(static_folder):
+            subdirs[:] = [name for name in subdirs if name != BUILD_DIR]
+        for filename in sorted(files):
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in ASSET_EXTENSIONS:
+                continue
+            source = os.path.join(directory, filename)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            with open(source, "rb") as fh:
+                content = fh.read()
+            if ext == ".css":
+                content = minify_css(content.decode("utf-8")).encode("utf-8")
+
+            built = f"{BUILD_DIR}/{_fingerprinted(relative, content)}"
+            target = os.path.join(static_folder, *built.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as fh:
+                fh.write(content)
+            if ext in COMPRESSIBLE_EXTENSIONS:
+                _write_compressed(target, content)
+            manifest[relative] = built
+
+    os.makedirs(build_root, exist_ok=True)
+    with open(os.path.join(build_root, MANIFEST_NAME), "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(static_folder, BUILD_DIR, MANIFEST_NAME)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def configure_assets(app: Flask) -> None:
+    """Point ``url_for('static', filename=...)`` at the fingerprinted build, when there is one."""
+    manifest = load_manifest(app.static_folder)
+    app.extensions["asset_manifest"] = manifest
+    if not manifest:
+        return
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == "static":
+            filename = values.get("filename")
+            if filename in manifest:
+                values["filename"] = manifest[filename]
@@ -0,0 +1,60 @@
+"""Async SQLAlchemy engine for the optional ASGI read path (see asgi.py).
+
+Kept separate from Flask-SQLAlchemy: the async path has no app context, so it
+builds its own engine from the same ``Config`` and reuses the repositories'
+statement builders.
+"""
+from contextlib import asynccontextmanager
+
+from config import get_config
+
+_ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_engine = None
+_sessionmaker = None
+
+
+def async_database_uri(config=None) -> str:
+    """ASYNC_DATABASE_URI if set, otherwise the sync URI with an async driver."""
+    config = config or get_config()
+    explicit = getattr(config, "ASYNC_DATABASE_URI", None)
+    if explicit:
+        return explicit
+    uri = config.SQLALCHEMY_DATABASE_URI
+    scheme, sep, rest = uri.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def get_async_engine():
+    global _engine, _sessionmaker
+    if _engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        config = get_config()
+        uri = async_database_uri(config)
+        options = dict(getattr(config, "ASYNC_ENGINE_OPTIONS", {}))
+        if not uri.startswith("sqlite"):
+            # SQLite's async dialect uses NullPool, which takes no size.
+            options.setdefault("pool_size", config.ASYNC_POOL_SIZE)
+        _engine = create_async_engine(uri, **options)
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+@asynccontextmanager
+async def async_session():
+    get_async_engine()
+    async with _sessionmaker() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _sessionmaker = None
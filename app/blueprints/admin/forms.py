@@ -2,7 +2,6 @@ from flask_wtf import FlaskForm
 from wtforms import (
     DateField,
     DecimalField,
-    HiddenField,
     IntegerField,
     PasswordField,
     SelectField,
@@ -80,6 +79,11 @@ class InventoryForm(FlaskForm):
         rounding=None,
         validators=[DataRequired(), NumberRange(min=0)],
     )
+    reorder_threshold = IntegerField(
+        "Reorder threshold",
+        validators=[Optional(), NumberRange(min=0)],
+        description="Leave blank to use the category default.",
+    )
     submit = SubmitField("Save item")
 
 
@@ -88,18 +92,17 @@ class DeleteItemForm(FlaskForm):
 
 
 class ApproveRequestForm(FlaskForm):
-    request_id = HiddenField(validators=[DataRequired()])
     item_id = SelectField(
         "Assign inventory",
         coerce=int,
         validators=[DataRequired()],
     )
-    submit = SubmitField("Approve & assign")
 
 
-class RejectRequestForm(FlaskForm):
-    request_id = HiddenField(validators=[DataRequired()])
-    submit = SubmitField("Reject request")
+class QueueActionForm(FlaskForm):
+    # CSRF only: the request or assignment id comes from the URL, so one
+    # instance serves every row of the queue page.
+    pass
 
 
 class ManualAssignmentForm(FlaskForm):
@@ -116,7 +119,16 @@ class ManualAssignmentForm(FlaskForm):
     submit = SubmitField("Assign item")
 
 
-class CompleteReturnForm(FlaskForm):
-    assignment_id = HiddenField(validators=[DataRequired()])
-    submit = SubmitField("Confirm return")
+class ProfileTriggerForm(FlaskForm):
+    endpoint = SelectField("Endpoint", validators=[DataRequired()])
+    minutes = IntegerField(
+        "For (minutes)",
+        default=5,
+        validators=[DataRequired(), NumberRange(min=1, max=120)],
+    )
+    submit = SubmitField("Start profiling")
+
 
+class ProfileActionForm(FlaskForm):
+    # CSRF only: backs the "stop" and "clear" buttons on the profiles page
+    pass
@@ -1,3 +1,5 @@
+import time
+from datetime import date, datetime
 from functools import wraps
 
 from flask import abort, current_app, flash, redirect, render_template, request, url_for
@@ -10,17 +12,26 @@ from ...services import (
     AssignmentService,
     StaffService,
     FeedbackService,
+    ForecastService,
+    ReservationService,
+    MatchingService,
+    StockAlertService,
+    UtilizationService,
+    ValuationService,
 )
+from ...profiling import FORMATS, ProfileStore, render, summarize
+from ...templating import stream_page
 from . import admin_bp
 from .forms import (
     AdminLoginForm,
     AdminRegisterForm,
     ApproveRequestForm,
-    CompleteReturnForm,
     DeleteItemForm,
     InventoryForm,
     ManualAssignmentForm,
-    RejectRequestForm,
+    ProfileActionForm,
+    ProfileTriggerForm,
+    QueueActionForm,
 )
 
 
@@ -103,53 +114,54 @@ def logout():
 @login_required
 @admin_only
 def requests_queue():
-    pending_requests = RequestService.get_pending_requests()
     request_history = RequestService.get_request_history(10)
     returns_queue = AssignmentService.get_pending_returns()
 
     item_choices = InventoryService.get_available_items_for_choices()
-    approve_forms = {}
-    reject_forms = {}
-    for req in pending_requests:
-        approve_form = ApproveRequestForm(prefix=f"approve-{req.id}")
-        approve_form.item_id.choices = item_choices
-        approve_form.request_id.data = req.id
-        approve_forms[req.id] = approve_form
-
-        reject_form = RejectRequestForm(prefix=f"reject-{req.id}")
-        reject_form.request_id.data = req.id
-        reject_forms[req.id] = reject_form
-
-    return_forms = {}
-    for assignment in returns_queue:
-        return_form = CompleteReturnForm(prefix=f"return-{assignment.id}")
-        return_form.assignment_id.data = assignment.id
-        return_forms[assignment.id] = return_form
+    pending_requests = RequestService.iter_pending_requests(current_app.config["STREAM_FETCH_SIZE"])
+    holds = ReservationService.get_holds_by_request()
+    item_labels = dict(item_choices)
+    suggestions = MatchingService.suggest_for_pending(set(item_labels))
+
+    # A single CSRF-only form backs every approve/reject/return button; the
+    # item choices are rendered once and copied into a row's select on focus.
+    queue_form = QueueActionForm()
 
     manual_form = ManualAssignmentForm()
     manual_form.item_id.choices = item_choices
     manual_form.staff_id.choices = StaffService.get_staff_for_choices()
 
-    return render_template(
+    return stream_page(
         "admin/requests.html",
         pending_requests=pending_requests,
         request_history=request_history,
         returns_queue=returns_queue,
-        approve_forms=approve_forms,
-        reject_forms=reject_forms,
-        return_forms=return_forms,
+        queue_form=queue_form,
+        item_choices=item_choices,
+        holds=holds,
+        item_labels=item_labels,
+        suggestions=suggestions,
         manual_form=manual_form,
         has_inventory=bool(item_choices),
     )
 
 
+def _request_item_choices(request_id: int):
+    """Available items plus the item already held for this request"""
+    choices = InventoryService.get_available_items_for_choices()
+    hold = ReservationService.get_hold(request_id)
+    if hold is not None:
+        choices.append((hold.item_id, hold.item.name))
+    return choices
+
+
 @admin_bp.route("/requests/<int:request_id>/approve", methods=["POST"])
 @login_required
 @admin_only
 def approve_request(request_id: int):
-    form = ApproveRequestForm(prefix=f"approve-{request_id}")
-    form.item_id.choices = InventoryService.get_available_items_for_choices()
-    if not form.validate_on_submit() or int(form.request_id.data) != request_id:
+    form = ApproveRequestForm()
+    form.item_id.choices = _request_item_choices(request_id)
+    if not form.validate_on_submit():
         current_app.logger.warning(
             "Approve request failed validation",
             extra={"request_id": request_id, "errors": form.errors},
@@ -158,7 +170,9 @@ def approve_request(request_id: int):
         return redirect(url_for("admin.requests_queue"))
 
     try:
-        result = RequestService.approve_request(request_id, form.item_id.data)
+        result = RequestService.approve_request(
+            request_id, form.item_id.data, actor_id=current_user.id
+        )
         current_app.logger.info(
             "Request approved",
             extra={
@@ -170,19 +184,81 @@ def approve_request(request_id: int):
         flash("Request approved and item assigned.", "success")
     except ValueError as e:
         flash(str(e), "warning")
-    except Exception as e:
-        current_app.logger.error(f"Error approving request: {str(e)}")
+    except Exception:
+        current_app.logger.exception(
+            "Error approving request",
+            extra={"request_id": request_id, "item_id": form.item_id.data},
+        )
         flash("An error occurred while approving the request.", "danger")
 
     return redirect(url_for("admin.requests_queue"))
 
 
+@admin_bp.route("/requests/<int:request_id>/hold", methods=["POST"])
+@login_required
+@admin_only
+def hold_request(request_id: int):
+    form = ApproveRequestForm()
+    form.item_id.choices = _request_item_choices(request_id)
+    if not form.validate_on_submit():
+        current_app.logger.warning(
+            "Hold request failed validation",
+            extra={"request_id": request_id, "errors": form.errors},
+        )
+        flash("Could not hold the item. Please recheck the form.", "danger")
+        return redirect(url_for("admin.requests_queue"))
+
+    try:
+        reservation = ReservationService.hold(
+            request_id, form.item_id.data, actor_id=current_user.id
+        )
+        current_app.logger.info(
+            "Item held for request",
+            extra={"request_id": request_id, "item_id": form.item_id.data},
+        )
+        flash(f"Item held until {reservation.expires_at.strftime('%H:%M')} UTC.", "success")
+    except ValueError as e:
+        flash(str(e), "warning")
+    except Exception:
+        current_app.logger.exception(
+            "Error holding item",
+            extra={"request_id": request_id, "item_id": form.item_id.data},
+        )
+        flash("An error occurred while holding the item.", "danger")
+
+    return redirect(url_for("admin.requests_queue"))
+
+
+@admin_bp.route("/requests/<int:request_id>/release", methods=["POST"])
+@login_required
+@admin_only
+def release_hold(request_id: int):
+    form = QueueActionForm()
+    if not form.validate_on_submit():
+        flash("Could not release the hold. Please retry.", "danger")
+        return redirect(url_for("admin.requests_queue"))
+
+    try:
+        if ReservationService.release(request_id, actor_id=current_user.id):
+            flash("Hold released.", "info")
+        else:
+            flash("This request has no active hold.", "info")
+    except Exception:
+        current_app.logger.exception(
+            "Error releasing hold",
+            extra={"request_id": request_id},
+        )
+        flash("An error occurred while releasing the hold.", "danger")
+
+    return redirect(url_for("admin.requests_queue"))
+
+
 @admin_bp.route("/requests/<int:request_id>/reject", methods=["POST"])
 @login_required
 @admin_only
 def reject_request(request_id: int):
-    form = RejectRequestForm(prefix=f"reject-{request_id}")
-    if not form.validate_on_submit() or int(form.request_id.data) != request_id:
+    form = QueueActionForm()
+    if not form.validate_on_submit():
         current_app.logger.warning(
             "Reject request failed validation",
             extra={"request_id": request_id, "errors": form.errors},
@@ -191,7 +267,7 @@ def reject_request(request_id: int):
         return redirect(url_for("admin.requests_queue"))
 
     try:
-        request_record = RequestService.reject_request(request_id)
+        request_record = RequestService.reject_request(request_id, actor_id=current_user.id)
         current_app.logger.info(
             "Request rejected",
             extra={"request_id": request_id, "staff_id": request_record.staff_id},
@@ -199,8 +275,11 @@ def reject_request(request_id: int):
         flash("Request rejected.", "info")
     except ValueError as e:
         flash(str(e), "info")
-    except Exception as e:
-        current_app.logger.error(f"Error rejecting request: {str(e)}")
+    except Exception:
+        current_app.logger.exception(
+            "Error rejecting request",
+            extra={"request_id": request_id},
+        )
         flash("An error occurred while rejecting the request.", "danger")
 
     return redirect(url_for("admin.requests_queue"))
@@ -224,6 +303,7 @@ def manual_assignment():
         assignment = AssignmentService.create_assignment(
             form.item_id.data,
             form.staff_id.data,
+            actor_id=current_user.id,
         )
         item = InventoryService.get_item(form.item_id.data)
         staff = StaffService.get_staff(form.staff_id.data)
@@ -234,8 +314,11 @@ def manual_assignment():
         flash(f"{item.name} assigned to {staff.full_name}.", "success")
     except ValueError as e:
         flash(str(e), "warning")
-    except Exception as e:
-        current_app.logger.error(f"Error creating manual assignment: {str(e)}")
+    except Exception:
+        current_app.logger.exception(
+            "Error creating manual assignment",
+            extra={"item_id": form.item_id.data, "staff_id": form.staff_id.data},
+        )
         flash("An error occurred while creating the assignment.", "danger")
 
     return redirect(url_for("admin.requests_queue"))
@@ -245,8 +328,8 @@ def manual_assignment():
 @login_required
 @admin_only
 def complete_return(assignment_id: int):
-    form = CompleteReturnForm(prefix=f"return-{assignment_id}")
-    if not form.validate_on_submit() or int(form.assignment_id.data) != assignment_id:
+    form = QueueActionForm()
+    if not form.validate_on_submit():
         current_app.logger.warning(
             "Return completion failed validation",
             extra={"assignment_id": assignment_id, "errors": form.errors},
@@ -255,7 +338,9 @@ def complete_return(assignment_id: int):
         return redirect(url_for("admin.requests_queue"))
 
     try:
-        assignment = AssignmentService.complete_return(assignment_id)
+        assignment = AssignmentService.complete_return(
+            assignment_id, actor_id=current_user.id
+        )
         current_app.logger.info(
             "Return completed",
             extra={"assignment_id": assignment_id, "item_id": assignment.item_id},
@@ -263,8 +348,11 @@ def complete_return(assignment_id: int):
         flash("Return completed and inventory updated.", "success")
     except ValueError as e:
         flash(str(e), "info")
-    except Exception as e:
-        current_app.logger.error(f"Error completing return: {str(e)}")
+    except Exception:
+        current_app.logger.exception(
+            "Error completing return",
+            extra={"assignment_id": assignment_id},
+        )
         flash("An error occurred while processing the return.", "danger")
 
     return redirect(url_for("admin.requests_queue"))
@@ -276,16 +364,154 @@ def complete_return(assignment_id: int):
 def reports():
     feedback_stats = FeedbackService.get_stats()
     recent_feedback = FeedbackService.get_recent_feedback(10)
-    low_stock = InventoryService.get_low_stock_items(3)
+    low_stock = StockAlertService.get_open_alerts(current_app.config["LOW_STOCK_REPORT_LIMIT"])
+    low_stock_count = StockAlertService.get_open_count()
     active_assignments = AssignmentService.get_active_assignments_count()
+    valuation = ValuationService.get_report()
+    reorders = ForecastService.get_reorders(current_app.config["FORECAST_REPORT_LIMIT"])
+    forecast_at = ForecastService.get_generated_at()
     return render_template(
         "admin/reports.html",
         avg_rating=feedback_stats["average_rating"],
         total_feedback=feedback_stats["total_feedback"],
         recent_feedback=recent_feedback,
         low_stock=low_stock,
+        low_stock_count=low_stock_count,
         active_assignments=active_assignments,
+        valuation=valuation,
+        reorders=reorders,
+        forecast_at=forecast_at,
+    )
+
+
+@admin_bp.route("/reports/valuation.csv")
+@login_required
+@admin_only
+def valuation_csv():
+    report = ValuationService.get_report()
+    response = current_app.response_class(ValuationService.to_csv(report), mimetype="text/csv")
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="valuation-{report["as_of"].isoformat()}.csv"'
     )
+    return response
+
+
+@admin_bp.route("/reports/utilization")
+@login_required
+@admin_only
+def utilization():
+    try:
+        start, end = (
+            date.fromisoformat(request.args[name]) if request.args.get(name) else None
+            for name in ("start", "end")
+        )
+    except ValueError:
+        flash("Dates must be in YYYY-MM-DD format.", "warning")
+        start = end = None
+    try:
+        report = UtilizationService.get_report(start, end, request.args.get("group", "item"))
+    except ValueError as e:
+        flash(str(e), "warning")
+        report = UtilizationService.get_report()
+    return render_template("admin/utilization.html", report=report)
+
+
+def _profile_store() -> ProfileStore:
+    return ProfileStore(current_app.config["PROFILE_DIR"], current_app.config["PROFILE_KEEP"])
+
+
+def _profile_trigger_form() -> ProfileTriggerForm:
+    form = ProfileTriggerForm()
+    endpoints = sorted({rule.endpoint for rule in current_app.url_map.iter_rules()} - {"static"})
+    form.endpoint.choices = [("*", "Every endpoint")] + [(endpoint, endpoint) for endpoint in endpoints]
+    return form
+
+
+def _profile_download(name: str, stacks: dict, interval_ms: float, fmt: str):
+    mimetype, extension = FORMATS[fmt]
+    response = current_app.response_class(render(name, stacks, interval_ms, fmt), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{name}.{extension}"'
+    return response
+
+
+@admin_bp.route("/profiles")
+@login_required
+@admin_only
+def profiles():
+    store = _profile_store()
+    metas = store.list()
+    slowest = sorted(metas, key=lambda meta: -meta["duration_ms"])
+    trigger = store.get_trigger()
+    return render_template(
+        "admin/profiles.html",
+        enabled=current_app.config["PROFILING_ENABLED"],
+        sample_rate=current_app.config["PROFILE_SAMPLE_RATE"],
+        header_enabled=bool(current_app.config["PROFILE_TOKEN"]),
+        trigger=trigger,
+        trigger_until=datetime.utcfromtimestamp(trigger["until"]) if trigger else None,
+        profiles=slowest[:current_app.config["PROFILE_REPORT_LIMIT"]],
+        endpoints=summarize(metas),
+        trigger_form=_profile_trigger_form(),
+        action_form=ProfileActionForm(),
+    )
+
+
+@admin_bp.route("/profiles/trigger", methods=["POST"])
+@login_required
+@admin_only
+def profile_trigger():
+    form = _profile_trigger_form()
+    if not form.validate_on_submit():
+        flash("Pick an endpoint and a duration between 1 and 120 minutes.", "danger")
+        return redirect(url_for("admin.profiles"))
+    endpoint = None if form.endpoint.data == "*" else form.endpoint.data
+    _profile_store().set_trigger(endpoint, time.time() + form.minutes.data * 60)
+    current_app.logger.info(
+        "Profiling trigger set", extra={"endpoint": endpoint, "minutes": form.minutes.data}
+    )
+    flash(f"Profiling {endpoint or 'every endpoint'} for {form.minutes.data} minutes.", "success")
+    return redirect(url_for("admin.profiles"))
+
+
+@admin_bp.route("/profiles/stop", methods=["POST"])
+@login_required
+@admin_only
+def profile_stop():
+    if ProfileActionForm().validate_on_submit():
+        _profile_store().set_trigger(None, 0)
+        flash("Profiling trigger stopped.", "info")
+    return redirect(url_for("admin.profiles"))
+
+
+@admin_bp.route("/profiles/clear", methods=["POST"])
+@login_required
+@admin_only
+def profiles_clear():
+    if ProfileActionForm().validate_on_submit():
+        removed = _profile_store().clear()
+        flash(f"Deleted {removed} profiles.", "info")
+    return redirect(url_for("admin.profiles"))
+
+
+@admin_bp.route("/profiles/<profile_id>/<any(speedscope, collapsed):fmt>")
+@login_required
+@admin_only
+def profile_download(profile_id: str, fmt: str):
+    profile = _profile_store().get(profile_id)
+    if profile is None:
+        abort(404)
+    meta, stacks = profile
+    return _profile_download(profile_id, stacks, meta["interval_ms"], fmt)
+
+
+@admin_bp.route("/profiles/endpoint/<name>/<any(speedscope, collapsed):fmt>")
+@login_required
+@admin_only
+def profile_endpoint_download(name: str, fmt: str):
+    count, stacks = _profile_store().aggregate(name)
+    if not count:
+        abort(404)
+    return _profile_download(name, stacks, current_app.config["PROFILE_INTERVAL_MS"], fmt)
 
 
 @admin_bp.route("/inventory")
@@ -293,10 +519,12 @@ def reports():
 @admin_only
 def inventory():
     search_query = request.args.get("q", "").strip()
-    items = InventoryService.list_items(search_query if search_query else None)
+    items = InventoryService.iter_items(
+        search_query if search_query else None, current_app.config["STREAM_FETCH_SIZE"]
+    )
     stats = InventoryService.get_stats()
     delete_form = DeleteItemForm()
-    return render_template(
+    return stream_page(
         "admin/inventory_list.html",
         items=items,
         search_query=search_query,
@@ -318,6 +546,7 @@ def inventory_create():
                 form.quantity.data,
                 form.purchase_date.data,
                 form.price.data,
+                form.reorder_threshold.data,
             )
             flash("Inventory item added.", "success")
             return redirect(url_for("admin.inventory"))
@@ -349,6 +578,7 @@ def inventory_edit(item_id: int):
                 form.quantity.data,
                 form.purchase_date.data,
                 form.price.data,
+                form.reorder_threshold.data,
             )
             flash("Inventory item updated.", "success")
             return redirect(url_for("admin.inventory"))
@@ -374,8 +604,11 @@ def inventory_delete(item_id: int):
     try:
         InventoryService.delete_item(item_id)
         flash("Inventory item removed.", "info")
-    except Exception as e:
-        current_app.logger.error(f"Error deleting item: {str(e)}")
+    except Exception:
+        current_app.logger.exception(
+            "Error deleting item",
+            extra={"item_id": item_id},
+        )
         flash("An error occurred while deleting the item.", "danger")
     
     return redirect(url_for("admin.inventory"))
@@ -0,0 +1,7 @@
+from flask import Blueprint
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+from . import routes  # noqa: E402,F401
+
+__all__ = ["api_bp"]
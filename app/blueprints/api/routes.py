@@ -0,0 +1,149 @@
+import hmac
+from functools import wraps
+
+from flask import abort, current_app, jsonify, request
+from flask_login import current_user
+from werkzeug.exceptions import HTTPException
+
+from ...services import (
+    InventoryService,
+    RequestService,
+    AssignmentService,
+    FeedbackService,
+)
+from . import api_bp
+from .serialization import dumps, rows_to_dicts
+
+
+INVENTORY_FIELDS = (
+    "id", "name", "category", "quantity_available", "purchase_date", "price",
+    "created_at", "updated_at",
+)
+REQUEST_FIELDS = ("id", "staff_id", "item_name", "justification", "status", "created_at", "updated_at")
+ASSIGNMENT_FIELDS = (
+    "id", "item_id", "staff_id", "allocation_date", "return_date", "status",
+    "created_at", "updated_at",
+)
+FEEDBACK_FIELDS = (
+    "id", "staff_id", "rating", "question_1", "question_2", "question_3",
+    "question_4", "question_5", "created_at",
+)
+
+
+def api_auth_required(view):
+    """Accept a configured bearer token or a signed-in admin session."""
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        header = request.headers.get("Authorization", "")
+        if header.startswith("Bearer "):
+            token = header[len("Bearer "):].strip()
+            if any(hmac.compare_digest(token, valid) for valid in current_app.config["API_TOKENS"]):
+                return view(*args, **kwargs)
+        elif current_user.is_authenticated and getattr(current_user, "user_role", "") == "admin":
+            return view(*args, **kwargs)
+        abort(401, "A valid API token is required.")
+
+    return wrapped
+
+
+def _fields(allowed):
+    """Resolve the sparse fieldset from `fields=`; `id` is always included for paging."""
+    raw = request.args.get("fields")
+    if not raw:
+        return allowed
+    requested = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(unknown)}")
+    return ("id", *(name for name in requested if name != "id"))
+
+
+def _page_args():
+    after_id = request.args.get("after", type=int)
+    limit = request.args.get("limit", default=current_app.config["API_PAGE_SIZE"], type=int)
+    if limit < 1:
+        abort(400, "limit must be positive")
+    return after_id, min(limit, current_app.config["API_MAX_PAGE_SIZE"])
+
+
+def _json_response(payload):
+    response = current_app.response_class(dumps(payload), mimetype="application/json")
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def _page_response(fetch, allowed):
+    """Fetch one extra row so the next cursor is known without a COUNT query."""
+    fields = _fields(allowed)
+    after_id, limit = _page_args()
+    rows = fetch(fields, after_id, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return _json_response({
+        "data": rows_to_dicts(rows, fields),
+        "next_after": rows[-1][0] if has_more else None,
+    })
+
+
+@api_bp.errorhandler(HTTPException)
+def handle_http_error(error: HTTPException):
+    response = jsonify(error=error.description)
+    response.status_code = error.code
+    return response
+
+
+@api_bp.route("/inventory")
+@api_auth_required
+def inventory_list():
+    search_query = request.args.get("q", "").strip() or None
+    return _page_response(
+        lambda fields, after_id, limit: InventoryService.get_items_page(
+            fields, after_id, limit, search_query
+        ),
+        INVENTORY_FIELDS,
+    )
+
+
+@api_bp.route("/inventory/<int:item_id>")
+@api_auth_required
+def inventory_detail(item_id: int):
+    fields = _fields(INVENTORY_FIELDS)
+    row = InventoryService.get_item_columns(item_id, fields)
+    if row is None:
+        abort(404, "Item not found")
+    return _json_response({"data": dict(zip(fields, row))})
+
+
+@api_bp.route("/requests")
+@api_auth_required
+def request_list():
+    status = request.args.get("status")
+    staff_id = request.args.get("staff_id", type=int)
+    return _page_response(
+        lambda fields, after_id, limit: RequestService.get_requests_page(
+            fields, after_id, limit, status, staff_id
+        ),
+        REQUEST_FIELDS,
+    )
+
+
+@api_bp.route("/assignments")
+@api_auth_required
+def assignment_list():
+    status = request.args.get("status")
+    staff_id = request.args.get("staff_id", type=int)
+    item_id = request.args.get("item_id", type=int)
+    return _page_response(
+        lambda fields, after_id, limit: AssignmentService.get_assignments_page(
+            fields, after_id, limit, status, staff_id, item_id
+        ),
+        ASSIGNMENT_FIELDS,
+    )
+
+
+@api_bp.route("/feedback")
+@api_auth_required
+def feedback_list():
+    return _page_response(FeedbackService.get_feedback_page, FEEDBACK_FIELDS)
@@ -0,0 +1,24 @@
+"""Compact JSON encoding for the API blueprint"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, List, Sequence
+
+
+def _default(value):
+    # Only called for types the C encoder does not know about.
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def rows_to_dicts(rows: Iterable[Sequence], fields: Sequence[str]) -> List[dict]:
+    """Zip column tuples with their field names"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dumps(payload) -> bytes:
+    """Encode without whitespace; dates as ISO 8601, decimals as strings"""
+    return json.dumps(payload, separators=(",", ":"), default=_default).encode("utf-8")
@@ -28,8 +28,9 @@ def staff_only(view):
 @login_required
 @staff_only
 def dashboard():
-    assignments = AssignmentService.get_assignments_for_staff(current_user.id)
-    outstanding_requests = RequestService.get_requests_for_staff(current_user.id)
+    full_history = request.args.get("history") == "all"
+    assignments = AssignmentService.get_assignments_for_staff(current_user.id, full_history)
+    outstanding_requests = RequestService.get_requests_for_staff(current_user.id, full_history)
     form = StaffRequestItemForm()
     feedback_form = FeedbackForm()
     return render_template(
@@ -38,6 +39,7 @@ def dashboard():
         form=form,
         requests=outstanding_requests,
         feedback_form=feedback_form,
+        full_history=full_history,
     )
 
 
@@ -60,8 +62,11 @@ def submit_request():
             flash("Request submitted. Admin will review shortly.", "success")
         except ValueError as e:
             flash(str(e), "danger")
-        except Exception as e:
-            current_app.logger.error(f"Error submitting request: {str(e)}")
+        except Exception:
+            current_app.logger.exception(
+                "Error submitting request",
+                extra={"staff_id": current_user.id},
+            )
             flash("An error occurred while submitting the request.", "danger")
     else:
         current_app.logger.warning(
@@ -97,8 +102,11 @@ def submit_feedback():
             return redirect(url_for("staff.thank_you"))
         except ValueError as e:
             flash(str(e), "danger")
-        except Exception as e:
-            current_app.logger.error(f"Error submitting feedback: {str(e)}")
+        except Exception:
+            current_app.logger.exception(
+                "Error submitting feedback",
+                extra={"staff_id": current_user.id},
+            )
             flash("An error occurred while submitting feedback.", "danger")
     else:
         current_app.logger.warning(
@@ -129,8 +137,11 @@ def request_return(assignment_id: int):
         flash("Return request sent.", "info")
     except ValueError as e:
         flash(str(e), "warning" if "already" in str(e).lower() else "info")
-    except Exception as e:
-        current_app.logger.error(f"Error requesting return: {str(e)}")
+    except Exception:
+        current_app.logger.exception(
+            "Error requesting return",
+            extra={"assignment_id": assignment_id, "staff_id": current_user.id},
+        )
         flash("An error occurred while requesting return.", "danger")
 
     return redirect(url_for("staff.dashboard"))
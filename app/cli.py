@@ -0,0 +1,293 @@
+"""Flask CLI commands for scheduled and operational jobs"""
+import click
+from flask import Flask
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import text
+
+from .extensions import db
+
+
+audit_cli = AppGroup("audit", help="Maintain the audit event table.")
+
+
+@audit_cli.command("partitions")
+@click.option("--months-ahead", default=3, show_default=True,
+              help="How many future months should already have a partition.")
+def audit_partitions(months_ahead: int) -> None:
+    """Create upcoming monthly partitions for audit_events (MySQL)."""
+    from .services import AuditService
+
+    added = AuditService.ensure_partitions(months_ahead)
+    db.session.commit()
+    click.echo(f"Added partitions: {', '.join(added) or 'none'}")
+
+
+@audit_cli.command("prune")
+@click.option("--keep-months", default=24, show_default=True,
+              help="Number of most recent months to keep.")
+def audit_prune(keep_months: int) -> None:
+    """Drop audit_events partitions older than the retention window (MySQL)."""
+    from .services import AuditService
+
+    dropped = AuditService.drop_partitions_older_than(keep_months)
+    db.session.commit()
+    click.echo(f"Dropped partitions: {', '.join(dropped) or 'none'}")
+
+
+archive_cli = AppGroup("archive", help="Move closed rows to the archive tables.")
+
+
+@archive_cli.command("run")
+@click.option("--days", default=90, show_default=True,
+              help="Archive closed rows last updated more than this many days ago.")
+@click.option("--batch-size", default=500, show_default=True,
+              help="Rows moved per transaction.")
+@click.option("--max-batches", type=int, default=None,
+              help="Stop after this many batches per table.")
+def archive_run(days: int, batch_size: int, max_batches: int) -> None:
+    """Archive approved/rejected requests and returned assignments."""
+    from .services import ArchiveService
+
+    moved = ArchiveService.archive_closed(days, batch_size, max_batches)
+    click.echo(
+        f"Archived {moved['requests']} requests and {moved['assignments']} assignments"
+    )
+
+
+reservations_cli = AppGroup("reservations", help="Maintain stock holds.")
+
+
+@reservations_cli.command("expire")
+@click.option("--batch-size", default=500, show_default=True,
+              help="Holds released per transaction.")
+@click.option("--max-batches", type=int, default=None,
+              help="Stop after this many batches.")
+def reservations_expire(batch_size: int, max_batches: int) -> None:
+    """Return the stock of expired holds to available quantity."""
+    from .services import ReservationService
+
+    expired = ReservationService.expire_due(batch_size, max_batches)
+    click.echo(f"Expired {expired} holds")
+
+
+allocation_cli = AppGroup("allocation", help="Approve pending requests in bulk.")
+
+
+def _department_option(ctx, param, values):
+    from config import parse_name_map
+
+    try:
+        return parse_name_map(",".join(values)) if values else None
+    except ValueError:
+        raise click.BadParameter("expected DEPARTMENT=NUMBER")
+
+
+@allocation_cli.command("run")
+@click.option("--dry-run", is_flag=True, help="Print the plan without approving anything.")
+@click.option("--priority", "priorities", multiple=True, callback=_department_option,
+              help="DEPARTMENT=N; higher is served first. Overrides ALLOCATION_PRIORITIES.")
+@click.option("--quota", "quotas", multiple=True, callback=_department_option,
+              help="DEPARTMENT=N; most approvals per run. Overrides ALLOCATION_QUOTAS.")
+@click.option("--limit", type=int, default=None, help="Only consider the first N requests in queue order.")
+def allocation_run(dry_run: bool, priorities, quotas, limit: int) -> None:
+    """Match pending requests to in-stock items and approve them in one transaction."""
+    from .services import AllocationService
+
+    result = AllocationService.run(dry_run, priorities=priorities, quotas=quotas, limit=limit)
+    if dry_run:
+        for allocation in result["allocations"]:
+            click.echo(
+                f"request {allocation['request_id']} -> item {allocation['item_id']} "
+                f"(score {allocation['score']})"
+            )
+    counts = ", ".join(f"{key.replace('_', ' ')}: {value}" for key, value in result["counts"].items())
+    click.echo(f"Planned {counts}")
+    if result["applied"] is not None:
+        click.echo(
+            f"Approved {result['applied']['approved']} requests, "
+            f"skipped {result['applied']['skipped']} changed since planning"
+        )
+
+
+alerts_cli = AppGroup("alerts", help="Low-stock thresholds and alerts.")
+
+
+@alerts_cli.command("digest")
+def alerts_digest() -> None:
+    """Report alerts opened since the last digest."""
+    from .services import StockAlertService
+
+    alerts = StockAlertService.send_digest()
+    for alert in alerts:
+        name = alert.item.name if alert.item else f"item {alert.item_id}"
+        click.echo(f"{name}: {alert.quantity} left (reorder at {alert.threshold})")
+    click.echo(f"{len(alerts)} new low-stock alerts")
+
+
+@alerts_cli.command("rescan")
+def alerts_rescan() -> None:
+    """Re-evaluate every item against its threshold."""
+    from .services import StockAlertService
+
+    result = StockAlertService.rescan()
+    click.echo(f"Opened {result['opened']} alerts, resolved {result['resolved']}")
+
+
+@alerts_cli.command("threshold")
+@click.argument("category")
+@click.argument("threshold", type=int, required=False)
+@click.option("--clear", is_flag=True, help="Remove the category threshold.")
+def alerts_threshold(category: str, threshold: int, clear: bool) -> None:
+    """Show, set or --clear the reorder threshold for CATEGORY."""
+    from .services import StockAlertService
+
+    if threshold is None and not clear:
+        current = {row.category: row.threshold for row in StockAlertService.get_category_thresholds()}
+        click.echo(f"{category}: {current.get(category, 'default')}")
+        return
+    try:
+        result = StockAlertService.set_category_threshold(category, None if clear else threshold)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Opened {result['opened']} alerts, resolved {result['resolved']}")
+
+
+reports_cli = AppGroup("reports", help="Export inventory reports and write analytics snapshots.")
+
+
+@reports_cli.command("valuation")
+@click.option("--as-of", type=click.DateTime(formats=["%Y-%m-%d"]), help="Valuation date (default today).")
+@click.option("--output", "-o", type=click.File("w"), default="-", help="CSV destination (default stdout).")
+def reports_valuation(as_of, output) -> None:
+    """Write the valuation and depreciation report as CSV."""
+    from .services import ValuationService
+
+    report = ValuationService.get_report(as_of.date() if as_of else None)
+    output.write(ValuationService.to_csv(report))
+
+
+@reports_cli.command("snapshot")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), help="Rebuild from this day (default: after the last snapshot).")
+@click.option("--until", type=click.DateTime(formats=["%Y-%m-%d"]), help="Last day to write (default yesterday).")
+def reports_snapshot(since, until) -> None:
+    """Write daily utilization snapshots for the days not yet covered."""
+    from .services import UtilizationService
+
+    result = UtilizationService.snapshot(
+        until.date() if until else None, since.date() if since else None
+    )
+    click.echo(f"Wrote {result['rows']} snapshot rows for {result['days']} days")
+
+
+@reports_cli.command("forecast")
+@click.option("--dry-run", is_flag=True, help="Print recommendations without storing them.")
+@click.option("--limit", type=int, default=20, show_default=True, help="Recommendations to print.")
+def reports_forecast(dry_run: bool, limit: int) -> None:
+    """Forecast request demand and store reorder recommendations."""
+    from .services import ForecastService
+
+    result = ForecastService.run(dry_run=dry_run)
+    reorders = [row for row in result["rows"] if row["reorder_quantity"] > 0]
+    for row in reorders[:limit]:
+        click.echo(
+            f"{row['scope']:<8} {row['name']}: {row['weekly_forecast']:.2f}/week, "
+            f"{row['available']} available, reorder {row['reorder_quantity']} ({row['model']})"
+        )
+    prefix = "Would store" if dry_run else "Stored"
+    click.echo(f"{prefix} {len(result['rows'])} forecasts; {len(reorders)} recommend reordering")
+
+
+templates_cli = AppGroup("templates", help="Manage compiled Jinja templates.")
+
+
+@templates_cli.command("precompile")
+def templates_precompile() -> None:
+    """Compile all templates, filling JINJA_BYTECODE_CACHE_DIR when it is set."""
+    from flask import current_app
+
+    from .templating import precompile_templates
+
+    names = precompile_templates(current_app)
+    click.echo(f"Compiled {len(names)} templates")
+
+
+assets_cli = AppGroup("assets", help="Build fingerprinted static assets.")
+
+
+@assets_cli.command("build")
+def assets_build() -> None:
+    """Minify, fingerprint and precompress app/static into app/static/dist."""
+    from flask import current_app
+
+    from .assets import build_assets
+
+    manifest = build_assets(current_app.static_folder)
+    click.echo(f"Built {len(manifest)} assets")
+
+
+sessions_cli = AppGroup("sessions", help="Maintain the server-side session store.")
+
+
+@sessions_cli.command("sweep")
+@click.option("--batch-size", default=1000, show_default=True,
+              help="Sessions deleted per transaction.")
+@click.option("--max-batches", type=int, default=None,
+              help="Stop after this many batches.")
+def sessions_sweep(batch_size: int, max_batches: int) -> None:
+    """Delete expired server-side sessions."""
+    from datetime import datetime
+
+    from flask import current_app
+
+    from .sessions import ServerSessionInterface
+
+    interface = current_app.session_interface
+    if not isinstance(interface, ServerSessionInterface):
+        click.echo("SESSION_STORE is cookie; nothing to sweep")
+        return
+    deleted = interface.store.sweep(datetime.utcnow(), batch_size, max_batches)
+    click.echo(f"Deleted {deleted} expired sessions")
+
+
+MIGRATION_LOCK_NAME = "inventory_app_migrations"
+
+
+@click.command("migrate-locked")
+@click.option("--lock-timeout", default=300, show_default=True,
+              help="Seconds to wait for another migration run to finish.")
+@with_appcontext
+def migrate_locked(lock_timeout: int) -> None:
+    """Run `flask db upgrade` under a database advisory lock.
+
+    Safe to start from several pods or jobs at once: the first run migrates,
+    the others wait for it and then find nothing left to do.
+    """
+    from flask_migrate import upgrade
+
+    with db.engine.connect() as lock_conn:
+        if lock_conn.dialect.name == "mysql":
+            acquired = lock_conn.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": MIGRATION_LOCK_NAME, "timeout": lock_timeout},
+            ).scalar()
+            if acquired != 1:
+                raise click.ClickException("Timed out waiting for the migration lock")
+        try:
+            upgrade()
+        finally:
+            if lock_conn.dialect.name == "mysql":
+                lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+    click.echo("Database is up to date")
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(audit_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(reservations_cli)
+    app.cli.add_command(allocation_cli)
+    app.cli.add_command(alerts_cli)
+    app.cli.add_command(reports_cli)
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(sessions_cli)
+    app.cli.add_command(migrate_locked)
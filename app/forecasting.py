@@ -0,0 +1,60 @@
+"""Weekly demand series and lightweight forecasts fitted across every series at once"""
+from typing import Dict
+
+import numpy as np
+
+MODELS = ("smoothing", "moving_average")
+
+
+def weekly_matrix(series_index: np.ndarray, week_index: np.ndarray, series: int, weeks: int) -> np.ndarray:
+    """Count events into a (series, weeks) matrix; out-of-range weeks are dropped"""
+    matrix = np.zeros((series, weeks), dtype=np.float64)
+    keep = (week_index >= 0) & (week_index < weeks)
+    np.add.at(matrix, (series_index[keep], week_index[keep]), 1)
+    return matrix
+
+
+def fit(matrix: np.ndarray, alpha: float, window: int) -> Dict[str, np.ndarray]:
+    """
+    Fit simple exponential smoothing and a trailing moving average to every row
+    Each row keeps whichever model had the lower one-step-ahead mean absolute error
+    over the weeks both could forecast; sigma is that model's error deviation
+    """
+    rows, weeks = matrix.shape
+    window = max(1, min(window, weeks - 1)) if weeks > 1 else 1
+
+    smoothed = np.empty_like(matrix)
+    level = matrix[:, 0].copy()
+    smoothed[:, 0] = level
+    for week in range(1, weeks):
+        smoothed[:, week] = level
+        level = level + alpha * (matrix[:, week] - level)
+
+    cumulative = np.concatenate([np.zeros((rows, 1)), np.cumsum(matrix, axis=1)], axis=1)
+    averaged = (cumulative[:, window:weeks] - cumulative[:, :weeks - window]) / window
+
+    scored = slice(window, weeks)
+    smoothing_errors = matrix[:, scored] - smoothed[:, scored]
+    average_errors = matrix[:, scored] - averaged
+    if smoothing_errors.shape[1] == 0:
+        zeros = np.zeros(rows)
+        return {"forecast": level, "sigma": zeros, "model": np.zeros(rows, dtype=np.int64)}
+
+    use_average = np.abs(average_errors).mean(axis=1) < np.abs(smoothing_errors).mean(axis=1)
+    moving = (cumulative[:, weeks] - cumulative[:, weeks - window]) / window
+    forecast = np.where(use_average, moving, level)
+    sigma = np.where(use_average, average_errors.std(axis=1), smoothing_errors.std(axis=1))
+    return {"forecast": forecast, "sigma": sigma, "model": use_average.astype(np.int64)}
+
+
+def reorder(forecast: np.ndarray, sigma: np.ndarray, available: np.ndarray,
+            horizon: int, service_z: float) -> Dict[str, np.ndarray]:
+    """
+    Demand over the horizon plus safety stock (z * sigma * sqrt(horizon)), and the
+    whole units needed on top of what is available to cover it
+    """
+    demand = np.maximum(forecast, 0.0) * horizon
+    safety = service_z * sigma * np.sqrt(horizon)
+    quantity = np.maximum(np.ceil(demand + safety - available), 0).astype(np.int64)
+    return {"demand": demand, "safety_stock": safety, "quantity": quantity}
+
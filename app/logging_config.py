@@ -0,0 +1,264 @@
+"""Structured logging: JSON lines written off the request thread.
+
+Every record goes through a bounded, non-blocking QueueHandler on the root
+logger; a QueueListener thread formats and writes it. While the handler still
+runs on the request thread it copies in what only that thread knows: the
+request id, method, path, endpoint, trace id and time since the request
+started, and the formatted traceback. Everything passed as ``extra=`` ends up
+as top-level keys in the JSON line.
+
+INFO and DEBUG records of busy loggers can be sampled (LOG_SAMPLING); kept
+records carry ``sample_rate`` so counts can be scaled back up. Warnings and
+errors are never sampled.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from flask import Flask, g, has_request_context, request
+from flask.logging import default_handler
+
+from .tracing import current_span
+
+ACCESS_LOGGER = "app.access"
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(name)s: %(message)s"
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+_OWN_ATTRS = frozenset({"http", "sample_rate"})
+# A client-supplied X-Request-ID is logged and echoed back, so only plain tokens are taken
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+_listener: Optional[QueueListener] = None
+_hooks_registered = False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extras, request and exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in _OWN_ATTRS:
+                entry[key] = value
+        http = getattr(record, "http", None)
+        if http:
+            entry["request"] = http
+        sample_rate = getattr(record, "sample_rate", None)
+        if sample_rate is not None:
+            entry["sample_rate"] = sample_rate
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request's id, route and elapsed time to the record as `http`"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if has_request_context() and "request_id" in g:
+            record.http = {
+                "id": g.request_id,
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "remote_addr": request.remote_addr,
+                "elapsed_ms": round((time.perf_counter() - g.request_started) * 1e3, 1),
+            }
+            span = current_span()
+            if span is not None:
+                record.http["trace_id"] = span.trace_id
+                if span.sampled:
+                    record.http["span_id"] = span.span_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of INFO/DEBUG records per logger name (and its children)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: Dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        if name not in self._cache:
+            rate, probe = None, name
+            while probe:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._cache[name] = rate
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueue without ever waiting: when the queue is full the record is dropped
+    and counted, and the count is reported with the next record that fits
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base class, keep message, extras and traceback apart for the
+        # JSON formatter; only the traceback is rendered here, while its frames
+        # are still alive on this thread.
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            record.dropped_records = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped = 0
+
+
+def _start_listener(handler: logging.Handler, log_queue: queue.Queue) -> None:
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_listener() -> None:
+    # A forked child has the listener object but not its thread, a copy of
+    # records the parent has yet to write (and still will), and a queue whose
+    # mutex a parent thread may have held: start over with a fresh queue
+    if _listener is not None:
+        log_queue = queue.Queue(_listener.queue.maxsize)
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, NonBlockingQueueHandler):
+                handler.queue = log_queue
+        _listener._thread = None
+        _start_listener(_listener.handlers[0], log_queue)
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # drains whatever is still queued
+        _listener = None
+
+
+def configure_logging(app: Flask) -> None:
+    """Route every logger through the queue to stdout, and time each request"""
+    config = app.config
+    output = logging.StreamHandler(sys.stdout)
+    if config["LOG_FORMAT"] == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(config["LOG_QUEUE_SIZE"])
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+    if config["LOG_SAMPLING"]:
+        handler.addFilter(SamplingFilter(config["LOG_SAMPLING"]))
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config["LOG_LEVEL"])
+    app.logger.removeHandler(default_handler)
+    app.logger.setLevel(config["LOG_LEVEL"])
+
+    _start_listener(output, log_queue)
+    global _hooks_registered
+    if not _hooks_registered:
+        # The listener thread does not survive fork (gunicorn preload), so every
+        # worker starts its own; exit drains the queue before the process ends.
+        os.register_at_fork(after_in_child=_restart_listener)
+        atexit.register(_stop_listener)
+        _hooks_registered = True
+
+    register_request_logging(app)
+
+
+def register_request_logging(app: Flask) -> None:
+    access = logging.getLogger(ACCESS_LOGGER)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        span = current_span()
+        supplied = request.headers.get("X-Request-ID", "")
+        g.request_id = (
+            (supplied if _REQUEST_ID.fullmatch(supplied) else None)
+            or (span.trace_id if span is not None else None)
+            or uuid.uuid4().hex
+        )
+
+    @app.after_request
+    def log_request(response):
+        if "request_id" not in g:
+            return response
+        response.headers.setdefault("X-Request-ID", g.request_id)
+        # The request context is gone by the time the body has been sent, so
+        # take everything the access line needs now.
+        started = g.request_started
+        http = {
+            "id": g.request_id,
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "remote_addr": request.remote_addr,
+        }
+        span = current_span()
+        if span is not None:
+            http["trace_id"] = span.trace_id
+        status = response.status_code
+
+        def finished():
+            # After the body is sent, so streamed pages are timed in full
+            duration_ms = round((time.perf_counter() - started) * 1e3, 1)
+            access.info(
+                "%s %s %s", http["method"], http["path"], status,
+                extra={"http": dict(http, elapsed_ms=duration_ms), "status": status, "duration_ms": duration_ms},
+            )
+
+        response.call_on_close(finished)
+        return response
@@ -0,0 +1,104 @@
+"""Trigram similarity index used to match free-text requests to inventory items"""
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase words only, single-space separated; "MacBook-Pro  14" becomes macbook pro 14"""
+    return " ".join(_WORD.findall((text or "").lower()))
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Word trigrams padded like pg_trgm: "mac" -> {"  m", " ma", "mac", "ac "}"""
+    grams = set()
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class _Field:
+    """Inverted index (trigram -> item ids) for one text field"""
+
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self.grams: Dict[int, FrozenSet[str]] = {}
+
+    def add(self, item_id: int, text: str) -> None:
+        self.remove(item_id)
+        grams = trigrams(text)
+        self.grams[item_id] = grams
+        for gram in grams:
+            self.postings[gram].add(item_id)
+
+    def remove(self, item_id: int) -> None:
+        for gram in self.grams.pop(item_id, ()):
+            ids = self.postings[gram]
+            ids.discard(item_id)
+            if not ids:
+                del self.postings[gram]
+
+    def similarities(self, query: FrozenSet[str]) -> Dict[int, float]:
+        """Jaccard similarity against every item sharing at least one trigram"""
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in query:
+            for item_id in self.postings.get(gram, ()):
+                overlap[item_id] += 1
+        return {
+            item_id: shared / (len(query) + len(self.grams[item_id]) - shared)
+            for item_id, shared in overlap.items()
+        }
+
+
+class TrigramIndex:
+    """
+    Item name and category trigrams, updated one item at a time
+    Scores blend name and (down-weighted) category similarity into 0..1
+    """
+
+    def __init__(self, category_weight: float = 0.25):
+        self.category_weight = category_weight
+        self.names = _Field()
+        self.categories = _Field()
+
+    def __len__(self) -> int:
+        return len(self.names.grams)
+
+    def upsert(self, item_id: int, name: str, category: str) -> None:
+        self.names.add(item_id, name)
+        self.categories.add(item_id, category)
+
+    def remove(self, item_id: int) -> None:
+        self.names.remove(item_id)
+        self.categories.remove(item_id)
+
+    def top_k(self, text: str, k: int, min_score: float = 0.0,
+              allowed: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        query = trigrams(text)
+        if not query:
+            return []
+        scores = self.names.similarities(query)
+        for item_id, score in self.categories.similarities(query).items():
+            scores[item_id] = scores.get(item_id, 0.0) + self.category_weight * score
+        scale = 1 + self.category_weight
+        candidates = (
+            (score / scale, item_id) for item_id, score in scores.items()
+            if score / scale >= min_score and (allowed is None or item_id in allowed)
+        )
+        return [(item_id, round(score, 3)) for score, item_id in heapq.nlargest(k, candidates)]
+
+    def top_k_many(self, texts: Iterable[Tuple[int, str]], k: int, min_score: float = 0.0,
+                   allowed: Optional[Set[int]] = None) -> Dict[int, List[Tuple[int, float]]]:
+        """Suggestions for many (key, text) pairs; identical texts are scored once"""
+        by_text: Dict[str, List[Tuple[int, float]]] = {}
+        results = {}
+        for key, text in texts:
+            normalized = normalize(text)
+            if normalized not in by_text:
+                by_text[normalized] = self.top_k(normalized, k, min_score, allowed)
+            results[key] = by_text[normalized]
+        return results
@@ -0,0 +1,425 @@
+"""WSGI middleware applied around the Flask app in `apply_middlewares`"""
+import hashlib
+import hmac
+import mimetypes
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional
+
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import FileWrapper
+
+from .assets import BUILD_DIR
+from .profiling import ProfileStore, Sampler
+from .tracing import STATUS_ERROR, Tracer, activate, deactivate
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticFile(NamedTuple):
+    path: str
+    size: int
+    content_type: str
+    etag: str
+    cache_control: str
+    # Content-Encoding -> (path, size) of a precompressed sibling
+    variants: Dict[str, tuple]
+
+
+class StaticFilesMiddleware:
+    """
+    Serve files under the static folder before the request reaches Flask
+    Fingerprinted files from the asset build are cached forever; everything
+    else gets STATIC_MAX_AGE and an ETag. Precompressed .br/.gz siblings are
+    sent when the client accepts them.
+    """
+
+    def __init__(self, wsgi_app, static_folder: str, url_path: str, max_age: int, autorefresh: bool = False):
+        self.wsgi_app = wsgi_app
+        self.static_folder = static_folder
+        self.prefix = url_path.rstrip("/") + "/"
+        self.default_cache_control = f"public, max-age={max_age}"
+        self.autorefresh = autorefresh
+        self.files = self._scan()
+
+    def _scan(self) -> Dict[str, StaticFile]:
+        files = {}
+        for directory, _, filenames in os.walk(self.static_folder):
+            for filename in filenames:
+                if filename.endswith((".gz", ".br")):
+                    continue
+                path = os.path.join(directory, filename)
+                relative = os.path.relpath(path, self.static_folder).replace(os.sep, "/")
+                files[relative] = self._describe(path, relative)
+        return files
+
+    def _describe(self, path: str, relative: str) -> StaticFile:
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        fingerprinted = relative.startswith(BUILD_DIR + "/")
+        if fingerprinted:
+            # The name already carries the content hash.
+            etag = os.path.splitext(os.path.basename(path))[0].rsplit(".", 1)[-1]
+        else:
+            etag = hashlib.sha1(f"{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest()[:16]
+        variants = {}
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if os.path.isfile(path + suffix):
+                variants[encoding] = (path + suffix, os.path.getsize(path + suffix))
+        return StaticFile(
+            path=path,
+            size=stat.st_size,
+            content_type=content_type,
+            etag=f'"{etag}"',
+            cache_control=IMMUTABLE_CACHE_CONTROL if fingerprinted else self.default_cache_control,
+            variants=variants,
+        )
+
+    def _lookup(self, relative: str) -> Optional[StaticFile]:
+        static_file = self.files.get(relative)
+        if static_file is None and self.autorefresh:
+            self.files = self._scan()
+            static_file = self.files.get(relative)
+        return static_file
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if not path.startswith(self.prefix):
+            return self.wsgi_app(environ, start_response)
+
+        method = environ.get("REQUEST_METHOD", "GET")
+        static_file = self._lookup(path[len(self.prefix):])
+        if static_file is None:
+            start_response("404 Not Found", [("Content-Type", "text/plain"), ("Content-Length", "9")])
+            return [b"Not Found"]
+        if method not in ("GET", "HEAD"):
+            start_response("405 Method Not Allowed", [("Allow", "GET, HEAD"), ("Content-Length", "0")])
+            return []
+
+        headers = [("Cache-Control", static_file.cache_control), ("ETag", static_file.etag)]
+        if static_file.variants:
+            headers.append(("Vary", "Accept-Encoding"))
+
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH", "")
+        if static_file.etag in if_none_match or if_none_match.strip() == "*":
+            start_response("304 Not Modified", headers)
+            return []
+
+        file_path, size = static_file.path, static_file.size
+        accepted = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING"))
+        for encoding, (variant_path, variant_size) in static_file.variants.items():
+            if accepted[encoding]:
+                file_path, size = variant_path, variant_size
+                headers.append(("Content-Encoding", encoding))
+                break
+
+        headers += [("Content-Type", static_file.content_type), ("Content-Length", str(size))]
+        start_response("200 OK", headers)
+        if method == "HEAD":
+            return []
+        file_wrapper = environ.get("wsgi.file_wrapper", FileWrapper)
+        return file_wrapper(open(file_path, "rb"), 64 * 1024)
+
+
+COMPRESSIBLE_TYPES = frozenset({
+    "text/html", "text/css", "text/plain", "text/csv", "text/javascript",
+    "application/javascript", "application/json", "application/xml", "image/svg+xml",
+})
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br over gzip when the client accepts it and brotli is installed"""
+    accepted = parse_accept_header(accept_encoding)
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + self._compressor.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress text responses with brotli or gzip
+    Responses with a Content-Length below min_size, non-200 responses, HEAD
+    requests and anything already encoded (e.g. precompressed static files)
+    pass through untouched. Streamed responses are flushed per chunk so the
+    client still receives the page progressively.
+    """
+
+    def __init__(self, wsgi_app, min_size: int, gzip_level: int, brotli_quality: int):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compressible(self, environ, status: str, headers: Headers) -> bool:
+        if environ.get("REQUEST_METHOD") == "HEAD" or not status.startswith("200"):
+            return False
+        if "Content-Encoding" in headers or "no-transform" in headers.get("Cache-Control", ""):
+            return False
+        mimetype = headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if mimetype not in COMPRESSIBLE_TYPES:
+            return False
+        length = headers.get("Content-Length", type=int)
+        return length is None or length >= self.min_size
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        state = {}
+
+        def compressing_start_response(status, response_headers, exc_info=None):
+            headers = Headers(response_headers)
+            if self._compressible(environ, status, headers):
+                headers.add("Vary", "Accept-Encoding")
+                if encoding:
+                    # Without a Content-Length the app is streaming; flush every chunk.
+                    state["streamed"] = "Content-Length" not in headers
+                    state["compressor"] = self._compressor(encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers.remove("Content-Length")
+                    etag = headers.get("ETag")
+                    if etag and not etag.startswith("W/"):
+                        # The representation changed, so only a weak validator still holds.
+                        headers["ETag"] = "W/" + etag
+            write = start_response(status, headers.to_wsgi_list(), exc_info)
+            if "compressor" not in state:
+                return write
+            return lambda data: write(state["compressor"].compress(data, True))
+
+        app_iter = self.wsgi_app(environ, compressing_start_response)
+        if "compressor" not in state:
+            return app_iter
+        # The app's iterable is closed even if the compressed body is never started
+        return _ClosingIterator(
+            self._compress(app_iter, state["compressor"], state["streamed"]),
+            getattr(app_iter, "close", lambda: None),
+        )
+
+    @staticmethod
+    def _compress(app_iter: Iterable[bytes], compressor, streamed: bool) -> Iterator[bytes]:
+        for chunk in app_iter:
+            data = compressor.compress(chunk, streamed)
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class _ClosingIterator:
+    """
+    The app's response iterable, with `on_close` run after it is closed
+    Unlike cleanup in a generator's finally, this also runs when the server
+    closes a body it never started iterating (e.g. the client went away).
+    """
+
+    def __init__(self, app_iter: Iterable[bytes], on_close: Callable[[], None]):
+        self._app_iter = app_iter
+        self._next = iter(app_iter).__next__
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        return self._next()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self._app_iter, "close"):
+                self._app_iter.close()
+        finally:
+            self._on_close()
+
+
+class _TracedIterator(_ClosingIterator):
+    """A _ClosingIterator with `span` active while each chunk is generated"""
+
+    def __init__(self, app_iter: Iterable[bytes], span, on_close: Callable[[], None]):
+        super().__init__(app_iter, on_close)
+        self._span = span
+
+    def __next__(self) -> bytes:
+        # Streamed pages query while the body is generated; keep those under the request
+        token = activate(self._span)
+        try:
+            return super().__next__()
+        finally:
+            deactivate(token)
+
+
+class ProfilingMiddleware:
+    """
+    Sample the stacks of selected requests and store one profile per request
+    A request is profiled when a random draw falls under sample_rate, when it
+    carries "X-Profile: <token>" (the response then names the profile in
+    X-Profile-Id), or while an admin trigger covers its endpoint. Streamed
+    bodies are included: sampling stops when the response iterable closes.
+    """
+
+    TRIGGER_TTL = 1.0  # seconds between re-reads of the admin trigger file
+
+    def __init__(self, wsgi_app, url_map, store: ProfileStore, sampler: Sampler, sample_rate: float,
+                 token: Optional[str], min_duration_ms: float):
+        self.wsgi_app = wsgi_app
+        self.url_map = url_map
+        self.store = store
+        self.sampler = sampler
+        self.sample_rate = sample_rate
+        self.token = token
+        self.min_duration_ms = min_duration_ms
+        self._trigger = None
+        self._trigger_read_at = 0.0
+
+    def _endpoint(self, environ) -> str:
+        try:
+            endpoint, _ = self.url_map.bind_to_environ(environ).match()
+            return endpoint
+        except HTTPException:  # 404, 405 and routing redirects
+            return "<unmatched>"
+
+    def _active_trigger(self) -> Optional[Dict]:
+        now = time.monotonic()
+        if now - self._trigger_read_at > self.TRIGGER_TTL:
+            self._trigger = self.store.get_trigger()
+            self._trigger_read_at = now
+        return self._trigger
+
+    def _reason(self, environ) -> Optional[str]:
+        header = environ.get("HTTP_X_PROFILE")
+        if self.token and header and hmac.compare_digest(header, self.token):
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "rate"
+        trigger = self._active_trigger()
+        if trigger and trigger["endpoint"] in (None, self._endpoint(environ)):
+            return "admin"
+        return None
+
+    def __call__(self, environ, start_response):
+        reason = self._reason(environ)
+        if reason is None:
+            return self.wsgi_app(environ, start_response)
+
+        meta = {
+            "id": self.store.new_id(),
+            "endpoint": self._endpoint(environ),
+            "method": environ.get("REQUEST_METHOD", "GET"),
+            "path": environ.get("PATH_INFO", ""),
+            "trigger": reason,
+            "interval_ms": self.sampler.interval * 1e3,
+            "pid": os.getpid(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        }
+
+        def profiling_start_response(status, headers, exc_info=None):
+            meta["status"] = int(status.split(" ", 1)[0])
+            if reason == "header":
+                headers = list(headers) + [("X-Profile-Id", meta["id"])]
+            return start_response(status, headers, exc_info)
+
+        thread_id = threading.get_ident()
+        started = time.perf_counter()
+        self.sampler.start(thread_id)
+        try:
+            app_iter = self.wsgi_app(environ, profiling_start_response)
+        except BaseException:
+            self.sampler.stop(thread_id)
+            raise
+        return _ClosingIterator(app_iter, lambda: self._finish(meta, thread_id, started))
+
+    def _finish(self, meta: Dict, thread_id: int, started: float) -> None:
+        stacks = self.sampler.stop(thread_id)
+        meta["duration_ms"] = round((time.perf_counter() - started) * 1e3, 1)
+        meta["samples"] = sum(stacks.values())
+        if meta["duration_ms"] >= self.min_duration_ms:
+            self.store.save(meta, dict(stacks))
+
+
+class TracingMiddleware:
+    """
+    Run every request inside a SERVER span and name it in the response
+    The span continues the caller's trace when the request carries a valid
+    traceparent header, and is returned as "traceresponse: <traceparent>".
+    Streamed bodies are included: the span ends when the response iterable
+    closes.
+    """
+
+    def __init__(self, wsgi_app, tracer: Tracer):
+        self.wsgi_app = wsgi_app
+        self.tracer = tracer
+
+    def __call__(self, environ, start_response):
+        method = environ.get("REQUEST_METHOD", "GET")
+        span = self.tracer.start_request_span(method, environ.get("HTTP_TRACEPARENT"))
+        if span.sampled:
+            span.attributes.update({
+                "http.request.method": method,
+                "url.path": environ.get("PATH_INFO", ""),
+                "client.address": environ.get("REMOTE_ADDR", ""),
+                "user_agent.original": environ.get("HTTP_USER_AGENT", ""),
+            })
+
+        def tracing_start_response(status, headers, exc_info=None):
+            code = int(status.split(" ", 1)[0])
+            span.set_attribute("http.response.status_code", code)
+            if code >= 500:
+                span.status = STATUS_ERROR
+            return start_response(status, list(headers) + [("traceresponse", span.traceparent)], exc_info)
+
+        token = activate(span)
+        try:
+            app_iter = self.wsgi_app(environ, tracing_start_response)
+        except BaseException as exc:
+            span.record_exception(exc)
+            self.tracer.end(span)
+            raise
+        finally:
+            deactivate(token)
+        return _TracedIterator(app_iter, span, lambda: self.tracer.end(span))
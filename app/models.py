@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import IntEnum
 
 from flask_login import UserMixin
 
@@ -55,6 +56,10 @@ class InventoryItem(TimestampMixin, db.Model):
     name = db.Column(db.String(150), nullable=False)
     category = db.Column(db.String(120), nullable=False)
     quantity_available = db.Column(db.Integer, nullable=False, default=0)
+    # Units taken out of quantity_available by active reservations
+    quantity_reserved = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Overrides the category threshold; alert when quantity_available drops to it
+    reorder_threshold = db.Column(db.Integer)
     purchase_date = db.Column(db.Date)
     price = db.Column(db.Numeric(10, 2))
 
@@ -64,8 +69,105 @@ class InventoryItem(TimestampMixin, db.Model):
         return f"<InventoryItem {self.name}>"
 
 
+class CategoryThreshold(TimestampMixin, db.Model):
+    """Reorder threshold for every item in a category without its own."""
+
+    __tablename__ = "category_thresholds"
+
+    category = db.Column(db.String(120), primary_key=True)
+    threshold = db.Column(db.Integer, nullable=False)
+
+
+class StockAlert(db.Model):
+    """An item at or below its reorder threshold; opened and resolved as stock changes."""
+
+    __tablename__ = "stock_alerts"
+    __table_args__ = (
+        db.Index("ix_stock_alerts_item_status", "item_id", "status"),
+        db.Index("ix_stock_alerts_status_notified_at", "status", "notified_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(
+        db.Integer, db.ForeignKey("inventory_items.id", ondelete="CASCADE"), nullable=False
+    )
+    quantity = db.Column(db.Integer, nullable=False)
+    threshold = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="open")
+    opened_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+    notified_at = db.Column(db.DateTime)
+
+    item = db.relationship("InventoryItem")
+
+    def __repr__(self) -> str:
+        return f"<StockAlert {self.item_id} {self.status}>"
+
+
+class UtilizationSnapshot(db.Model):
+    """Per-day loan counts for one item and department, written by ``flask reports snapshot``."""
+
+    __tablename__ = "utilization_snapshots"
+
+    day = db.Column(db.Date, primary_key=True)
+    # No foreign key: history outlives deleted items, like the archive tables
+    item_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    department = db.Column(db.String(120), primary_key=True)
+    on_loan = db.Column(db.Integer, nullable=False, default=0)
+    started = db.Column(db.Integer, nullable=False, default=0)
+    returned = db.Column(db.Integer, nullable=False, default=0)
+    returned_days = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<UtilizationSnapshot {self.day} {self.item_id} {self.department}>"
+
+
+class DemandForecast(db.Model):
+    """A reorder recommendation from the last ``flask reports forecast`` run, which replaces them all."""
+
+    __tablename__ = "demand_forecasts"
+    __table_args__ = (
+        db.Index("ix_demand_forecasts_reorder_quantity", "reorder_quantity"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # "name" for a normalized requested item name, "category" for the matched category
+    scope = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(150), nullable=False)
+    category = db.Column(db.String(120))
+    # Best-matching item at forecast time; no foreign key, the row is a report
+    item_id = db.Column(db.Integer)
+    requests = db.Column(db.Integer, nullable=False)
+    weekly_forecast = db.Column(db.Float, nullable=False)
+    demand = db.Column(db.Float, nullable=False)
+    safety_stock = db.Column(db.Float, nullable=False)
+    available = db.Column(db.Integer, nullable=False)
+    reorder_quantity = db.Column(db.Integer, nullable=False)
+    model = db.Column(db.String(20), nullable=False)
+    generated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<DemandForecast {self.scope} {self.name}>"
+
+
+class WebSession(db.Model):
+    """Server-side session data (see app/sessions.py), keyed by a hash of the cookie token."""
+
+    __tablename__ = "web_sessions"
+
+    id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<WebSession {self.id[:8]} {self.expires_at}>"
+
+
 class ItemAssignment(TimestampMixin, db.Model):
     __tablename__ = "item_assignments"
+    __table_args__ = (
+        db.Index("ix_item_assignments_status_updated_at", "status", "updated_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     item_id = db.Column(db.Integer, db.ForeignKey("inventory_items.id"), nullable=False)
@@ -80,6 +182,9 @@ class ItemAssignment(TimestampMixin, db.Model):
 
 class ItemRequest(TimestampMixin, db.Model):
     __tablename__ = "item_requests"
+    __table_args__ = (
+        db.Index("ix_item_requests_status_updated_at", "status", "updated_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     staff_id = db.Column(db.Integer, db.ForeignKey("staff_users.id"), nullable=False)
@@ -90,6 +195,67 @@ class ItemRequest(TimestampMixin, db.Model):
     staff_user = db.relationship("StaffUser", back_populates="requests")
 
 
+class ItemReservation(TimestampMixin, db.Model):
+    """Stock held for a pending request until it is approved, released or expires."""
+
+    __tablename__ = "item_reservations"
+    __table_args__ = (
+        # The expiry sweep reads held rows in expires_at order.
+        db.Index("ix_item_reservations_status_expires_at", "status", "expires_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, db.ForeignKey("inventory_items.id"), nullable=False, index=True)
+    request_id = db.Column(
+        db.Integer,
+        db.ForeignKey("item_requests.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    status = db.Column(db.String(20), nullable=False, default="held")
+    expires_at = db.Column(db.DateTime, nullable=False)
+    actor_id = db.Column(db.Integer)
+
+    item = db.relationship("InventoryItem")
+    request = db.relationship("ItemRequest")
+
+    def __repr__(self) -> str:
+        return f"<ItemReservation {self.item_id} for {self.request_id} {self.status}>"
+
+
+class ItemRequestArchive(TimestampMixin, db.Model):
+    """Closed requests moved out of ``item_requests`` by ``flask archive run``."""
+
+    __tablename__ = "item_requests_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    staff_id = db.Column(db.Integer, db.ForeignKey("staff_users.id"), nullable=False, index=True)
+    item_name = db.Column(db.String(150), nullable=False)
+    justification = db.Column(db.Text)
+    status = db.Column(db.String(50))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    staff_user = db.relationship("StaffUser")
+
+
+class ItemAssignmentArchive(TimestampMixin, db.Model):
+    """Returned assignments moved out of ``item_assignments`` by ``flask archive run``."""
+
+    __tablename__ = "item_assignments_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    item_id = db.Column(db.Integer, db.ForeignKey("inventory_items.id"), nullable=False, index=True)
+    staff_id = db.Column(db.Integer, db.ForeignKey("staff_users.id"), nullable=False, index=True)
+    allocation_date = db.Column(db.Date)
+    return_date = db.Column(db.Date)
+    status = db.Column(db.String(50))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    item = db.relationship("InventoryItem")
+    staff_user = db.relationship("StaffUser")
+
+
 class Feedback(TimestampMixin, db.Model):
     __tablename__ = "feedback"
 
@@ -105,6 +271,56 @@ class Feedback(TimestampMixin, db.Model):
     staff_user = db.relationship("StaffUser")
 
 
+class AuditEntity(IntEnum):
+    REQUEST = 1
+    ASSIGNMENT = 2
+    ITEM = 3
+    RESERVATION = 4
+
+
+class AuditAction(IntEnum):
+    REQUEST_CREATED = 1
+    REQUEST_APPROVED = 2
+    REQUEST_REJECTED = 3
+    ASSIGNMENT_CREATED = 10
+    RETURN_REQUESTED = 11
+    RETURN_COMPLETED = 12
+    RESERVATION_HELD = 20
+    RESERVATION_RELEASED = 21
+    RESERVATION_EXPIRED = 22
+
+
+class AuditEvent(db.Model):
+    """Append-only event row; kept narrow so the table can take high write volume.
+
+    On MySQL the migration widens the primary key to ``(id, ts)`` so the table
+    can be range-partitioned by month (see ``flask audit partitions``).
+    """
+
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        db.Index("ix_audit_events_entity_ts", "entity", "entity_id", "ts"),
+        db.Index("ix_audit_events_staff_ts", "staff_id", "ts"),
+        db.Index("ix_audit_events_item_ts", "item_id", "ts"),
+    )
+
+    id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    ts = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    entity = db.Column(db.SmallInteger, nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.SmallInteger, nullable=False)
+    actor_id = db.Column(db.Integer)
+    staff_id = db.Column(db.Integer)
+    item_id = db.Column(db.Integer)
+
+    def __repr__(self) -> str:
+        return f"<AuditEvent {self.entity}:{self.entity_id} {self.action}>"
+
+
 @login_manager.user_loader
 def load_user(user_id: str):
     if not user_id or ":" not in user_id:
@@ -0,0 +1,274 @@
+"""Low-overhead stack sampling for the opt-in ProfilingMiddleware.
+
+One daemon thread per process wakes every `interval` seconds and records the
+current stack of each thread that is serving a profiled request (read from
+``sys._current_frames()``), so unprofiled requests pay nothing and profiled
+ones pay one frame walk per sample. Stacks are kept collapsed
+("outer;inner;leaf" -> samples), the format flamegraph.pl reads, and are
+converted to speedscope JSON on download.
+
+Only sync and gthread workers are supported: under gevent every greenlet
+shares one OS thread, so samples cannot be attributed to a request.
+"""
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROFILE_ID = re.compile(r"^\d{13}-[0-9a-f]{6}$")
+FORMATS = {
+    "speedscope": ("application/json", "speedscope.json"),
+    "collapsed": ("text/plain", "collapsed.txt"),
+}
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(ROOT + os.sep):
+        return os.path.relpath(filename, ROOT)
+    _, marker, rest = filename.rpartition("site-packages" + os.sep)
+    return rest if marker else os.path.basename(filename)
+
+
+class Sampler:
+    """Samples the stacks of registered threads from a single background thread"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stacks: Dict[int, Counter] = {}
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self) -> None:
+        # Threads do not survive fork, so a preloaded gunicorn master's sampler
+        # must be restarted in each worker.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def start(self, thread_id: int) -> Counter:
+        """Begin sampling `thread_id`; the returned counter fills until stop()"""
+        stacks = Counter()
+        with self._lock:
+            self._stacks[thread_id] = stacks
+            self._ensure_thread()
+        self._wake.set()
+        return stacks
+
+    def stop(self, thread_id: int) -> Counter:
+        with self._lock:
+            stacks = self._stacks.pop(thread_id, Counter())
+            if not self._stacks:
+                self._wake.clear()
+        return stacks
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                targets = list(self._stacks.items())
+            frames = sys._current_frames()
+            collapsed = [
+                (thread_id, stacks, self._collapse(frames[thread_id]))
+                for thread_id, stacks in targets if thread_id in frames
+            ]
+            with self._lock:
+                # Only count into counters that stop() has not handed back yet
+                for thread_id, stacks, stack in collapsed:
+                    if self._stacks.get(thread_id) is stacks:
+                        stacks[stack] += 1
+            # Dropping the frames can finalize an unclosed response (and so call
+            # stop()) on this thread, so it must happen outside the lock.
+            del frames, collapsed
+
+
+_samplers: Dict[float, Sampler] = {}
+
+
+def get_sampler(interval: float) -> Sampler:
+    sampler = _samplers.get(interval)
+    if sampler is None:
+        sampler = _samplers.setdefault(interval, Sampler(interval))
+    return sampler
+
+
+def to_collapsed(stacks: Dict[str, int]) -> str:
+    """flamegraph.pl / speedscope input: one "frame;frame;frame count" line per stack"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def to_speedscope(name: str, stacks: Dict[str, int], interval_ms: float) -> Dict:
+    """A single sampled profile in speedscope's file format, weighted in milliseconds"""
+    frames: List[Dict] = []
+    index: Dict[str, int] = {}
+    samples, weights = [], []
+    for stack, count in sorted(stacks.items()):
+        sample = []
+        for label in stack.split(";"):
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(count * interval_ms)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "ecs-flask-app",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+def render(name: str, stacks: Dict[str, int], interval_ms: float, fmt: str) -> str:
+    if fmt == "speedscope":
+        return json.dumps(to_speedscope(name, stacks, interval_ms))
+    return to_collapsed(stacks)
+
+
+class ProfileStore:
+    """
+    Profiles as files in one directory: <id>.meta.json and <id>.stacks.json
+    Ids start with the epoch milliseconds, so sorting by name is sorting by age.
+    The admin trigger lives next to them in trigger.json.
+    """
+
+    def __init__(self, directory: str, keep: int = 200):
+        self.directory = directory
+        self.keep = keep
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{int(time.time() * 1000):013d}-{secrets.token_hex(3)}"
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, name: str, payload) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = self._path(f".{name}.{os.getpid()}.tmp")
+        with open(temporary, "w") as fh:
+            json.dump(payload, fh)
+        os.replace(temporary, self._path(name))
+
+    def _read(self, name: str):
+        try:
+            with open(self._path(name)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".meta.json")] for name in names if name.endswith(".meta.json"))
+
+    def save(self, meta: Dict, stacks: Dict[str, int]) -> str:
+        profile_id = meta["id"]
+        self._write(f"{profile_id}.stacks.json", stacks)
+        self._write(f"{profile_id}.meta.json", meta)  # last, so listed profiles are complete
+        self._prune()
+        return profile_id
+
+    def _remove(self, ids: Iterable[str]) -> None:
+        for profile_id in ids:
+            for suffix in (".meta.json", ".stacks.json"):
+                try:
+                    os.remove(self._path(profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _prune(self) -> None:
+        self._remove(self._ids()[:-self.keep])
+
+    def list(self) -> List[Dict]:
+        """Metadata of every stored profile, newest first"""
+        metas = (self._read(f"{profile_id}.meta.json") for profile_id in reversed(self._ids()))
+        return [meta for meta in metas if meta]
+
+    def get(self, profile_id: str) -> Optional[Tuple[Dict, Dict[str, int]]]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        meta = self._read(f"{profile_id}.meta.json")
+        stacks = self._read(f"{profile_id}.stacks.json")
+        return (meta, stacks) if meta and stacks is not None else None
+
+    def aggregate(self, endpoint: str) -> Tuple[int, Counter]:
+        """(profiles, summed stacks) over every stored profile of one endpoint"""
+        total, count = Counter(), 0
+        for meta in self.list():
+            if meta.get("endpoint") == endpoint:
+                stacks = self._read(f"{meta['id']}.stacks.json")
+                if stacks:
+                    total.update(stacks)
+                    count += 1
+        return count, total
+
+    def clear(self) -> int:
+        """Delete every stored profile; returns how many there were"""
+        ids = self._ids()
+        self._remove(ids)
+        return len(ids)
+
+    def set_trigger(self, endpoint: Optional[str], until: float) -> None:
+        """Profile every request to `endpoint` (None: every endpoint) until the epoch time `until`"""
+        self._write("trigger.json", {"endpoint": endpoint, "until": until})
+
+    def get_trigger(self) -> Optional[Dict]:
+        trigger = self._read("trigger.json")
+        if trigger and trigger.get("until", 0) > time.time():
+            return trigger
+        return None
+
+
+def summarize(metas: List[Dict]) -> List[Dict]:
+    """Per-endpoint profile count, median and worst duration, slowest endpoints first"""
+    durations: Dict[str, List[float]] = {}
+    for meta in metas:
+        durations.setdefault(meta["endpoint"], []).append(meta["duration_ms"])
+    rows = []
+    for endpoint, values in durations.items():
+        values.sort()
+        rows.append({
+            "endpoint": endpoint,
+            "profiles": len(values),
+            "median_ms": values[len(values) // 2],
+            "max_ms": values[-1],
+        })
+    return sorted(rows, key=lambda row: -row["max_ms"])
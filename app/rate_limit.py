@@ -0,0 +1,221 @@
+"""Token-bucket rate limits for the login and staff write endpoints.
+
+Each rule gives an endpoint a bucket per client IP (as resolved by ProxyFix)
+and/or per account: the submitted email for logins, the signed-in user id
+(read from the session cookie, not the database) for staff writes. A bucket
+holds up to N tokens and refills at N per period; a POST spends one token
+from each of its buckets and is answered 429 with Retry-After when one is
+empty. Checks run in a before_request hook, so a throttled attempt never
+reaches the password hash or the database.
+
+Buckets live in process memory by default (per gunicorn worker, so the
+effective limit is N times the worker count) or in Redis, shared by every
+worker and pod. FakeRedis stands in for Redis locally, through the same
+code path.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from werkzeug.exceptions import TooManyRequests
+
+logger = logging.getLogger("app.ratelimit")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+SCOPES = ("ip", "account")
+
+
+class Limit(NamedTuple):
+    capacity: int
+    rate: float  # tokens per second
+
+    @classmethod
+    def parse(cls, raw: str) -> "Limit":
+        """Parse "10/minute": a bucket of 10 tokens refilled at 10 per minute"""
+        count, _, period = raw.strip().partition("/")
+        if period.rstrip("s") not in PERIODS or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid rate limit {raw!r}; expected e.g. 10/minute")
+        return cls(int(count), int(count) / PERIODS[period.rstrip("s")])
+
+
+def parse_rules(raw: Dict[str, str]) -> Dict[str, List[Tuple[str, Limit]]]:
+    """{"admin.login:ip": "60/minute", ...} -> {"admin.login": [("ip", Limit)], ...}"""
+    rules: Dict[str, List[Tuple[str, Limit]]] = {}
+    for name, limit in raw.items():
+        endpoint, _, scope = name.rpartition(":")
+        if scope not in SCOPES or not endpoint:
+            raise ValueError(f"Invalid rate limit key {name!r}; expected <endpoint>:ip or <endpoint>:account")
+        rules.setdefault(endpoint, []).append((scope, Limit.parse(limit)))
+    for scoped in rules.values():
+        scoped.sort(key=lambda rule: SCOPES.index(rule[0]))  # IP first: it needs no form parsing
+    return rules
+
+
+def _refill(tokens: float, updated: float, now: float, limit: Limit) -> Tuple[float, float]:
+    """(tokens left, seconds to wait) after trying to spend one token"""
+    tokens = min(limit.capacity, tokens + max(0.0, now - updated) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.rate
+
+
+class MemoryBackend:
+    """Buckets in a dict, least recently used evicted beyond max_keys"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit) -> float:
+        """Spend a token from `key`'s bucket; returns 0 or the seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens, wait = _refill(tokens, updated, now, limit)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# Returns the seconds to wait (0: allowed) as a string, since Redis truncates Lua numbers to integers
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """
+    Buckets shared through Redis, updated atomically by TOKEN_BUCKET_SCRIPT
+    The script reads Redis' clock, so pods with skewed clocks agree. When
+    Redis cannot be reached requests are let through (and logged at most
+    once a minute): a limiter outage must not lock everyone out.
+    """
+
+    ERROR_LOG_INTERVAL = 60.0
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._last_error = 0.0
+
+    def take(self, key: str, limit: Limit) -> float:
+        try:
+            wait = self.client.eval(TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, limit.capacity, limit.rate)
+        except Exception:
+            now = time.monotonic()
+            if now - self._last_error > self.ERROR_LOG_INTERVAL:
+                self._last_error = now
+                logger.warning("Rate limit backend unavailable; not limiting", exc_info=True)
+            return 0.0
+        return float(wait)
+
+
+class FakeRedis:
+    """
+    Just enough of a Redis client for RedisBackend, in process
+    eval() runs TOKEN_BUCKET_SCRIPT's logic in Python under a lock, which
+    stands in for Redis running scripts one at a time.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def eval(self, script: str, numkeys: int, key: str, capacity, rate) -> str:
+        if script != TOKEN_BUCKET_SCRIPT or numkeys != 1:
+            raise NotImplementedError("FakeRedis only runs the token bucket script")
+        limit = Limit(int(capacity), float(rate))
+        now = time.time()
+        with self._lock:
+            tokens, updated, expires = self._hashes.get(key, (limit.capacity, now, math.inf))
+            if expires <= now:
+                tokens, updated = limit.capacity, now
+            tokens, wait = _refill(tokens, updated, now, limit)
+            self._hashes[key] = (tokens, now, now + limit.capacity / limit.rate)
+        return str(wait)
+
+
+def backend_for(storage: str, max_keys: int):
+    """RATE_LIMIT_STORAGE: "memory", "fake" or a redis:// URL (needs the redis package)"""
+    if storage == "memory":
+        return MemoryBackend(max_keys)
+    if storage == "fake":
+        return RedisBackend(FakeRedis())
+    if storage.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_STORAGE is a Redis URL but the redis package is not installed")
+        return RedisBackend(redis.Redis.from_url(storage, socket_timeout=0.2, socket_connect_timeout=0.2))
+    raise ValueError(f"Unknown RATE_LIMIT_STORAGE {storage!r}")
+
+
+def _account_key(value: str) -> str:
+    # Emails are hashed so the shared store never holds them
+    return hashlib.blake2b(value.encode(), digest_size=12).hexdigest()
+
+
+class RateLimiter:
+    def __init__(self, backend, rules: Dict[str, List[Tuple[str, Limit]]]):
+        self.backend = backend
+        self.rules = rules
+
+    def check(self, endpoint: str, ip: Optional[str], account: Optional[str]) -> float:
+        """Spend a token from each of the endpoint's buckets; 0 or the seconds to wait"""
+        for scope, limit in self.rules.get(endpoint, ()):
+            value = ip if scope == "ip" else account
+            if not value:
+                continue
+            wait = self.backend.take(f"{endpoint}:{scope}:{value}", limit)
+            if wait:
+                logger.info(
+                    "Rate limit exceeded",
+                    extra={"endpoint": endpoint, "scope": scope, "retry_after": round(wait, 1)},
+                )
+                return wait
+        return 0.0
+
+
+def _account(endpoint: str) -> Optional[str]:
+    from flask import request, session
+
+    if endpoint.endswith(".login"):
+        email = request.form.get("email", "").strip().lower()
+        return _account_key(email) if email else None
+    return session.get("_user_id")  # Flask-Login's key; no user is loaded
+
+
+def register_rate_limits(app, limiter: RateLimiter) -> None:
+    """Check POSTs to limited endpoints before the view (and its login_required) runs"""
+    from flask import request
+
+    @app.before_request
+    def enforce_rate_limits():
+        endpoint = request.endpoint
+        if request.method != "POST" or endpoint not in limiter.rules:
+            return
+        wait = limiter.check(endpoint, request.remote_addr, _account(endpoint))
+        if wait:
+            raise TooManyRequests("Too many attempts. Please wait and try again.", retry_after=math.ceil(wait))
@@ -4,6 +4,12 @@ from .staff_repository import StaffRepository
 from .assignment_repository import AssignmentRepository
 from .request_repository import RequestRepository
 from .feedback_repository import FeedbackRepository
+from .audit_repository import AuditRepository
+from .archive_repository import ArchiveRepository
+from .reservation_repository import ReservationRepository
+from .stock_alert_repository import StockAlertRepository
+from .utilization_repository import UtilizationRepository
+from .forecast_repository import ForecastRepository
 
 __all__ = [
     "AdminRepository",
@@ -12,5 +18,11 @@ __all__ = [
     "AssignmentRepository",
     "RequestRepository",
     "FeedbackRepository",
+    "AuditRepository",
+    "ArchiveRepository",
+    "ReservationRepository",
+    "StockAlertRepository",
+    "UtilizationRepository",
+    "ForecastRepository",
 ]
 
@@ -0,0 +1,74 @@
+from typing import List
+from datetime import datetime
+from sqlalchemy import delete, insert, literal, select
+from ..models import ItemAssignment, ItemAssignmentArchive, ItemRequest, ItemRequestArchive
+from ..extensions import db
+
+
+REQUEST_COLUMNS = ("id", "staff_id", "item_name", "justification", "status", "created_at", "updated_at")
+ASSIGNMENT_COLUMNS = (
+    "id", "item_id", "staff_id", "allocation_date", "return_date", "status", "created_at", "updated_at",
+)
+
+
+class ArchiveRepository:
+    """Data access layer for moving closed rows into the archive tables"""
+
+    CLOSED_REQUEST_STATUSES = ("approved", "rejected")
+    CLOSED_ASSIGNMENT_STATUSES = ("returned",)
+
+    @staticmethod
+    def get_closed_request_ids(cutoff: datetime, limit: int) -> List[int]:
+        """Get and lock ids of closed requests last updated before the cutoff"""
+        return db.session.execute(
+            select(ItemRequest.id)
+            .where(
+                ItemRequest.status.in_(ArchiveRepository.CLOSED_REQUEST_STATUSES),
+                ItemRequest.updated_at < cutoff,
+            )
+            .order_by(ItemRequest.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+    @staticmethod
+    def get_closed_assignment_ids(cutoff: datetime, limit: int) -> List[int]:
+        """Get and lock ids of returned assignments last updated before the cutoff"""
+        return db.session.execute(
+            select(ItemAssignment.id)
+            .where(
+                ItemAssignment.status.in_(ArchiveRepository.CLOSED_ASSIGNMENT_STATUSES),
+                ItemAssignment.updated_at < cutoff,
+            )
+            .order_by(ItemAssignment.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+    @staticmethod
+    def _move(source, target, columns, ids: List[int]) -> int:
+        """Copy rows by primary key into the archive and delete them from the hot table"""
+        archived_at = datetime.utcnow()
+        db.session.execute(
+            insert(target).from_select(
+                [*columns, "archived_at"],
+                select(
+                    *(getattr(source, name) for name in columns),
+                    literal(archived_at),
+                ).where(source.id.in_(ids)),
+            )
+        )
+        result = db.session.execute(
+            delete(source).where(source.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def move_requests(ids: List[int]) -> int:
+        """Move closed requests into item_requests_archive (caller commits)"""
+        return ArchiveRepository._move(ItemRequest, ItemRequestArchive, REQUEST_COLUMNS, ids)
+
+    @staticmethod
+    def move_assignments(ids: List[int]) -> int:
+        """Move returned assignments into item_assignments_archive (caller commits)"""
+        return ArchiveRepository._move(ItemAssignment, ItemAssignmentArchive, ASSIGNMENT_COLUMNS, ids)
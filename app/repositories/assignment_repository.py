@@ -1,7 +1,10 @@
 from typing import Optional, List
 from datetime import datetime
-from ..models import ItemAssignment
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from ..models import ItemAssignment, ItemAssignmentArchive
 from ..extensions import db
+from .pagination import keyset_page, keyset_page_async
 
 
 class AssignmentRepository:
@@ -13,16 +16,63 @@ class AssignmentRepository:
         return ItemAssignment.query.get(assignment_id)
 
     @staticmethod
-    def find_by_staff_id(staff_id: int) -> List[ItemAssignment]:
-        """Find all assignments for a staff member"""
-        return ItemAssignment.query.filter_by(
+    def find_by_staff_id(staff_id: int, include_archived: bool = False) -> List[ItemAssignment]:
+        """Find all assignments for a staff member with their item, optionally including archived ones"""
+        assignments = ItemAssignment.query.options(
+            joinedload(ItemAssignment.item)
+        ).filter_by(
             staff_id=staff_id
         ).order_by(ItemAssignment.created_at.desc()).all()
+        if not include_archived:
+            return assignments
+        archived = ItemAssignmentArchive.query.options(
+            joinedload(ItemAssignmentArchive.item)
+        ).filter_by(
+            staff_id=staff_id
+        ).order_by(ItemAssignmentArchive.created_at.desc()).all()
+        return sorted(assignments + archived, key=lambda a: a.created_at, reverse=True)
+
+    @staticmethod
+    def create_many(rows: List[dict]) -> None:
+        """Bulk insert assignments from column dictionaries (caller commits)"""
+        if rows:
+            db.session.execute(insert(ItemAssignment), rows)
+
+    @staticmethod
+    def get_page(fields: List[str], after_id: int = None, limit: int = 50,
+                 status: str = None, staff_id: int = None, item_id: int = None) -> List:
+        """Get a keyset page of assignment columns"""
+        return keyset_page(
+            ItemAssignment, fields, after_id, limit,
+            AssignmentRepository._page_criteria(status, staff_id, item_id),
+        )
+
+    @staticmethod
+    async def get_page_async(fields: List[str], after_id: int = None, limit: int = 50,
+                             status: str = None, staff_id: int = None, item_id: int = None) -> List:
+        """Async variant of get_page"""
+        return await keyset_page_async(
+            ItemAssignment, fields, after_id, limit,
+            AssignmentRepository._page_criteria(status, staff_id, item_id),
+        )
+
+    @staticmethod
+    def _page_criteria(status: str = None, staff_id: int = None, item_id: int = None) -> list:
+        criteria = []
+        if status:
+            criteria.append(ItemAssignment.status == status)
+        if staff_id is not None:
+            criteria.append(ItemAssignment.staff_id == staff_id)
+        if item_id is not None:
+            criteria.append(ItemAssignment.item_id == item_id)
+        return criteria
 
     @staticmethod
     def get_pending_returns() -> List[ItemAssignment]:
-        """Get all assignments with return_requested status"""
-        return ItemAssignment.query.filter_by(
+        """Get all assignments with return_requested status, with their item and staff user"""
+        return ItemAssignment.query.options(
+            joinedload(ItemAssignment.item), joinedload(ItemAssignment.staff_user)
+        ).filter_by(
             status="return_requested"
         ).order_by(ItemAssignment.updated_at.desc()).all()
 
@@ -76,7 +126,8 @@ class AssignmentRepository:
 
     @staticmethod
     def delete_by_item_id(item_id: int) -> int:
-        """Delete all assignments for an item"""
+        """Delete all assignments for an item, including archived ones"""
+        ItemAssignmentArchive.query.filter_by(item_id=item_id).delete()
         count = ItemAssignment.query.filter_by(item_id=item_id).delete()
         db.session.commit()
         return count
@@ -0,0 +1,121 @@
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy import and_, insert, or_, select, text
+from ..models import AuditEvent
+from ..extensions import db
+
+
+class AuditRepository:
+    """Data access layer for AuditEvent operations"""
+
+    TIMELINE_COLUMNS = (
+        AuditEvent.id,
+        AuditEvent.ts,
+        AuditEvent.entity,
+        AuditEvent.entity_id,
+        AuditEvent.action,
+        AuditEvent.actor_id,
+        AuditEvent.staff_id,
+        AuditEvent.item_id,
+    )
+
+    @staticmethod
+    def add(entity: int, entity_id: int, action: int, actor_id: int = None,
+            staff_id: int = None, item_id: int = None) -> AuditEvent:
+        """
+        Stage an audit event in the current session
+        The caller's transaction commits it together with the state change
+        """
+        event = AuditEvent(
+            ts=datetime.utcnow(),
+            entity=int(entity),
+            entity_id=entity_id,
+            action=int(action),
+            actor_id=actor_id,
+            staff_id=staff_id,
+            item_id=item_id,
+        )
+        db.session.add(event)
+        return event
+
+    @staticmethod
+    def add_many(rows: List[dict]) -> None:
+        """
+        Bulk insert audit events from column dictionaries
+        The caller's transaction commits them together with the state change
+        """
+        if rows:
+            db.session.execute(insert(AuditEvent), rows)
+
+    @staticmethod
+    def _timeline(criteria, before: Optional[datetime], before_id: Optional[int], limit: int) -> List:
+        """
+        Keyset page of events newest first, served from a (key, ts) index
+        The cursor is the last event's (ts, id), so events sharing its
+        timestamp are not skipped; without before_id only ts is compared
+        """
+        stmt = select(*AuditRepository.TIMELINE_COLUMNS).where(*criteria)
+        if before is not None and before_id is not None:
+            stmt = stmt.where(or_(
+                AuditEvent.ts < before,
+                and_(AuditEvent.ts == before, AuditEvent.id < before_id),
+            ))
+        elif before is not None:
+            stmt = stmt.where(AuditEvent.ts < before)
+        stmt = stmt.order_by(AuditEvent.ts.desc(), AuditEvent.id.desc()).limit(limit)
+        return db.session.execute(stmt).all()
+
+    @staticmethod
+    def get_entity_timeline(entity: int, entity_id: int, before: datetime = None,
+                            before_id: int = None, limit: int = 50) -> List:
+        """Get events for a single request/assignment/item"""
+        return AuditRepository._timeline(
+            (AuditEvent.entity == int(entity), AuditEvent.entity_id == entity_id),
+            before,
+            before_id,
+            limit,
+        )
+
+    @staticmethod
+    def get_item_timeline(item_id: int, before: datetime = None, before_id: int = None,
+                          limit: int = 50) -> List:
+        """Get events touching an inventory item"""
+        return AuditRepository._timeline((AuditEvent.item_id == item_id,), before, before_id, limit)
+
+    @staticmethod
+    def get_staff_timeline(staff_id: int, before: datetime = None, before_id: int = None,
+                           limit: int = 50) -> List:
+        """Get events touching a staff member"""
+        return AuditRepository._timeline((AuditEvent.staff_id == staff_id,), before, before_id, limit)
+
+    @staticmethod
+    def get_partitions() -> List[tuple]:
+        """Get (name, upper bound in days) for each audit_events partition (MySQL only)"""
+        rows = db.session.execute(text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_events' "
+            "AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        )).all()
+        return [(name, description) for name, description in rows]
+
+    @staticmethod
+    def split_future_partition(boundaries: List[tuple]) -> None:
+        """Split the catch-all partition into the given (name, 'YYYY-MM-DD') month ranges"""
+        parts = ", ".join(
+            f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{bound}'))"
+            for name, bound in boundaries
+        )
+        db.session.execute(text(
+            "ALTER TABLE audit_events REORGANIZE PARTITION p_future INTO "
+            f"({parts}, PARTITION p_future VALUES LESS THAN MAXVALUE)"
+        ))
+
+    @staticmethod
+    def drop_partitions(names: List[str]) -> None:
+        """Drop whole monthly partitions; O(1) compared to deleting rows"""
+        if names:
+            db.session.execute(text(
+                f"ALTER TABLE audit_events DROP PARTITION {', '.join(names)}"
+            ))
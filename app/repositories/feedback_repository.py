@@ -1,7 +1,9 @@
 from typing import List
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from ..models import Feedback
 from ..extensions import db
+from .pagination import keyset_page
 
 
 class FeedbackRepository:
@@ -26,11 +28,18 @@ class FeedbackRepository:
 
     @staticmethod
     def get_recent(limit: int = 10) -> List[Feedback]:
-        """Get recent feedback entries"""
-        return Feedback.query.order_by(
+        """Get recent feedback entries with their staff user"""
+        return Feedback.query.options(
+            joinedload(Feedback.staff_user)
+        ).order_by(
             Feedback.created_at.desc()
         ).limit(limit).all()
 
+    @staticmethod
+    def get_page(fields: List[str], after_id: int = None, limit: int = 50) -> List:
+        """Get a keyset page of feedback columns"""
+        return keyset_page(Feedback, fields, after_id, limit)
+
     @staticmethod
     def get_count() -> int:
         """Get total count of feedback entries"""
@@ -0,0 +1,32 @@
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select
+from ..models import DemandForecast
+from ..extensions import db
+
+
+class ForecastRepository:
+    """Data access layer for DemandForecast operations"""
+
+    @staticmethod
+    def replace_all(rows: List[dict]) -> int:
+        """Replace every forecast with rows of column values (caller commits)"""
+        db.session.execute(delete(DemandForecast))
+        if rows:
+            db.session.execute(insert(DemandForecast), rows)
+        return len(rows)
+
+    @staticmethod
+    def get_reorders(limit: int = None) -> List[DemandForecast]:
+        """Get forecasts that recommend reordering, largest quantity first"""
+        query = DemandForecast.query.filter(DemandForecast.reorder_quantity > 0).order_by(
+            DemandForecast.reorder_quantity.desc(), DemandForecast.scope.asc(), DemandForecast.name.asc()
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def get_generated_at() -> Optional[datetime]:
+        """Get when the current forecasts were generated"""
+        return db.session.scalar(select(func.max(DemandForecast.generated_at)))
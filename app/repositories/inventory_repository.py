@@ -1,7 +1,9 @@
-from typing import Optional, List
-from sqlalchemy import func, or_
-from ..models import InventoryItem
+from typing import Dict, Iterator, Optional, List
+from datetime import datetime
+from sqlalchemy import Float, cast, func, or_, select, update
+from ..models import InventoryItem, ItemAssignment
 from ..extensions import db
+from .pagination import keyset_page, keyset_page_async
 
 
 class InventoryRepository:
@@ -28,6 +30,101 @@ class InventoryRepository:
             )
         ).order_by(InventoryItem.created_at.desc()).all()
 
+    @staticmethod
+    def get_columns(item_id: int, fields: List[str]):
+        """Get selected columns for one item without hydrating the entity"""
+        return db.session.execute(
+            select(*(getattr(InventoryItem, name) for name in fields))
+            .where(InventoryItem.id == item_id)
+        ).first()
+
+    @staticmethod
+    def _search_criteria(query: str = None) -> tuple:
+        if not query:
+            return ()
+        pattern = f"%{query}%"
+        return (
+            or_(
+                InventoryItem.name.ilike(pattern),
+                InventoryItem.category.ilike(pattern),
+            ),
+        )
+
+    @staticmethod
+    def get_page(fields: List[str], after_id: int = None, limit: int = 50, query: str = None) -> List:
+        """Get a keyset page of item columns, optionally filtered by name or category"""
+        return keyset_page(
+            InventoryItem, fields, after_id, limit, InventoryRepository._search_criteria(query)
+        )
+
+    @staticmethod
+    async def get_page_async(fields: List[str], after_id: int = None, limit: int = 50,
+                             query: str = None) -> List:
+        """Async variant of get_page"""
+        return await keyset_page_async(
+            InventoryItem, fields, after_id, limit, InventoryRepository._search_criteria(query)
+        )
+
+    @staticmethod
+    def iter_all(query: str = None, batch_size: int = 500) -> Iterator[InventoryItem]:
+        """Iterate items newest first, fetching `batch_size` rows at a time"""
+        return InventoryItem.query.filter(
+            *InventoryRepository._search_criteria(query)
+        ).order_by(InventoryItem.created_at.desc()).yield_per(batch_size)
+
+    @staticmethod
+    def get_change_signature() -> tuple:
+        """Get (row count, latest updated_at); changes whenever items are added, removed or edited"""
+        return db.session.query(
+            func.count(InventoryItem.id), func.max(InventoryItem.updated_at)
+        ).one()
+
+    @staticmethod
+    def get_match_rows(updated_since=None) -> List[tuple]:
+        """Get (id, name, category) for all items, or only those updated at or after a timestamp"""
+        query = db.session.query(InventoryItem.id, InventoryItem.name, InventoryItem.category)
+        if updated_since is not None:
+            query = query.filter(InventoryItem.updated_at >= updated_since)
+        return query.all()
+
+    @staticmethod
+    def _units_owned():
+        """(subquery, expression) for stock on the shelf, on hold and out on assignment"""
+        on_loan = (
+            select(ItemAssignment.item_id, func.count().label("units"))
+            .where(ItemAssignment.status.in_(("assigned", "return_requested")))
+            .group_by(ItemAssignment.item_id)
+            .subquery()
+        )
+        units = (
+            InventoryItem.quantity_available
+            + InventoryItem.quantity_reserved
+            + func.coalesce(on_loan.c.units, 0)
+        )
+        return on_loan, units
+
+    @staticmethod
+    def get_valuation_rows() -> List[tuple]:
+        """Get (category, units owned, unit price, purchase_date) for every item"""
+        on_loan, units = InventoryRepository._units_owned()
+        return db.session.execute(
+            select(
+                InventoryItem.category,
+                units,
+                cast(InventoryItem.price, Float),
+                InventoryItem.purchase_date,
+            ).outerjoin(on_loan, on_loan.c.item_id == InventoryItem.id)
+        ).tuples().all()
+
+    @staticmethod
+    def get_capacity_rows() -> List[tuple]:
+        """Get (id, name, category, units owned) for every item"""
+        on_loan, units = InventoryRepository._units_owned()
+        return db.session.execute(
+            select(InventoryItem.id, InventoryItem.name, InventoryItem.category, units)
+            .outerjoin(on_loan, on_loan.c.item_id == InventoryItem.id)
+        ).tuples().all()
+
     @staticmethod
     def get_available_items() -> List[InventoryItem]:
         """Get all items with quantity > 0"""
@@ -59,12 +156,14 @@ class InventoryRepository:
         ).order_by(InventoryItem.quantity_available.asc()).all()
 
     @staticmethod
-    def create(name: str, category: str, quantity: int, purchase_date=None, price=None) -> InventoryItem:
+    def create(name: str, category: str, quantity: int, purchase_date=None, price=None,
+               reorder_threshold: int = None) -> InventoryItem:
         """Create a new inventory item"""
         item = InventoryItem(
             name=name.strip(),
             category=category.strip(),
             quantity_available=quantity,
+            reorder_threshold=reorder_threshold,
             purchase_date=purchase_date,
             price=price,
         )
@@ -73,11 +172,13 @@ class InventoryRepository:
         return item
 
     @staticmethod
-    def update(item: InventoryItem, name: str, category: str, quantity: int, purchase_date=None, price=None) -> InventoryItem:
+    def update(item: InventoryItem, name: str, category: str, quantity: int, purchase_date=None, price=None,
+               reorder_threshold: int = None) -> InventoryItem:
         """Update an existing inventory item"""
         item.name = name.strip()
         item.category = category.strip()
         item.quantity_available = quantity
+        item.reorder_threshold = reorder_threshold
         item.purchase_date = purchase_date
         item.price = price
         db.session.commit()
@@ -107,6 +208,85 @@ class InventoryRepository:
         db.session.commit()
         return item
 
+    @staticmethod
+    def get_available_quantities() -> Dict[int, int]:
+        """Get item id -> quantity for every item in stock"""
+        return dict(db.session.execute(
+            select(InventoryItem.id, InventoryItem.quantity_available)
+            .where(InventoryItem.quantity_available > 0)
+        ).all())
+
+    @staticmethod
+    def get_stock_rows() -> List[tuple]:
+        """Get (id, category, quantity_available) for every item"""
+        return db.session.execute(
+            select(InventoryItem.id, InventoryItem.category, InventoryItem.quantity_available)
+        ).tuples().all()
+
+    @staticmethod
+    def lock_quantities(ids: List[int]) -> Dict[int, int]:
+        """Lock the given items in id order and return their current quantities"""
+        return dict(db.session.execute(
+            select(InventoryItem.id, InventoryItem.quantity_available)
+            .where(InventoryItem.id.in_(ids))
+            .order_by(InventoryItem.id)
+            .with_for_update()
+        ).all())
+
+    @staticmethod
+    def decrement_many(amounts: Dict[int, int]) -> None:
+        """Decrement several items' quantities, in id order (caller commits)"""
+        for item_id in sorted(amounts):
+            db.session.execute(
+                update(InventoryItem)
+                .where(InventoryItem.id == item_id)
+                .values(
+                    quantity_available=InventoryItem.quantity_available - amounts[item_id],
+                    updated_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def hold_stock(item_id: int, amount: int = 1) -> bool:
+        """
+        Move units from available to reserved in one conditional UPDATE
+        Returns False when the item does not have enough stock (caller commits)
+        """
+        result = db.session.execute(
+            update(InventoryItem)
+            .where(InventoryItem.id == item_id, InventoryItem.quantity_available >= amount)
+            .values(
+                quantity_available=InventoryItem.quantity_available - amount,
+                quantity_reserved=InventoryItem.quantity_reserved + amount,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def release_stock(item_id: int, amount: int = 1) -> None:
+        """Move units from reserved back to available (caller commits)"""
+        db.session.execute(
+            update(InventoryItem)
+            .where(InventoryItem.id == item_id)
+            .values(
+                quantity_available=InventoryItem.quantity_available + amount,
+                quantity_reserved=InventoryItem.quantity_reserved - amount,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def consume_reserved(item_id: int, amount: int = 1) -> None:
+        """Drop units from reserved once they have been assigned (caller commits)"""
+        db.session.execute(
+            update(InventoryItem)
+            .where(InventoryItem.id == item_id)
+            .values(quantity_reserved=InventoryItem.quantity_reserved - amount)
+            .execution_options(synchronize_session=False)
+        )
+
     @staticmethod
     def get_count() -> int:
         """Get total count of inventory items"""
@@ -120,6 +300,22 @@ class InventoryRepository:
         ).scalar()
         return int(result) if result else 0
 
+    @staticmethod
+    def _stats_statement():
+        return select(
+            func.count(InventoryItem.id),
+            func.coalesce(func.sum(InventoryItem.quantity_available), 0),
+            func.avg(InventoryItem.price),
+        )
+
+    @staticmethod
+    async def get_stats_async() -> tuple:
+        """Get (count, total quantity, average price) in one round trip"""
+        from ..async_db import async_session
+
+        async with async_session() as session:
+            return (await session.execute(InventoryRepository._stats_statement())).one()
+
     @staticmethod
     def get_average_price():
         """Get average price of all items"""
@@ -0,0 +1,33 @@
+"""Keyset pagination helpers that select plain columns instead of ORM entities"""
+from typing import List, Sequence
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from ..extensions import db
+
+
+def keyset_statement(model, fields: Sequence[str], after_id: int = None, limit: int = 50,
+                     criteria: Sequence = ()) -> Select:
+    """Build the page query; shared by the sync and async read paths"""
+    stmt = select(*(getattr(model, name) for name in fields)).where(*criteria)
+    if after_id is not None:
+        stmt = stmt.where(model.id > after_id)
+    return stmt.order_by(model.id.asc()).limit(limit)
+
+
+def keyset_page(model, fields: Sequence[str], after_id: int = None, limit: int = 50,
+                criteria: Sequence = ()) -> List:
+    """
+    Fetch up to `limit` rows with id > after_id, ordered by id
+    Only the requested columns are selected, so no ORM objects are built
+    """
+    return db.session.execute(keyset_statement(model, fields, after_id, limit, criteria)).all()
+
+
+async def keyset_page_async(model, fields: Sequence[str], after_id: int = None, limit: int = 50,
+                            criteria: Sequence = ()) -> List:
+    """Async variant of keyset_page running on the ASGI engine"""
+    from ..async_db import async_session
+
+    async with async_session() as session:
+        result = await session.execute(keyset_statement(model, fields, after_id, limit, criteria))
+        return result.all()
@@ -1,6 +1,10 @@
-from typing import Optional, List
-from ..models import ItemRequest
+from typing import Iterator, Optional, List
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
+from ..models import ItemRequest, ItemRequestArchive, StaffUser
 from ..extensions import db
+from .pagination import keyset_page
 
 
 class RequestRepository:
@@ -12,11 +16,90 @@ class RequestRepository:
         return ItemRequest.query.get(request_id)
 
     @staticmethod
-    def find_by_staff_id(staff_id: int) -> List[ItemRequest]:
-        """Find all requests for a staff member"""
+    def lock_by_id(request_id: int) -> Optional[ItemRequest]:
+        """Find and lock a request, reloading it if the session already holds it"""
         return ItemRequest.query.filter_by(
+            id=request_id
+        ).with_for_update().populate_existing().first()
+
+    @staticmethod
+    def find_by_staff_id(staff_id: int, include_archived: bool = False) -> List[ItemRequest]:
+        """Find all requests for a staff member, optionally including archived ones"""
+        requests = ItemRequest.query.filter_by(
             staff_id=staff_id
         ).order_by(ItemRequest.created_at.desc()).all()
+        if not include_archived:
+            return requests
+        archived = ItemRequestArchive.query.filter_by(
+            staff_id=staff_id
+        ).order_by(ItemRequestArchive.created_at.desc()).all()
+        return sorted(requests + archived, key=lambda r: r.created_at, reverse=True)
+
+    @staticmethod
+    def get_page(fields: List[str], after_id: int = None, limit: int = 50,
+                 status: str = None, staff_id: int = None) -> List:
+        """Get a keyset page of request columns"""
+        criteria = []
+        if status:
+            criteria.append(ItemRequest.status == status)
+        if staff_id is not None:
+            criteria.append(ItemRequest.staff_id == staff_id)
+        return keyset_page(ItemRequest, fields, after_id, limit, criteria)
+
+    @staticmethod
+    def get_pending_item_names() -> List[tuple]:
+        """Get (id, item_name) for every pending request"""
+        return db.session.query(ItemRequest.id, ItemRequest.item_name).filter(
+            ItemRequest.status == "pending"
+        ).all()
+
+    @staticmethod
+    def iter_created(since: datetime, until: datetime, batch_size: int = 500) -> Iterator[List[tuple]]:
+        """Get (item_name, created_at) batches for live and archived requests created in [since, until)"""
+        for source in (ItemRequest, ItemRequestArchive):
+            result = db.session.execute(
+                select(source.item_name, source.created_at)
+                .where(source.created_at >= since, source.created_at < until)
+                .execution_options(yield_per=batch_size)
+            )
+            for batch in result.tuples().partitions():
+                yield batch
+
+    @staticmethod
+    def get_pending_for_allocation() -> List[tuple]:
+        """Get (id, staff_id, department, created_at, item_name) for every pending request"""
+        return db.session.execute(
+            select(
+                ItemRequest.id,
+                ItemRequest.staff_id,
+                StaffUser.department,
+                ItemRequest.created_at,
+                ItemRequest.item_name,
+            )
+            .join(StaffUser, StaffUser.id == ItemRequest.staff_id)
+            .where(ItemRequest.status == "pending")
+        ).all()
+
+    @staticmethod
+    def lock_pending(ids: List[int]) -> List[int]:
+        """Lock the given requests in id order and return those still pending"""
+        return db.session.execute(
+            select(ItemRequest.id)
+            .where(ItemRequest.id.in_(ids), ItemRequest.status == "pending")
+            .order_by(ItemRequest.id)
+            .with_for_update()
+        ).scalars().all()
+
+    @staticmethod
+    def set_status_many(ids: List[int], status: str) -> int:
+        """Bulk update request status (caller commits)"""
+        result = db.session.execute(
+            update(ItemRequest)
+            .where(ItemRequest.id.in_(ids))
+            .values(status=status, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
     @staticmethod
     def get_pending() -> List[ItemRequest]:
@@ -25,47 +108,48 @@ class RequestRepository:
             status="pending"
         ).order_by(ItemRequest.created_at.asc()).all()
 
+    @staticmethod
+    def iter_pending(batch_size: int = 500) -> Iterator[ItemRequest]:
+        """Iterate pending requests oldest first with their staff user, in batches"""
+        return ItemRequest.query.options(
+            joinedload(ItemRequest.staff_user)
+        ).filter_by(
+            status="pending"
+        ).order_by(ItemRequest.created_at.asc()).yield_per(batch_size)
+
     @staticmethod
     def get_pending_count() -> int:
         """Get count of pending requests"""
         return ItemRequest.query.filter_by(status="pending").count()
 
     @staticmethod
-    def get_history(limit: int = 10) -> List[ItemRequest]:
-        """Get request history (non-pending)"""
-        return ItemRequest.query.filter(
+    def get_history(limit: int = 10, include_archived: bool = False) -> List[ItemRequest]:
+        """Get request history (non-pending) with staff users, optionally including archived requests"""
+        history = ItemRequest.query.options(
+            joinedload(ItemRequest.staff_user)
+        ).filter(
             ItemRequest.status != "pending"
         ).order_by(ItemRequest.updated_at.desc()).limit(limit).all()
+        if not include_archived:
+            return history
+        archived = ItemRequestArchive.query.options(
+            joinedload(ItemRequestArchive.staff_user)
+        ).order_by(
+            ItemRequestArchive.updated_at.desc()
+        ).limit(limit).all()
+        return sorted(history + archived, key=lambda r: r.updated_at, reverse=True)[:limit]
 
     @staticmethod
     def create(staff_id: int, item_name: str, justification: str = None) -> ItemRequest:
-        """Create a new request"""
+        """Stage a new request in the current session (caller commits)"""
         request = ItemRequest(
             staff_id=staff_id,
             item_name=item_name.strip(),
             justification=justification.strip() if justification else None,
         )
         db.session.add(request)
-        db.session.commit()
-        return request
-
-    @staticmethod
-    def update_status(request: ItemRequest, status: str) -> ItemRequest:
-        """Update request status"""
-        request.status = status
-        db.session.commit()
         return request
 
-    @staticmethod
-    def approve(request: ItemRequest) -> ItemRequest:
-        """Approve a request"""
-        return RequestRepository.update_status(request, "approved")
-
-    @staticmethod
-    def reject(request: ItemRequest) -> ItemRequest:
-        """Reject a request"""
-        return RequestRepository.update_status(request, "rejected")
-
     @staticmethod
     def delete_by_staff_id(staff_id: int) -> int:
         """Delete all requests for a staff member"""
@@ -0,0 +1,118 @@
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import joinedload
+from ..models import ItemReservation
+from ..extensions import db
+
+
+class ReservationRepository:
+    """Data access layer for ItemReservation operations"""
+
+    @staticmethod
+    def add(item_id: int, request_id: int, quantity: int, expires_at: datetime,
+            actor_id: int = None) -> ItemReservation:
+        """Stage a held reservation in the current session (caller commits)"""
+        reservation = ItemReservation(
+            item_id=item_id,
+            request_id=request_id,
+            quantity=quantity,
+            status="held",
+            expires_at=expires_at,
+            actor_id=actor_id,
+        )
+        db.session.add(reservation)
+        return reservation
+
+    @staticmethod
+    def find_held_for_request(request_id: int) -> Optional[ItemReservation]:
+        """Find the active hold for a request"""
+        return ItemReservation.query.filter_by(request_id=request_id, status="held").first()
+
+    @staticmethod
+    def get_held_for_request(request_id: int) -> Optional[ItemReservation]:
+        """Get and lock the active hold for a request, reloading it if the session already holds it"""
+        return ItemReservation.query.filter_by(
+            request_id=request_id, status="held"
+        ).with_for_update().populate_existing().first()
+
+    @staticmethod
+    def lock_held_request_ids(request_ids: List[int]) -> List[int]:
+        """Lock the active holds of the given requests and return their request ids"""
+        return db.session.execute(
+            select(ItemReservation.request_id)
+            .where(ItemReservation.request_id.in_(request_ids), ItemReservation.status == "held")
+            .order_by(ItemReservation.id)
+            .with_for_update()
+        ).scalars().all()
+
+    @staticmethod
+    def get_all_held() -> List[ItemReservation]:
+        """Get every active hold with its item loaded"""
+        return ItemReservation.query.options(
+            joinedload(ItemReservation.item)
+        ).filter_by(status="held").all()
+
+    @staticmethod
+    def get_held_request_ids() -> List[int]:
+        """Get ids of requests that have an active hold"""
+        return db.session.execute(
+            select(ItemReservation.request_id).where(ItemReservation.status == "held")
+        ).scalars().all()
+
+    @staticmethod
+    def get_expired(now: datetime, limit: int) -> List[tuple]:
+        """Get (id, item_id) of holds past their expiry, oldest first, without locking them"""
+        return db.session.execute(
+            select(ItemReservation.id, ItemReservation.item_id)
+            .where(ItemReservation.status == "held", ItemReservation.expires_at <= now)
+            .order_by(ItemReservation.expires_at)
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def lock_expired(ids: List[int], now: datetime) -> List[int]:
+        """Lock the given holds and return those still held and past their expiry"""
+        return db.session.execute(
+            select(ItemReservation.id)
+            .where(
+                ItemReservation.id.in_(ids),
+                ItemReservation.status == "held",
+                ItemReservation.expires_at <= now,
+            )
+            .order_by(ItemReservation.id)
+            .with_for_update()
+        ).scalars().all()
+
+    @staticmethod
+    def get_quantities_by_item(ids: List[int]) -> List[tuple]:
+        """Get (item_id, held quantity) for the given reservations, ordered by item"""
+        return db.session.execute(
+            select(ItemReservation.item_id, func.sum(ItemReservation.quantity))
+            .where(ItemReservation.id.in_(ids))
+            .group_by(ItemReservation.item_id)
+            .order_by(ItemReservation.item_id)
+        ).all()
+
+    @staticmethod
+    def get_item_ids(ids: List[int]) -> List[tuple]:
+        """Get (id, item_id) for the given reservations"""
+        return db.session.execute(
+            select(ItemReservation.id, ItemReservation.item_id).where(ItemReservation.id.in_(ids))
+        ).all()
+
+    @staticmethod
+    def set_status(ids: List[int], status: str) -> int:
+        """Bulk update reservation status (caller commits)"""
+        result = db.session.execute(
+            update(ItemReservation)
+            .where(ItemReservation.id.in_(ids))
+            .values(status=status, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def delete_by_item_id(item_id: int) -> int:
+        """Delete all reservations for an item (caller commits)"""
+        return ItemReservation.query.filter_by(item_id=item_id).delete()
@@ -0,0 +1,126 @@
+from typing import Dict, Optional, List
+from datetime import datetime
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import contains_eager, joinedload
+from ..models import CategoryThreshold, InventoryItem, StockAlert
+from ..extensions import db
+
+
+class StockAlertRepository:
+    """Data access layer for reorder thresholds and StockAlert operations"""
+
+    @staticmethod
+    def get_levels(default_threshold: int, item_ids: List[int] = None, category: str = None) -> List[tuple]:
+        """
+        Get and lock (item_id, quantity_available, effective threshold) for the given
+        items, a whole category, or every item when neither is given
+        The item rows stay locked until the caller commits, so two checks of the
+        same item cannot both find no open alert and open one each
+        """
+        threshold = func.coalesce(
+            InventoryItem.reorder_threshold, CategoryThreshold.threshold, default_threshold
+        )
+        stmt = select(InventoryItem.id, InventoryItem.quantity_available, threshold).outerjoin(
+            CategoryThreshold, CategoryThreshold.category == InventoryItem.category
+        )
+        if item_ids is not None:
+            stmt = stmt.where(InventoryItem.id.in_(item_ids))
+        if category is not None:
+            stmt = stmt.where(InventoryItem.category == category)
+        stmt = stmt.order_by(InventoryItem.id).with_for_update(of=InventoryItem)
+        return db.session.execute(stmt).all()
+
+    @staticmethod
+    def get_open_by_item(item_ids: List[int] = None) -> Dict[int, int]:
+        """Get item id -> open alert id, for the given items or all of them"""
+        stmt = select(StockAlert.item_id, StockAlert.id).where(StockAlert.status == "open")
+        if item_ids is not None:
+            stmt = stmt.where(StockAlert.item_id.in_(item_ids))
+        return dict(db.session.execute(stmt).all())
+
+    @staticmethod
+    def open_many(rows: List[tuple]) -> None:
+        """Stage open alerts from (item_id, quantity, threshold) rows (caller commits)"""
+        now = datetime.utcnow()
+        db.session.add_all(
+            StockAlert(item_id=item_id, quantity=quantity, threshold=threshold, opened_at=now)
+            for item_id, quantity, threshold in rows
+        )
+
+    @staticmethod
+    def resolve_many(alert_ids: List[int]) -> None:
+        """Resolve alerts whose items are back above threshold (caller commits)"""
+        if alert_ids:
+            db.session.execute(
+                update(StockAlert)
+                .where(StockAlert.id.in_(alert_ids))
+                .values(status="resolved", resolved_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def get_open(limit: int = None) -> List[StockAlert]:
+        """
+        Get open alerts with their items, lowest stock first
+        Ordered by the item's current quantity; the alert's own is a snapshot from when it opened
+        """
+        query = StockAlert.query.join(StockAlert.item).options(contains_eager(StockAlert.item)).filter(
+            StockAlert.status == "open"
+        ).order_by(InventoryItem.quantity_available.asc(), StockAlert.opened_at.asc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def get_open_count() -> int:
+        """Get count of open alerts"""
+        return StockAlert.query.filter_by(status="open").count()
+
+    @staticmethod
+    def get_unnotified() -> List[StockAlert]:
+        """Get and lock open alerts not yet included in a digest"""
+        return StockAlert.query.options(joinedload(StockAlert.item)).filter(
+            StockAlert.status == "open", StockAlert.notified_at.is_(None)
+        ).order_by(StockAlert.opened_at.asc()).with_for_update(of=StockAlert, skip_locked=True).all()
+
+    @staticmethod
+    def mark_notified(alert_ids: List[int]) -> None:
+        """Record that alerts went out in a digest (caller commits)"""
+        if alert_ids:
+            db.session.execute(
+                update(StockAlert)
+                .where(StockAlert.id.in_(alert_ids))
+                .values(notified_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def delete_by_item_id(item_id: int) -> int:
+        """Delete all alerts for an item (caller commits)"""
+        return StockAlert.query.filter_by(item_id=item_id).delete()
+
+    @staticmethod
+    def find_category_threshold(category: str) -> Optional[CategoryThreshold]:
+        """Find the threshold row for a category"""
+        return db.session.get(CategoryThreshold, category)
+
+    @staticmethod
+    def get_category_thresholds() -> List[CategoryThreshold]:
+        """Get all category thresholds"""
+        return CategoryThreshold.query.order_by(CategoryThreshold.category.asc()).all()
+
+    @staticmethod
+    def save_category_threshold(category: str, threshold: int) -> CategoryThreshold:
+        """Insert or update a category threshold (caller commits)"""
+        row = StockAlertRepository.find_category_threshold(category)
+        if row is None:
+            row = CategoryThreshold(category=category, threshold=threshold)
+            db.session.add(row)
+        else:
+            row.threshold = threshold
+        return row
+
+    @staticmethod
+    def delete_category_threshold(category: str) -> bool:
+        """Delete a category threshold (caller commits)"""
+        return CategoryThreshold.query.filter_by(category=category).delete() > 0
@@ -0,0 +1,102 @@
+from typing import Iterator, List, Optional
+from datetime import date
+from sqlalchemy import delete, func, insert, or_, select
+from ..models import ItemAssignment, ItemAssignmentArchive, StaffUser, UtilizationSnapshot
+from ..extensions import db
+
+
+class UtilizationRepository:
+    """Data access layer for assignment history scans and UtilizationSnapshot operations"""
+
+    @staticmethod
+    def _loan_batches(stmt_for, batch_size: int) -> Iterator[List[tuple]]:
+        """Run stmt_for(table) over the live and archived assignments, yielding row batches"""
+        for source in (ItemAssignment, ItemAssignmentArchive):
+            result = db.session.execute(stmt_for(source).execution_options(yield_per=batch_size))
+            for batch in result.tuples().partitions():
+                yield batch
+
+    @staticmethod
+    def _loan_columns(source):
+        return select(
+            source.item_id, StaffUser.department, source.allocation_date, source.return_date
+        ).join(StaffUser, StaffUser.id == source.staff_id)
+
+    @staticmethod
+    def iter_loans(first: date, last: date, batch_size: int) -> Iterator[List[tuple]]:
+        """
+        Get (item_id, department, allocation_date, return_date) batches for every loan,
+        live or archived, that was out at some point between first and last
+        """
+        return UtilizationRepository._loan_batches(
+            lambda source: UtilizationRepository._loan_columns(source).where(
+                source.allocation_date <= last,
+                or_(source.return_date.is_(None), source.return_date >= first),
+            ),
+            batch_size,
+        )
+
+    @staticmethod
+    def iter_returns(first: date, last: date, batch_size: int) -> Iterator[List[tuple]]:
+        """Get (item_id, department, allocation_date, return_date) batches for loans returned between first and last"""
+        return UtilizationRepository._loan_batches(
+            lambda source: UtilizationRepository._loan_columns(source).where(
+                source.allocation_date.is_not(None), source.return_date.between(first, last)
+            ),
+            batch_size,
+        )
+
+    @staticmethod
+    def get_first_loan_day() -> Optional[date]:
+        """Get the earliest allocation date in the live and archived assignments"""
+        return min(
+            (
+                day for day in (
+                    db.session.scalar(select(func.min(ItemAssignment.allocation_date))),
+                    db.session.scalar(select(func.min(ItemAssignmentArchive.allocation_date))),
+                )
+                if day is not None
+            ),
+            default=None,
+        )
+
+    @staticmethod
+    def get_last_snapshot_day() -> Optional[date]:
+        """Get the latest day covered by the snapshot table"""
+        return db.session.scalar(select(func.max(UtilizationSnapshot.day)))
+
+    @staticmethod
+    def replace_snapshots(first: date, last: date, rows: List[tuple]) -> int:
+        """
+        Replace snapshot rows for first..last with (day, item_id, department, on_loan,
+        started, returned, returned_days) rows (caller commits)
+        """
+        db.session.execute(
+            delete(UtilizationSnapshot).where(UtilizationSnapshot.day.between(first, last))
+        )
+        if rows:
+            db.session.execute(
+                insert(UtilizationSnapshot),
+                [
+                    dict(zip(
+                        ("day", "item_id", "department", "on_loan", "started", "returned", "returned_days"),
+                        row,
+                    ))
+                    for row in rows
+                ],
+            )
+        return len(rows)
+
+    @staticmethod
+    def get_snapshot_totals(first: date, last: date) -> List[tuple]:
+        """Get (item_id, department, loan days, loans started) summed over first..last"""
+        return db.session.execute(
+            select(
+                UtilizationSnapshot.item_id,
+                UtilizationSnapshot.department,
+                func.sum(UtilizationSnapshot.on_loan),
+                func.sum(UtilizationSnapshot.started),
+            )
+            .where(UtilizationSnapshot.day.between(first, last))
+            .group_by(UtilizationSnapshot.item_id, UtilizationSnapshot.department)
+        ).tuples().all()
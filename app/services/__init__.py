@@ -4,6 +4,15 @@ from .staff_service import StaffService
 from .assignment_service import AssignmentService
 from .request_service import RequestService
 from .feedback_service import FeedbackService
+from .audit_service import AuditService
+from .archive_service import ArchiveService
+from .reservation_service import ReservationService
+from .matching_service import MatchingService
+from .allocation_service import AllocationService
+from .stock_alert_service import StockAlertService
+from .valuation_service import ValuationService
+from .utilization_service import UtilizationService
+from .forecast_service import ForecastService
 
 __all__ = [
     "AdminService",
@@ -12,5 +21,14 @@ __all__ = [
     "AssignmentService",
     "RequestService",
     "FeedbackService",
+    "AuditService",
+    "ArchiveService",
+    "ReservationService",
+    "MatchingService",
+    "AllocationService",
+    "StockAlertService",
+    "ValuationService",
+    "UtilizationService",
+    "ForecastService",
 ]
 
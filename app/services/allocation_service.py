@@ -0,0 +1,143 @@
+from typing import Dict, List
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from ..models import AuditAction, AuditEntity
+from ..repositories import (
+    AssignmentRepository,
+    InventoryRepository,
+    RequestRepository,
+    ReservationRepository,
+)
+from .audit_service import AuditService
+from .matching_service import MatchingService
+from .stock_alert_service import StockAlertService
+from .transaction_manager import transaction
+
+
+class AllocationService:
+    """Business logic layer for approving the pending queue in one batch"""
+
+    @staticmethod
+    def plan(priorities: Dict[str, int] = None, quotas: Dict[str, int] = None,
+             candidates: int = None, limit: int = None) -> Dict:
+        """
+        Compute an allocation for the pending queue without touching the database
+        Requests are served by department priority, then oldest first; each takes
+        its best-matching item that still has stock and its department's quota
+        Requests with an active hold are left for the admin who placed it
+        Returns dictionary with allocations and per-outcome counts
+        """
+        config = current_app.config
+        priorities = config["ALLOCATION_PRIORITIES"] if priorities is None else priorities
+        quotas = config["ALLOCATION_QUOTAS"] if quotas is None else quotas
+
+        stock = InventoryRepository.get_available_quantities()
+        held = set(ReservationRepository.get_held_request_ids())
+        pending = [row for row in RequestRepository.get_pending_for_allocation() if row.id not in held]
+        pending.sort(key=lambda row: (
+            -priorities.get(row.department, 0), row.created_at or datetime.min, row.id
+        ))
+        if limit is not None:
+            pending = pending[:limit]
+
+        suggestions = MatchingService.suggest_for_pending(
+            set(stock), candidates or config["ALLOCATION_CANDIDATES"]
+        )
+        used = Counter()
+        allocations = []
+        counts = {"allocated": 0, "no_match": 0, "out_of_stock": 0, "over_quota": 0}
+        for row in pending:
+            quota = quotas.get(row.department)
+            if quota is not None and used[row.department] >= quota:
+                counts["over_quota"] += 1
+                continue
+            matches = suggestions.get(row.id)
+            if not matches:
+                counts["no_match"] += 1
+                continue
+            for item_id, score in matches:
+                if stock[item_id] > 0:
+                    stock[item_id] -= 1
+                    used[row.department] += 1
+                    allocations.append({
+                        "request_id": row.id,
+                        "staff_id": row.staff_id,
+                        "item_id": item_id,
+                        "score": score,
+                    })
+                    counts["allocated"] += 1
+                    break
+            else:
+                counts["out_of_stock"] += 1
+
+        return {"allocations": allocations, "counts": counts}
+
+    @staticmethod
+    def apply(allocations: List[Dict], actor_id: int = None) -> Dict:
+        """
+        Approve planned allocations in a single transaction
+        Items, then requests, then holds are locked in id order, the order every
+        write path follows (see ReservationService.lock_for_request); entries
+        whose request was processed, was given a hold or whose item ran out
+        since planning are skipped
+        Returns dictionary with approved and skipped counts
+        """
+        if not allocations:
+            return {"approved": 0, "skipped": 0}
+
+        with transaction():
+            stock = InventoryRepository.lock_quantities(sorted({a["item_id"] for a in allocations}))
+            request_ids = sorted({a["request_id"] for a in allocations})
+            still_pending = set(RequestRepository.lock_pending(request_ids))
+            # A hold placed since planning keeps its own unit; approving from
+            # available stock as well would take two
+            still_pending -= set(ReservationRepository.lock_held_request_ids(request_ids))
+
+            approved = []
+            taken = Counter()
+            for allocation in allocations:
+                item_id = allocation["item_id"]
+                if allocation["request_id"] in still_pending and stock.get(item_id, 0) > taken[item_id]:
+                    taken[item_id] += 1
+                    approved.append(allocation)
+
+            if approved:
+                today = datetime.utcnow()
+                AssignmentRepository.create_many([
+                    {
+                        "item_id": a["item_id"],
+                        "staff_id": a["staff_id"],
+                        "allocation_date": today.date(),
+                        "status": "assigned",
+                        "created_at": today,
+                        "updated_at": today,
+                    }
+                    for a in approved
+                ])
+                InventoryRepository.decrement_many(dict(taken))
+                StockAlertService.check_items(taken)
+                RequestRepository.set_status_many([a["request_id"] for a in approved], "approved")
+                # Bulk inserts do not return assignment ids portably, so the batch
+                # is audited on the request side only (the item id is recorded).
+                AuditService.record_many(
+                    AuditEntity.REQUEST,
+                    AuditAction.REQUEST_APPROVED,
+                    [
+                        {"entity_id": a["request_id"], "staff_id": a["staff_id"], "item_id": a["item_id"]}
+                        for a in approved
+                    ],
+                    actor_id,
+                )
+
+        return {"approved": len(approved), "skipped": len(allocations) - len(approved)}
+
+    @staticmethod
+    def run(dry_run: bool = False, actor_id: int = None, **options) -> Dict:
+        """Plan and, unless dry_run, apply an allocation for the pending queue"""
+        result = AllocationService.plan(**options)
+        if dry_run:
+            result["applied"] = None
+        else:
+            result["applied"] = AllocationService.apply(result["allocations"], actor_id)
+        return result
@@ -0,0 +1,37 @@
+from typing import Dict
+from datetime import datetime, timedelta
+from ..repositories import ArchiveRepository
+from .transaction_manager import transaction
+
+
+class ArchiveService:
+    """Business logic layer for moving closed rows to cold storage"""
+
+    @staticmethod
+    def archive_closed(older_than_days: int, batch_size: int = 500, max_batches: int = None) -> Dict:
+        """
+        Move closed requests and returned assignments older than the cutoff
+        Each batch is its own short transaction so row locks are held briefly
+        Returns dictionary with moved row counts
+        """
+        if older_than_days < 0:
+            raise ValueError("Retention must not be negative")
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        moved = {"requests": 0, "assignments": 0}
+        for key, find_ids, move in (
+            ("requests", ArchiveRepository.get_closed_request_ids, ArchiveRepository.move_requests),
+            ("assignments", ArchiveRepository.get_closed_assignment_ids, ArchiveRepository.move_assignments),
+        ):
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                with transaction():
+                    ids = find_ids(cutoff, batch_size)
+                    if ids:
+                        moved[key] += move(ids)
+                batches += 1
+                if len(ids) < batch_size:
+                    break
+        return moved
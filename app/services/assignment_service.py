@@ -1,8 +1,10 @@
 from typing import Optional, List
 from datetime import datetime
-from ..models import ItemAssignment, InventoryItem
+from ..models import ItemAssignment, InventoryItem, AuditAction, AuditEntity
 from ..extensions import db
 from ..repositories import AssignmentRepository, InventoryRepository
+from .audit_service import AuditService
+from .stock_alert_service import StockAlertService
 from .transaction_manager import transaction
 
 
@@ -10,9 +12,9 @@ class AssignmentService:
     """Business logic layer for Assignment operations"""
 
     @staticmethod
-    def get_assignments_for_staff(staff_id: int) -> List[ItemAssignment]:
+    def get_assignments_for_staff(staff_id: int, include_archived: bool = False) -> List[ItemAssignment]:
         """Get all assignments for a staff member"""
-        return AssignmentRepository.find_by_staff_id(staff_id)
+        return AssignmentRepository.find_by_staff_id(staff_id, include_archived)
 
     @staticmethod
     def get_pending_returns() -> List[ItemAssignment]:
@@ -20,7 +22,22 @@ class AssignmentService:
         return AssignmentRepository.get_pending_returns()
 
     @staticmethod
-    def create_assignment(item_id: int, staff_id: int) -> ItemAssignment:
+    def get_assignments_page(fields: List[str], after_id: int = None, limit: int = 50,
+                             status: str = None, staff_id: int = None, item_id: int = None) -> List:
+        """Get a keyset page of assignment columns"""
+        return AssignmentRepository.get_page(fields, after_id, limit, status, staff_id, item_id)
+
+    @staticmethod
+    async def get_assignments_page_async(fields: List[str], after_id: int = None, limit: int = 50,
+                                         status: str = None, staff_id: int = None,
+                                         item_id: int = None) -> List:
+        """Async variant of get_assignments_page for the ASGI read path"""
+        return await AssignmentRepository.get_page_async(
+            fields, after_id, limit, status, staff_id, item_id
+        )
+
+    @staticmethod
+    def create_assignment(item_id: int, staff_id: int, actor_id: int = None) -> ItemAssignment:
         """
         Create a new assignment
         Validates item availability and decrements quantity atomically
@@ -46,6 +63,13 @@ class AssignmentService:
             # Decrement quantity in the same transaction
             item.quantity_available -= 1
             
+            db.session.flush()
+            StockAlertService.check_items([item_id])
+            AuditService.record(
+                AuditEntity.ASSIGNMENT, assignment.id, AuditAction.ASSIGNMENT_CREATED,
+                actor_id=actor_id, staff_id=staff_id, item_id=item_id,
+            )
+            
             # Single commit for both operations
             return assignment
 
@@ -55,23 +79,29 @@ class AssignmentService:
         Request return of an assignment
         Validates ownership and current status
         """
-        assignment = AssignmentRepository.find_by_id(assignment_id)
-        if not assignment:
-            raise ValueError("Assignment not found")
-        
-        if assignment.staff_id != staff_id:
-            raise ValueError("You can only return your own assignments")
-        
-        if assignment.status not in {"assigned", "return_requested"}:
-            raise ValueError("This item cannot be returned right now")
-        
-        if assignment.status == "return_requested":
-            raise ValueError("Return already requested")
-        
-        return AssignmentRepository.request_return(assignment)
+        with transaction():
+            assignment = AssignmentRepository.find_by_id(assignment_id)
+            if not assignment:
+                raise ValueError("Assignment not found")
+            
+            if assignment.staff_id != staff_id:
+                raise ValueError("You can only return your own assignments")
+            
+            if assignment.status not in {"assigned", "return_requested"}:
+                raise ValueError("This item cannot be returned right now")
+            
+            if assignment.status == "return_requested":
+                raise ValueError("Return already requested")
+            
+            assignment.status = "return_requested"
+            AuditService.record(
+                AuditEntity.ASSIGNMENT, assignment.id, AuditAction.RETURN_REQUESTED,
+                staff_id=staff_id, item_id=assignment.item_id,
+            )
+            return assignment
 
     @staticmethod
-    def complete_return(assignment_id: int) -> ItemAssignment:
+    def complete_return(assignment_id: int, actor_id: int = None) -> ItemAssignment:
         """
         Complete return of an assignment
         Validates status and increments item quantity atomically
@@ -94,6 +124,13 @@ class AssignmentService:
                 # Refresh item to get latest state
                 db.session.refresh(assignment.item)
                 assignment.item.quantity_available += 1
+                db.session.flush()
+                StockAlertService.check_items([assignment.item_id])
+            
+            AuditService.record(
+                AuditEntity.ASSIGNMENT, assignment.id, AuditAction.RETURN_COMPLETED,
+                actor_id=actor_id, staff_id=assignment.staff_id, item_id=assignment.item_id,
+            )
             
             # Single commit for both operations
             return assignment
@@ -0,0 +1,110 @@
+from typing import List, Dict
+from datetime import date, datetime
+from ..models import AuditAction, AuditEntity
+from ..repositories import AuditRepository
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after `day`"""
+    index = day.year * 12 + (day.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+class AuditService:
+    """Business logic layer for the audit trail"""
+
+    @staticmethod
+    def record(entity: AuditEntity, entity_id: int, action: AuditAction, actor_id: int = None,
+               staff_id: int = None, item_id: int = None) -> None:
+        """Record a state transition inside the caller's transaction"""
+        AuditRepository.add(entity, entity_id, action, actor_id, staff_id, item_id)
+
+    @staticmethod
+    def record_many(entity: AuditEntity, action: AuditAction, events: List[Dict],
+                    actor_id: int = None) -> None:
+        """Record one transition for many rows; each event has entity_id and optional staff_id/item_id"""
+        ts = datetime.utcnow()
+        AuditRepository.add_many([
+            {
+                "ts": ts,
+                "entity": int(entity),
+                "entity_id": event["entity_id"],
+                "action": int(action),
+                "actor_id": actor_id,
+                "staff_id": event.get("staff_id"),
+                "item_id": event.get("item_id"),
+            }
+            for event in events
+        ])
+
+    @staticmethod
+    def _decode(rows) -> List[Dict]:
+        return [
+            {
+                "id": row.id,
+                "ts": row.ts,
+                "entity": AuditEntity(row.entity).name.lower(),
+                "entity_id": row.entity_id,
+                "action": AuditAction(row.action).name.lower(),
+                "actor_id": row.actor_id,
+                "staff_id": row.staff_id,
+                "item_id": row.item_id,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def get_item_timeline(item_id: int, before: datetime = None, before_id: int = None,
+                          limit: int = 50) -> List[Dict]:
+        """Get the newest events for an inventory item; page with the last event's `ts` and `id`"""
+        return AuditService._decode(AuditRepository.get_item_timeline(item_id, before, before_id, limit))
+
+    @staticmethod
+    def get_staff_timeline(staff_id: int, before: datetime = None, before_id: int = None,
+                           limit: int = 50) -> List[Dict]:
+        """Get the newest events for a staff member; page with the last event's `ts` and `id`"""
+        return AuditService._decode(AuditRepository.get_staff_timeline(staff_id, before, before_id, limit))
+
+    @staticmethod
+    def get_request_timeline(request_id: int, before: datetime = None, before_id: int = None,
+                             limit: int = 50) -> List[Dict]:
+        """Get the events for a single item request"""
+        return AuditService._decode(
+            AuditRepository.get_entity_timeline(AuditEntity.REQUEST, request_id, before, before_id, limit)
+        )
+
+    @staticmethod
+    def ensure_partitions(months_ahead: int = 3, today: date = None) -> List[str]:
+        """
+        Create monthly partitions up to `months_ahead` months in the future
+        Returns the names of the partitions that were added
+        """
+        today = today or date.today()
+        existing = {name for name, _ in AuditRepository.get_partitions()}
+        boundaries = []
+        for offset in range(months_ahead + 1):
+            month = _month_start(today, offset)
+            name = _partition_name(month)
+            if name not in existing:
+                boundaries.append((name, _month_start(month, 1).isoformat()))
+        if boundaries:
+            AuditRepository.split_future_partition(boundaries)
+        return [name for name, _ in boundaries]
+
+    @staticmethod
+    def drop_partitions_older_than(keep_months: int, today: date = None) -> List[str]:
+        """
+        Drop monthly partitions outside the retention window
+        Returns the names of the dropped partitions
+        """
+        cutoff_name = _partition_name(_month_start(today or date.today(), -keep_months))
+        stale = [
+            name for name, _ in AuditRepository.get_partitions()
+            if name != "p_future" and name < cutoff_name
+        ]
+        AuditRepository.drop_partitions(stale)
+        return stale
@@ -25,6 +25,11 @@ class FeedbackService:
         """Get recent feedback entries"""
         return FeedbackRepository.get_recent(limit)
 
+    @staticmethod
+    def get_feedback_page(fields: List[str], after_id: int = None, limit: int = 50) -> List:
+        """Get a keyset page of feedback columns"""
+        return FeedbackRepository.get_page(fields, after_id, limit)
+
     @staticmethod
     def get_stats() -> Dict:
         """Get feedback statistics"""
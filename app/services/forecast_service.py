@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional
+from datetime import date, datetime, time, timedelta
+from flask import current_app
+from ..matching import normalize
+from ..models import DemandForecast
+from ..repositories import ForecastRepository, InventoryRepository, RequestRepository
+from .matching_service import MatchingService
+from .transaction_manager import transaction
+
+
+class ForecastService:
+    """Business logic layer for request-demand forecasts and reorder recommendations"""
+
+    @staticmethod
+    def _history(since: date, weeks: int) -> tuple:
+        """
+        Scan requests created in the given weeks in column batches
+        Returns (normalized names, (names, weeks) request-count matrix)
+        """
+        import numpy as np
+
+        from .. import forecasting
+
+        names: Dict[str, int] = {}
+        series_index, week_index = [], []
+        start = np.datetime64(since, "D")
+        for batch in RequestRepository.iter_created(
+            datetime.combine(since, time.min),
+            datetime.combine(since + timedelta(weeks=weeks), time.min),
+            current_app.config["STREAM_FETCH_SIZE"],
+        ):
+            batch = [(normalize(name), created) for name, created in batch]
+            batch = [(name, created) for name, created in batch if name]
+            if not batch:
+                continue
+            series_index.append(np.array([names.setdefault(name, len(names)) for name, _ in batch]))
+            created = np.array([created for _, created in batch], dtype="datetime64[D]")
+            week_index.append((created - start).astype(np.int64) // 7)
+        if not names:
+            return [], np.zeros((0, weeks))
+        matrix = forecasting.weekly_matrix(
+            np.concatenate(series_index), np.concatenate(week_index), len(names), weeks
+        )
+        return list(names), matrix
+
+    @staticmethod
+    def run(dry_run: bool = False, today: date = None) -> Dict:
+        """
+        Forecast weekly demand per requested item name and per matched category from the
+        last FORECAST_HISTORY_WEEKS full weeks, and size reorders against quantity_available
+        Names are matched to stock with the trigram index; unmatched names are forecast
+        against zero stock. Unless dry_run, the results replace the stored forecasts
+        Returns dictionary with generated_at and the forecast rows
+        """
+        # NumPy loads with the first forecast run rather than with the app
+        import numpy as np
+
+        from .. import forecasting
+
+        config = current_app.config
+        weeks = max(config["FORECAST_HISTORY_WEEKS"], 1)
+        today = today or date.today()
+        since = today - timedelta(days=today.weekday(), weeks=weeks)
+        names, name_matrix = ForecastService._history(since, weeks)
+
+        matches = MatchingService.best_matches(names) if names else {}
+        stock = {item_id: (category, quantity) for item_id, category, quantity in InventoryRepository.get_stock_rows()}
+        category_stock: Dict[str, int] = {}
+        for category, quantity in stock.values():
+            category_stock[category] = category_stock.get(category, 0) + quantity
+
+        item_ids = [matches.get(name) for name in names]
+        name_categories = [stock[item_id][0] if item_id in stock else None for item_id in item_ids]
+        categories = sorted({category for category in name_categories if category is not None})
+        category_matrix = np.zeros((len(categories), weeks))
+        matched = [i for i, category in enumerate(name_categories) if category is not None]
+        if matched:
+            positions = {category: i for i, category in enumerate(categories)}
+            np.add.at(
+                category_matrix,
+                np.array([positions[name_categories[i]] for i in matched]),
+                name_matrix[matched],
+            )
+
+        matrix = np.vstack([name_matrix, category_matrix])
+        available = np.array(
+            [stock[item_id][1] if item_id in stock else 0 for item_id in item_ids]
+            + [category_stock[category] for category in categories],
+            dtype=np.float64,
+        )
+        fitted = forecasting.fit(matrix, config["FORECAST_SMOOTHING_ALPHA"], config["FORECAST_MOVING_AVERAGE_WEEKS"])
+        plan = forecasting.reorder(
+            fitted["forecast"], fitted["sigma"], available, config["FORECAST_HORIZON_WEEKS"], config["FORECAST_SERVICE_Z"]
+        )
+
+        generated_at = datetime.utcnow()
+        labels = (
+            [("name", name, category, item_id) for name, category, item_id in zip(names, name_categories, item_ids)]
+            + [("category", category, category, None) for category in categories]
+        )
+        rows = [
+            {
+                "scope": scope,
+                "name": name[:150],
+                "category": category,
+                "item_id": item_id,
+                "requests": int(matrix[i].sum()),
+                "weekly_forecast": round(float(fitted["forecast"][i]), 3),
+                "demand": round(float(plan["demand"][i]), 2),
+                "safety_stock": round(float(plan["safety_stock"][i]), 2),
+                "available": int(available[i]),
+                "reorder_quantity": int(plan["quantity"][i]),
+                "model": forecasting.MODELS[fitted["model"][i]],
+                "generated_at": generated_at,
+            }
+            for i, (scope, name, category, item_id) in enumerate(labels)
+        ]
+        if not dry_run:
+            with transaction():
+                ForecastRepository.replace_all(rows)
+        rows.sort(key=lambda row: (-row["reorder_quantity"], row["scope"], row["name"]))
+        return {"generated_at": generated_at, "rows": rows}
+
+    @staticmethod
+    def get_reorders(limit: int = None) -> List[DemandForecast]:
+        """Get stored forecasts that recommend reordering, largest quantity first"""
+        return ForecastRepository.get_reorders(limit)
+
+    @staticmethod
+    def get_generated_at() -> Optional[datetime]:
+        """Get when the stored forecasts were generated"""
+        return ForecastRepository.get_generated_at()
@@ -1,7 +1,9 @@
-from typing import Optional, List, Dict
+from typing import Iterator, Optional, List, Dict
 from decimal import Decimal
 from ..models import InventoryItem
 from ..repositories import InventoryRepository
+from .matching_service import MatchingService
+from .stock_alert_service import StockAlertService
 
 
 class InventoryService:
@@ -19,6 +21,41 @@ class InventoryService:
             return InventoryRepository.search(search_query.strip())
         return InventoryRepository.get_all()
 
+    @staticmethod
+    def iter_items(search_query: str = None, batch_size: int = 500) -> Iterator[InventoryItem]:
+        """Stream inventory items, optionally filtered by search"""
+        query = search_query.strip() if search_query else None
+        return InventoryRepository.iter_all(query or None, batch_size)
+
+    @staticmethod
+    def get_item_columns(item_id: int, fields: List[str]):
+        """Get selected columns for one item"""
+        return InventoryRepository.get_columns(item_id, fields)
+
+    @staticmethod
+    def get_items_page(fields: List[str], after_id: int = None, limit: int = 50,
+                       search_query: str = None) -> List:
+        """Get a keyset page of item columns, optionally filtered by search"""
+        query = search_query.strip() if search_query else None
+        return InventoryRepository.get_page(fields, after_id, limit, query or None)
+
+    @staticmethod
+    async def get_items_page_async(fields: List[str], after_id: int = None, limit: int = 50,
+                                   search_query: str = None) -> List:
+        """Async variant of get_items_page for the ASGI read path"""
+        query = search_query.strip() if search_query else None
+        return await InventoryRepository.get_page_async(fields, after_id, limit, query or None)
+
+    @staticmethod
+    async def get_stats_async() -> Dict:
+        """Async variant of get_stats using a single aggregate query"""
+        total_items, total_quantity, average_price = await InventoryRepository.get_stats_async()
+        return {
+            "total_items": total_items,
+            "total_quantity": int(total_quantity or 0),
+            "average_price": average_price,
+        }
+
     @staticmethod
     def get_stats() -> Dict:
         """Get inventory statistics"""
@@ -29,7 +66,8 @@ class InventoryService:
         }
 
     @staticmethod
-    def create_item(name: str, category: str, quantity: int, purchase_date=None, price=None) -> InventoryItem:
+    def create_item(name: str, category: str, quantity: int, purchase_date=None, price=None,
+                    reorder_threshold: int = None) -> InventoryItem:
         """
         Create a new inventory item
         Validates business rules before creation
@@ -40,10 +78,17 @@ class InventoryService:
         if price is not None and price < 0:
             raise ValueError("Price cannot be negative")
         
-        return InventoryRepository.create(name, category, quantity, purchase_date, price)
+        if reorder_threshold is not None and reorder_threshold < 0:
+            raise ValueError("Reorder threshold cannot be negative")
+        
+        item = InventoryRepository.create(name, category, quantity, purchase_date, price, reorder_threshold)
+        MatchingService.index_item(item)
+        StockAlertService.refresh_items([item.id])
+        return item
 
     @staticmethod
-    def update_item(item_id: int, name: str, category: str, quantity: int, purchase_date=None, price=None) -> InventoryItem:
+    def update_item(item_id: int, name: str, category: str, quantity: int, purchase_date=None, price=None,
+                    reorder_threshold: int = None) -> InventoryItem:
         """
         Update an existing inventory item
         Validates business rules before update
@@ -58,7 +103,13 @@ class InventoryService:
         if price is not None and price < 0:
             raise ValueError("Price cannot be negative")
         
-        return InventoryRepository.update(item, name, category, quantity, purchase_date, price)
+        if reorder_threshold is not None and reorder_threshold < 0:
+            raise ValueError("Reorder threshold cannot be negative")
+        
+        item = InventoryRepository.update(item, name, category, quantity, purchase_date, price, reorder_threshold)
+        MatchingService.index_item(item)
+        StockAlertService.refresh_items([item.id])
+        return item
 
     @staticmethod
     def delete_item(item_id: int) -> bool:
@@ -66,7 +117,7 @@ class InventoryService:
         Delete an inventory item
         Also deletes related assignments to maintain referential integrity
         """
-        from ..repositories import AssignmentRepository
+        from ..repositories import AssignmentRepository, ReservationRepository, StockAlertRepository
         from .transaction_manager import transaction
         
         item = InventoryRepository.find_by_id(item_id)
@@ -75,10 +126,15 @@ class InventoryService:
         
         try:
             with transaction():
-                # Delete related assignments first
+                # Lock the item before its reservations, as every write path does
+                InventoryRepository.lock_quantities([item_id])
+                # Delete related reservations and assignments first
+                ReservationRepository.delete_by_item_id(item_id)
+                StockAlertRepository.delete_by_item_id(item_id)
                 AssignmentRepository.delete_by_item_id(item_id)
                 # Delete item in same transaction
                 InventoryRepository.delete(item_id)
+            MatchingService.remove_item(item_id)
             return True
         except Exception:
             return False
@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from flask import current_app
+from ..matching import TrigramIndex
+from ..models import InventoryItem
+from ..repositories import InventoryRepository, RequestRepository
+
+
+# One index per worker process. Items changed through this process are
+# applied directly; changes made by other workers are picked up by the
+# signature check before each lookup.
+_index: Optional[TrigramIndex] = None
+_synced_at = None
+_lock = threading.Lock()
+# updated_at is stamped from the app clock at flush, not at commit, and MySQL
+# keeps whole seconds, so an edit can land with a stamp at or before the one
+# last synced. Top-ups re-read this much before it, and keep doing so until
+# that long has passed since the newest edit.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class MatchingService:
+    """Business logic layer for suggesting inventory items for free-text requests"""
+
+    @staticmethod
+    def _synced_index() -> TrigramIndex:
+        """Get the process index, rebuilding or topping it up from the database as needed"""
+        global _index, _synced_at
+        count, latest = InventoryRepository.get_change_signature()
+        with _lock:
+            if _index is None or count != len(_index):
+                index = TrigramIndex(current_app.config["MATCH_CATEGORY_WEIGHT"])
+                for item_id, name, category in InventoryRepository.get_match_rows():
+                    index.upsert(item_id, name, category)
+                _index, _synced_at = index, latest
+            elif latest is not None and (
+                _synced_at is None
+                or latest > _synced_at
+                or datetime.utcnow() - SYNC_OVERLAP <= _synced_at
+            ):
+                since = _synced_at - SYNC_OVERLAP if _synced_at is not None else None
+                for item_id, name, category in InventoryRepository.get_match_rows(since):
+                    _index.upsert(item_id, name, category)
+                _synced_at = max(latest, _synced_at) if _synced_at is not None else latest
+            return _index
+
+    @staticmethod
+    def index_item(item: InventoryItem) -> None:
+        """Apply a created or edited item to the index, if it has been built"""
+        with _lock:
+            if _index is not None:
+                _index.upsert(item.id, item.name, item.category)
+
+    @staticmethod
+    def remove_item(item_id: int) -> None:
+        """Drop a deleted item from the index, if it has been built"""
+        with _lock:
+            if _index is not None:
+                _index.remove(item_id)
+
+    @staticmethod
+    def suggest(text: str, available_ids: Set[int] = None, k: int = None) -> List[Tuple[int, float]]:
+        """Get the top-k (item id, score) matches for one request text"""
+        config = current_app.config
+        return MatchingService._synced_index().top_k(
+            text, k or config["MATCH_SUGGESTIONS"], config["MATCH_MIN_SCORE"], available_ids
+        )
+
+    @staticmethod
+    def best_matches(texts: Iterable[str]) -> Dict[str, Optional[int]]:
+        """Get text -> id of the best-matching item, or None below MATCH_MIN_SCORE"""
+        matches = MatchingService._synced_index().top_k_many(
+            ((text, text) for text in texts), 1, current_app.config["MATCH_MIN_SCORE"]
+        )
+        return {text: found[0][0] if found else None for text, found in matches.items()}
+
+    @staticmethod
+    def suggest_for_pending(available_ids: Set[int] = None, k: int = None) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Get top-k matches for every pending request in one pass
+        Returns dictionary of request id -> [(item id, score), ...]
+        """
+        config = current_app.config
+        index = MatchingService._synced_index()
+        return index.top_k_many(
+            RequestRepository.get_pending_item_names(),
+            k or config["MATCH_SUGGESTIONS"],
+            config["MATCH_MIN_SCORE"],
+            available_ids,
+        )
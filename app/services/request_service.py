@@ -1,8 +1,11 @@
-from typing import Optional, List, Dict
+from typing import Iterator, Optional, List, Dict
 from datetime import datetime
-from ..models import ItemRequest, InventoryItem, ItemAssignment
+from ..models import ItemRequest, InventoryItem, ItemAssignment, AuditAction, AuditEntity
 from ..extensions import db
 from ..repositories import RequestRepository, AssignmentRepository, InventoryRepository
+from .audit_service import AuditService
+from .reservation_service import ReservationService
+from .stock_alert_service import StockAlertService
 from .transaction_manager import transaction
 
 
@@ -10,9 +13,9 @@ class RequestService:
     """Business logic layer for Request operations"""
 
     @staticmethod
-    def get_requests_for_staff(staff_id: int) -> List[ItemRequest]:
+    def get_requests_for_staff(staff_id: int, include_archived: bool = False) -> List[ItemRequest]:
         """Get all requests for a staff member"""
-        return RequestRepository.find_by_staff_id(staff_id)
+        return RequestRepository.find_by_staff_id(staff_id, include_archived)
 
     @staticmethod
     def get_pending_requests() -> List[ItemRequest]:
@@ -20,9 +23,20 @@ class RequestService:
         return RequestRepository.get_pending()
 
     @staticmethod
-    def get_request_history(limit: int = 10) -> List[ItemRequest]:
+    def iter_pending_requests(batch_size: int = 500) -> Iterator[ItemRequest]:
+        """Stream pending requests oldest first"""
+        return RequestRepository.iter_pending(batch_size)
+
+    @staticmethod
+    def get_request_history(limit: int = 10, include_archived: bool = False) -> List[ItemRequest]:
         """Get request history"""
-        return RequestRepository.get_history(limit)
+        return RequestRepository.get_history(limit, include_archived)
+
+    @staticmethod
+    def get_requests_page(fields: List[str], after_id: int = None, limit: int = 50,
+                          status: str = None, staff_id: int = None) -> List:
+        """Get a keyset page of request columns"""
+        return RequestRepository.get_page(fields, after_id, limit, status, staff_id)
 
     @staticmethod
     def create_request(staff_id: int, item_name: str, justification: str = None) -> ItemRequest:
@@ -33,30 +47,43 @@ class RequestService:
         if not item_name or not item_name.strip():
             raise ValueError("Item name is required")
         
-        return RequestRepository.create(staff_id, item_name.strip(), justification)
+        with transaction():
+            request = RequestRepository.create(staff_id, item_name, justification)
+            db.session.flush()
+            AuditService.record(
+                AuditEntity.REQUEST, request.id, AuditAction.REQUEST_CREATED,
+                staff_id=staff_id,
+            )
+            return request
 
     @staticmethod
-    def approve_request(request_id: int, item_id: int) -> Dict:
+    def approve_request(request_id: int, item_id: int, actor_id: int = None) -> Dict:
         """
         Approve a request and create assignment atomically
         Returns dictionary with assignment and request
         """
         with transaction():
-            # Get request and validate
-            request = RequestRepository.find_by_id(request_id)
+            # Items, then the request, then its hold: the order every write path
+            # uses, so a batch run, reject or hold cannot interleave with this
+            request, _ = ReservationService.lock_for_request(request_id, [item_id])
             if not request:
                 raise ValueError("Request not found")
             
             if request.status != "pending":
                 raise ValueError("This request has already been processed")
             
-            # Lock item row to prevent race conditions
-            item = db.session.query(InventoryItem).filter_by(id=item_id).with_for_update().first()
-            if not item:
-                raise ValueError("Item not found")
-            
-            if item.quantity_available <= 0:
-                raise ValueError("Item is no longer available")
+            # A live hold on this item already set the unit aside
+            if not ReservationService.confirm_for_request(request_id, item_id):
+                # Reloaded: releasing an expired hold may have returned units to it
+                item = db.session.get(InventoryItem, item_id, populate_existing=True)
+                if not item:
+                    raise ValueError("Item not found")
+                
+                if item.quantity_available <= 0:
+                    raise ValueError("Item is no longer available")
+                
+                # Decrement quantity
+                item.quantity_available -= 1
             
             # Create assignment
             assignment = ItemAssignment(
@@ -67,12 +94,20 @@ class RequestService:
             )
             db.session.add(assignment)
             
-            # Decrement quantity
-            item.quantity_available -= 1
-            
             # Update request status
             request.status = "approved"
             
+            db.session.flush()
+            StockAlertService.check_items([item_id])
+            AuditService.record(
+                AuditEntity.REQUEST, request.id, AuditAction.REQUEST_APPROVED,
+                actor_id=actor_id, staff_id=request.staff_id, item_id=item_id,
+            )
+            AuditService.record(
+                AuditEntity.ASSIGNMENT, assignment.id, AuditAction.ASSIGNMENT_CREATED,
+                actor_id=actor_id, staff_id=request.staff_id, item_id=item_id,
+            )
+            
             # Single commit for all operations
             return {
                 "assignment": assignment,
@@ -80,19 +115,26 @@ class RequestService:
             }
 
     @staticmethod
-    def reject_request(request_id: int) -> ItemRequest:
+    def reject_request(request_id: int, actor_id: int = None) -> ItemRequest:
         """
         Reject a request
         Validates request status
         """
-        request = RequestRepository.find_by_id(request_id)
-        if not request:
-            raise ValueError("Request not found")
-        
-        if request.status != "pending":
-            raise ValueError("This request has already been processed")
-        
-        return RequestRepository.reject(request)
+        with transaction():
+            request, _ = ReservationService.lock_for_request(request_id)
+            if not request:
+                raise ValueError("Request not found")
+            
+            if request.status != "pending":
+                raise ValueError("This request has already been processed")
+            
+            request.status = "rejected"
+            ReservationService.release_for_request(request_id, actor_id)
+            AuditService.record(
+                AuditEntity.REQUEST, request.id, AuditAction.REQUEST_REJECTED,
+                actor_id=actor_id, staff_id=request.staff_id,
+            )
+            return request
 
     @staticmethod
     def get_pending_count() -> int:
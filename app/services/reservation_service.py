@@ -0,0 +1,171 @@
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime, timedelta
+from flask import current_app
+from ..models import AuditAction, AuditEntity, ItemRequest, ItemReservation
+from ..extensions import db
+from ..repositories import InventoryRepository, RequestRepository, ReservationRepository
+from .audit_service import AuditService
+from .stock_alert_service import StockAlertService
+from .transaction_manager import transaction
+
+
+class ReservationService:
+    """Business logic layer for holding stock while a request is reviewed"""
+
+    @staticmethod
+    def get_holds_by_request() -> Dict[int, ItemReservation]:
+        """Get active holds keyed by request id"""
+        return {
+            reservation.request_id: reservation
+            for reservation in ReservationRepository.get_all_held()
+        }
+
+    @staticmethod
+    def get_hold(request_id: int) -> Optional[ItemReservation]:
+        """Get a request's active hold"""
+        return ReservationRepository.find_held_for_request(request_id)
+
+    @staticmethod
+    def lock_for_request(request_id: int, item_ids: Iterable[int] = ()) -> Tuple[
+        Optional[ItemRequest], Optional[ItemReservation]
+    ]:
+        """
+        Lock a request and its active hold inside the caller's transaction
+        Every write path takes row locks in one order: inventory items (in id
+        order), then requests, then reservations. Here that means the given
+        items plus the one the hold is on, then the request, then the hold.
+        Raises ValueError when the hold moved to another item in between.
+        """
+        held = ReservationRepository.find_held_for_request(request_id)
+        item_ids = set(item_ids) | ({held.item_id} if held is not None else set())
+        if item_ids:
+            InventoryRepository.lock_quantities(sorted(item_ids))
+        request = RequestRepository.lock_by_id(request_id)
+        reservation = ReservationRepository.get_held_for_request(request_id)
+        if reservation is not None and reservation.item_id not in item_ids:
+            raise ValueError("The hold on this request changed meanwhile; please try again")
+        return request, reservation
+
+    @staticmethod
+    def _release(reservation: ItemReservation, status: str, actor_id: int = None) -> None:
+        """Return a hold's units to available stock inside the caller's transaction"""
+        InventoryRepository.release_stock(reservation.item_id, reservation.quantity)
+        StockAlertService.check_items([reservation.item_id])
+        reservation.status = status
+        AuditService.record(
+            AuditEntity.RESERVATION, reservation.id,
+            AuditAction.RESERVATION_EXPIRED if status == "expired" else AuditAction.RESERVATION_RELEASED,
+            actor_id=actor_id, item_id=reservation.item_id,
+        )
+
+    @staticmethod
+    def hold(request_id: int, item_id: int, actor_id: int = None, ttl_minutes: int = None) -> ItemReservation:
+        """
+        Reserve one unit of an item for a pending request
+        Replaces the request's previous hold; holding the same item again extends it
+        """
+        ttl = timedelta(minutes=ttl_minutes or current_app.config["RESERVATION_TTL_MINUTES"])
+        now = datetime.utcnow()
+        with transaction():
+            request, existing = ReservationService.lock_for_request(request_id, [item_id])
+            if not request:
+                raise ValueError("Request not found")
+            if request.status != "pending":
+                raise ValueError("This request has already been processed")
+
+            if existing is not None:
+                if existing.item_id == item_id and existing.expires_at > now:
+                    existing.expires_at = now + ttl
+                    return existing
+                ReservationService._release(
+                    existing, "expired" if existing.expires_at <= now else "released", actor_id
+                )
+
+            if not InventoryRepository.hold_stock(item_id, 1):
+                raise ValueError("Item is no longer available")
+            StockAlertService.check_items([item_id])
+
+            reservation = ReservationRepository.add(item_id, request_id, 1, now + ttl, actor_id)
+            db.session.flush()
+            AuditService.record(
+                AuditEntity.RESERVATION, reservation.id, AuditAction.RESERVATION_HELD,
+                actor_id=actor_id, staff_id=request.staff_id, item_id=item_id,
+            )
+            return reservation
+
+    @staticmethod
+    def release(request_id: int, actor_id: int = None) -> bool:
+        """Release a request's active hold; returns False when there was none"""
+        with transaction():
+            ReservationService.lock_for_request(request_id)
+            return ReservationService.release_for_request(request_id, actor_id)
+
+    @staticmethod
+    def release_for_request(request_id: int, actor_id: int = None) -> bool:
+        """
+        Release a request's active hold inside the caller's transaction
+        The caller locks the hold's item first (see lock_for_request)
+        """
+        reservation = ReservationRepository.get_held_for_request(request_id)
+        if reservation is None:
+            return False
+        ReservationService._release(reservation, "released", actor_id)
+        return True
+
+    @staticmethod
+    def confirm_for_request(request_id: int, item_id: int) -> bool:
+        """
+        Consume the request's hold on `item_id` inside the caller's transaction
+        A hold on another item, or one that has expired, is released instead;
+        the caller locks both items first (see lock_for_request)
+        Returns True when the unit was already set aside by the hold
+        """
+        reservation = ReservationRepository.get_held_for_request(request_id)
+        if reservation is None:
+            return False
+        if reservation.item_id != item_id or reservation.expires_at <= datetime.utcnow():
+            ReservationService._release(
+                reservation, "released" if reservation.item_id != item_id else "expired"
+            )
+            return False
+        InventoryRepository.consume_reserved(item_id, reservation.quantity)
+        reservation.status = "confirmed"
+        return True
+
+    @staticmethod
+    def expire_due(batch_size: int = 500, max_batches: int = None) -> int:
+        """
+        Release holds past their expiry in batches
+        Due holds are found without locks, then their items and the holds are
+        locked in the global order (see lock_for_request); a hold released or
+        extended meanwhile is left alone
+        Returns number of expired holds
+        """
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        expired = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with transaction():
+                now = datetime.utcnow()
+                due = ReservationRepository.get_expired(now, batch_size)
+                ids = []
+                if due:
+                    InventoryRepository.lock_quantities(sorted({item_id for _, item_id in due}))
+                    ids = ReservationRepository.lock_expired([reservation_id for reservation_id, _ in due], now)
+                if ids:
+                    quantities = ReservationRepository.get_quantities_by_item(ids)
+                    for item_id, quantity in quantities:
+                        InventoryRepository.release_stock(item_id, int(quantity))
+                    StockAlertService.check_items(item_id for item_id, _ in quantities)
+                    expired += ReservationRepository.set_status(ids, "expired")
+                    for reservation_id, item_id in ReservationRepository.get_item_ids(ids):
+                        AuditService.record(
+                            AuditEntity.RESERVATION, reservation_id, AuditAction.RESERVATION_EXPIRED,
+                            item_id=item_id,
+                        )
+            batches += 1
+            if len(due) < batch_size:
+                break
+        return expired
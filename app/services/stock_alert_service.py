@@ -0,0 +1,119 @@
+from typing import Dict, Iterable, List
+from flask import current_app
+from ..models import StockAlert
+from ..repositories import StockAlertRepository
+from .transaction_manager import transaction
+
+
+class StockAlertService:
+    """Business logic layer for reorder thresholds and low-stock alerts"""
+
+    @staticmethod
+    def _apply(levels: List[tuple], open_alerts: Dict[int, int]) -> Dict:
+        to_open = []
+        to_resolve = []
+        for item_id, quantity, threshold in levels:
+            low = quantity <= threshold
+            if low and item_id not in open_alerts:
+                to_open.append((item_id, quantity, threshold))
+            elif not low and item_id in open_alerts:
+                to_resolve.append(open_alerts[item_id])
+        StockAlertRepository.open_many(to_open)
+        StockAlertRepository.resolve_many(to_resolve)
+        return {"opened": len(to_open), "resolved": len(to_resolve)}
+
+    @staticmethod
+    def check_items(item_ids: Iterable[int]) -> Dict:
+        """
+        Open or resolve alerts for items whose quantity just changed
+        Runs inside the caller's transaction; only the given items are read
+        """
+        item_ids = sorted(set(item_ids))
+        if not item_ids:
+            return {"opened": 0, "resolved": 0}
+        default = current_app.config["LOW_STOCK_DEFAULT_THRESHOLD"]
+        return StockAlertService._apply(
+            StockAlertRepository.get_levels(default, item_ids=item_ids),
+            StockAlertRepository.get_open_by_item(item_ids),
+        )
+
+    @staticmethod
+    def refresh_items(item_ids: Iterable[int]) -> Dict:
+        """check_items in its own transaction, for write paths that have already committed"""
+        with transaction():
+            return StockAlertService.check_items(item_ids)
+
+    @staticmethod
+    def rescan() -> Dict:
+        """Re-evaluate every item; for backfilling after a deploy or bulk import"""
+        default = current_app.config["LOW_STOCK_DEFAULT_THRESHOLD"]
+        with transaction():
+            return StockAlertService._apply(
+                StockAlertRepository.get_levels(default),
+                StockAlertRepository.get_open_by_item(),
+            )
+
+    @staticmethod
+    def set_category_threshold(category: str, threshold: int = None) -> Dict:
+        """
+        Set or clear (threshold=None) a category's reorder threshold
+        Items in the category are re-evaluated in the same transaction
+        """
+        category = (category or "").strip()
+        if not category:
+            raise ValueError("Category is required")
+        if threshold is not None and threshold < 0:
+            raise ValueError("Threshold cannot be negative")
+
+        default = current_app.config["LOW_STOCK_DEFAULT_THRESHOLD"]
+        with transaction():
+            if threshold is None:
+                StockAlertRepository.delete_category_threshold(category)
+            else:
+                StockAlertRepository.save_category_threshold(category, threshold)
+            levels = StockAlertRepository.get_levels(default, category=category)
+            return StockAlertService._apply(
+                levels, StockAlertRepository.get_open_by_item([row[0] for row in levels])
+            )
+
+    @staticmethod
+    def get_category_thresholds() -> List:
+        """Get all category thresholds"""
+        return StockAlertRepository.get_category_thresholds()
+
+    @staticmethod
+    def get_open_alerts(limit: int = None) -> List[StockAlert]:
+        """Get open alerts, lowest stock first"""
+        return StockAlertRepository.get_open(limit)
+
+    @staticmethod
+    def get_open_count() -> int:
+        """Get count of open alerts"""
+        return StockAlertRepository.get_open_count()
+
+    @staticmethod
+    def send_digest() -> List[StockAlert]:
+        """
+        Collect open alerts not yet reported, log them as one digest and mark them notified
+        Returns the alerts included in the digest
+        """
+        with transaction():
+            alerts = StockAlertRepository.get_unnotified()
+            if alerts:
+                current_app.logger.warning(
+                    "Low stock digest: %d items at or below threshold",
+                    len(alerts),
+                    extra={
+                        "items": [
+                            {
+                                "item_id": alert.item_id,
+                                "name": alert.item.name if alert.item else None,
+                                "quantity": alert.item.quantity_available if alert.item else alert.quantity,
+                                "threshold": alert.threshold,
+                            }
+                            for alert in alerts
+                        ],
+                    },
+                )
+                StockAlertRepository.mark_notified([alert.id for alert in alerts])
+            return alerts
@@ -0,0 +1,128 @@
+from typing import TYPE_CHECKING, Dict, Tuple
+from datetime import date, timedelta
+from flask import current_app
+from ..repositories import InventoryRepository, UtilizationRepository
+from .transaction_manager import transaction
+
+# NumPy and the kernels are imported by the methods that use them, so that
+# building the app does not pay for NumPy
+if TYPE_CHECKING:
+    import numpy as np
+    from ..utilization import DailyUsage
+
+
+class UtilizationService:
+    """Business logic layer for utilization, turnover and loan-duration analytics"""
+
+    @staticmethod
+    def _daily_usage(first: date, last: date) -> "DailyUsage":
+        """Scan loans out between first and last in column batches"""
+        from .. import utilization
+
+        usage = utilization.DailyUsage(first, last)
+        for batch in UtilizationRepository.iter_loans(first, last, current_app.config["STREAM_FETCH_SIZE"]):
+            usage.add(utilization.to_arrays(batch))
+        return usage
+
+    @staticmethod
+    def _returns(first: date, last: date) -> Dict[str, "np.ndarray"]:
+        """Columns for loans returned between first and last"""
+        import numpy as np
+
+        from .. import utilization
+
+        batches = [
+            utilization.to_arrays(batch)
+            for batch in UtilizationRepository.iter_returns(first, last, current_app.config["STREAM_FETCH_SIZE"])
+        ]
+        if not batches:
+            return utilization.to_arrays([])
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+    @staticmethod
+    def snapshot(until: date = None, since: date = None) -> Dict:
+        """
+        Write daily snapshot rows from the day after the last snapshot (or since) through until
+        until defaults to yesterday, so a daily run only scans the loans out on the new day;
+        days are rewritten a chunk per transaction, so reruns and backfills are idempotent
+        Returns dictionary with days and rows written
+        """
+        until = until or date.today() - timedelta(days=1)
+        if since is None:
+            last_day = UtilizationRepository.get_last_snapshot_day()
+            since = last_day + timedelta(days=1) if last_day else UtilizationRepository.get_first_loan_day()
+
+        chunk = timedelta(days=current_app.config["UTILIZATION_SNAPSHOT_CHUNK_DAYS"] - 1)
+        days = rows = 0
+        first = since
+        while first is not None and first <= until:
+            last = min(first + chunk, until)
+            usage = UtilizationService._daily_usage(first, last)
+            with transaction():
+                rows += UtilizationRepository.replace_snapshots(first, last, list(usage.rows()))
+            days += usage.days
+            first = last + timedelta(days=1)
+        return {"days": days, "rows": rows}
+
+    @staticmethod
+    def get_report(start: date = None, end: date = None, dimension: str = "item") -> Dict:
+        """
+        Get utilization rate, turnover and loan-duration statistics per item, category or
+        department for start..end (default: the last UTILIZATION_WINDOW_DAYS days)
+        Days covered by the snapshot are summed from it; later days are scanned live
+        """
+        from .. import utilization
+
+        if dimension not in utilization.DIMENSIONS:
+            raise ValueError(f"Group by one of: {', '.join(utilization.DIMENSIONS)}")
+        today = date.today()
+        end = min(end or today, today)
+        start = start or end - timedelta(days=current_app.config["UTILIZATION_WINDOW_DAYS"] - 1)
+        if start > end:
+            raise ValueError("Start date must be on or before the end date")
+
+        usage: Dict[Tuple[int, str], Tuple[int, int]] = {}
+
+        def add(key, loan_days, loans):
+            previous = usage.get(key, (0, 0))
+            usage[key] = (previous[0] + int(loan_days), previous[1] + int(loans))
+
+        through = UtilizationRepository.get_last_snapshot_day()
+        if through is not None and through >= start:
+            for item_id, department, loan_days, loans in UtilizationRepository.get_snapshot_totals(
+                start, min(end, through)
+            ):
+                add((item_id, department), loan_days, loans)
+        live_from = start if through is None or through < start else through + timedelta(days=1)
+        if live_from <= end:
+            for key, (loan_days, loans) in UtilizationService._daily_usage(live_from, end).totals().items():
+                add(key, loan_days, loans)
+
+        items = {
+            item_id: (name, category, units)
+            for item_id, name, category, units in InventoryRepository.get_capacity_rows()
+        }
+        days = (end - start).days + 1
+        rows = utilization.summarize(dimension, days, usage, UtilizationService._returns(start, end), items)
+        if dimension == "department":
+            rows.sort(key=lambda row: (-row["loan_days"], row["label"]))
+        else:
+            # Idle first: that is the question this report is usually opened to answer
+            rows.sort(key=lambda row: (row["utilization"] or 0, str(row["label"])))
+
+        units = sum(item[2] for item in items.values())
+        loan_days = sum(value[0] for value in usage.values())
+        return {
+            "start": start,
+            "end": end,
+            "days": days,
+            "dimension": dimension,
+            "snapshot_through": through,
+            "rows": rows,
+            "totals": {
+                "units": units,
+                "loan_days": loan_days,
+                "loans": sum(value[1] for value in usage.values()),
+                "utilization": round(loan_days / (units * days), 4) if units else None,
+            },
+        }
@@ -0,0 +1,74 @@
+import csv
+import io
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional
+from flask import current_app
+from ..repositories import InventoryRepository
+
+
+# Last report per worker process, keyed by the inventory change signature,
+# the valuation date and the depreciation settings. The signature's max
+# updated_at has whole-second resolution on MySQL, so an edit in the same
+# second as the previous one can leave it unchanged; reports also expire
+# after VALUATION_CACHE_SECONDS to bound how long that goes unseen.
+_cached: Optional[tuple] = None
+_lock = threading.Lock()
+
+
+class ValuationService:
+    """Business logic layer for inventory valuation, depreciation and aging"""
+
+    @staticmethod
+    def get_report(today: date = None) -> Dict:
+        """
+        Get cost, straight-line and declining-balance values per category plus aging buckets
+        Columns are pulled in one query and reduced with NumPy; no items are loaded as objects
+        """
+        global _cached
+        config = current_app.config
+        default_life = config["DEPRECIATION_USEFUL_LIFE_YEARS"]
+        category_life = config["DEPRECIATION_CATEGORY_LIFE"]
+        today = today or date.today()
+        key = (
+            InventoryRepository.get_change_signature(),
+            today,
+            default_life,
+            tuple(sorted(category_life.items())),
+        )
+        now = time.monotonic()
+        with _lock:
+            if _cached is not None and _cached[0] == key and now < _cached[2]:
+                return _cached[1]
+
+        # NumPy is imported on the first report, not when the app starts
+        from .. import valuation
+
+        columns = valuation.to_arrays(InventoryRepository.get_valuation_rows())
+        report = valuation.compute(columns, today, default_life, category_life)
+        with _lock:
+            _cached = (key, report, now + config["VALUATION_CACHE_SECONDS"])
+        return report
+
+    @staticmethod
+    def to_csv(report: Dict) -> str:
+        """Render a report as CSV: one row per category, a total row, then the aging buckets"""
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["category", "units", "cost", "straight_line", "declining_balance", "useful_life_years"])
+        for row in report["by_category"]:
+            writer.writerow([
+                row["category"], row["units"], row["cost"], row["straight_line"],
+                row["declining_balance"], row["useful_life_years"],
+            ])
+        totals = report["totals"]
+        writer.writerow([
+            "TOTAL", totals["units"], totals["cost"], totals["straight_line"],
+            totals["declining_balance"], "",
+        ])
+        writer.writerow([])
+        writer.writerow(["aging_bucket", "units", "cost"])
+        for row in report["aging"]:
+            writer.writerow([row["bucket"], row["units"], row["cost"]])
+        return out.getvalue()
@@ -0,0 +1,388 @@
+"""Server-side sessions: the cookie carries a random id, the data lives in a store.
+
+The signed cookie session re-verifies, decompresses and re-serializes every
+request and grows with each flashed message. With SESSION_STORE set, the
+cookie is a 43-character random token instead, and the session is a
+LazySession that reads the store the first time a view, template or
+extension reads or writes a key. A request that never does (a public page
+without the login form, the API with a bearer token) does no store I/O at
+all; Flask-Login's after_request probe for its request-scoped "_remember"
+key is answered without a read. Only changes are written back, expiry is extended at
+most once per half lifetime, and the id is replaced whenever the signed-in
+user changes, so a planted id cannot be logged into.
+
+Data is stored with a small binary codec (encode/decode) rather than JSON.
+The store is a SQL table: a SQLite file (SESSION_STORE=sqlite:///...) for
+tests and local runs, or the application database (SESSION_STORE=database)
+shared by every pod. Rows are keyed by a hash of the token, so a copy of
+the table cannot be replayed as cookies. Expired rows are deleted in batches
+by ``flask sessions sweep``.
+"""
+import hashlib
+import re
+import secrets
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from flask.sessions import SessionInterface, SessionMixin
+from sqlalchemy import create_engine, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from .models import WebSession
+
+_TOKEN = re.compile(r"^[A-Za-z0-9_-]{43}$")
+_EPOCH = datetime(1970, 1, 1)
+_USER_KEY = "_user_id"  # Flask-Login
+# Set and popped within one request, so never stored: an unloaded session
+# cannot contain them (Flask-Login checks "_remember" after every request)
+_REQUEST_KEYS = frozenset({"_remember"})
+
+# ------------------------------------------------------
+# Binary codec: one tag byte per value, varint lengths and zigzag ints.
+# Covers what Flask, Flask-Login and Flask-WTF keep in a session.
+# ------------------------------------------------------
+_VERSION = b"\x01"
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _BYTES, _LIST, _TUPLE, _DICT, _NAIVE, _UTC = range(12)
+_DOUBLE = struct.Struct(">d")
+
+
+def _varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode(value, out: bytearray) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _varint(value * 2 if value >= 0 else -value * 2 - 1, out)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out.append(_STR)
+        _varint(len(data), out)
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_BYTES)
+        _varint(len(value), out)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST if isinstance(value, list) else _TUPLE)
+        _varint(len(value), out)
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _varint(len(value), out)
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, datetime):
+        if value.tzinfo is not None:
+            out.append(_UTC)
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        else:
+            out.append(_NAIVE)
+        _encode((value - _EPOCH) // timedelta(microseconds=1), out)
+    else:
+        raise TypeError(f"Cannot store {type(value).__name__} in the session")
+
+
+def encode(value) -> bytes:
+    out = bytearray(_VERSION)
+    _encode(value, out)
+    return bytes(out)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def varint(self) -> int:
+        result = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def take(self, size: int) -> memoryview:
+        chunk = self.data[self.pos:self.pos + size]
+        if len(chunk) != size:
+            raise ValueError("Truncated session data")
+        self.pos += size
+        return chunk
+
+    def value(self):
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _NONE:
+            return None
+        if tag in (_TRUE, _FALSE):
+            return tag == _TRUE
+        if tag == _INT:
+            raw = self.varint()
+            return raw >> 1 if not raw & 1 else -(raw >> 1) - 1
+        if tag == _FLOAT:
+            return _DOUBLE.unpack(self.take(8))[0]
+        if tag == _STR:
+            return str(self.take(self.varint()), "utf-8")
+        if tag == _BYTES:
+            return bytes(self.take(self.varint()))
+        if tag in (_LIST, _TUPLE):
+            items = [self.value() for _ in range(self.varint())]
+            return items if tag == _LIST else tuple(items)
+        if tag == _DICT:
+            return {self.value(): self.value() for _ in range(self.varint())}
+        if tag in (_NAIVE, _UTC):
+            moment = _EPOCH + timedelta(microseconds=self.value())
+            return moment.replace(tzinfo=timezone.utc) if tag == _UTC else moment
+        raise ValueError(f"Unknown session data tag {tag}")
+
+
+def decode(data: bytes):
+    if data[:1] != _VERSION:
+        raise ValueError("Unknown session data version")
+    return _Reader(data[1:]).value()
+
+
+# ------------------------------------------------------
+# Store
+# ------------------------------------------------------
+class SqlSessionStore:
+    """Session rows in the web_sessions table of `engine` (a callable, so db.engine resolves per app)"""
+
+    def __init__(self, engine: Callable, create_table: bool = False):
+        self._engine = engine
+        self._create_table = create_table
+        self._table = WebSession.__table__
+
+    @property
+    def engine(self):
+        engine = self._engine()
+        if self._create_table:
+            self._table.create(engine, checkfirst=True)
+            self._create_table = False
+        return engine
+
+    def load(self, key: str, now: datetime) -> Optional[Tuple[bytes, datetime]]:
+        """(data, expires_at) of an unexpired session, or None"""
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(self._table.c.data, self._table.c.expires_at).where(self._table.c.id == key)
+            ).first()
+        if row is None or row.expires_at <= now:
+            return None
+        return row.data, row.expires_at
+
+    def add(self, key: str, data: bytes, expires_at: datetime) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(insert(self._table).values(id=key, data=data, expires_at=expires_at))
+
+    def save(self, key: str, data: bytes, expires_at: datetime) -> None:
+        """Overwrite a session, re-adding it if the sweeper got there first"""
+        statement = update(self._table).where(self._table.c.id == key).values(data=data, expires_at=expires_at)
+        try:
+            with self.engine.begin() as conn:
+                if not conn.execute(statement).rowcount:
+                    conn.execute(insert(self._table).values(id=key, data=data, expires_at=expires_at))
+        except IntegrityError:  # a concurrent request re-added it first
+            with self.engine.begin() as conn:
+                conn.execute(statement)
+
+    def touch(self, key: str, expires_at: datetime) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(update(self._table).where(self._table.c.id == key).values(expires_at=expires_at))
+
+    def delete(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self._table).where(self._table.c.id == key))
+
+    def sweep(self, now: datetime, batch_size: int = 1000, max_batches: int = None) -> int:
+        """
+        Delete expired sessions in batches, one short transaction each
+        Returns number of sessions deleted
+        """
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with self.engine.begin() as conn:
+                ids = conn.execute(
+                    select(self._table.c.id)
+                    .where(self._table.c.expires_at <= now)
+                    .order_by(self._table.c.expires_at)
+                    .limit(batch_size)
+                ).scalars().all()
+                if ids:
+                    deleted += conn.execute(delete(self._table).where(self._table.c.id.in_(ids))).rowcount
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return deleted
+
+
+def store_for(target: str) -> SqlSessionStore:
+    """SESSION_STORE: "database" (the app's database) or a SQLAlchemy URL such as sqlite:////tmp/sessions.db"""
+    if target == "database":
+        from .extensions import db
+
+        return SqlSessionStore(lambda: db.engine)
+    engine = create_engine(target)
+    return SqlSessionStore(lambda: engine, create_table=True)
+
+
+# ------------------------------------------------------
+# Flask session interface
+# ------------------------------------------------------
+class LazySession(SessionMixin):
+    """A session dict that reads its data from the store on first access"""
+
+    def __init__(self, token: Optional[str], loader: Callable[[], Optional[Tuple[Dict, datetime]]]):
+        self.token = token
+        self.expires_at: Optional[datetime] = None
+        self.loaded_user = None
+        self.modified = False
+        self.accessed = False
+        self._loader = loader
+        self._data: Optional[Dict] = None
+
+    @property
+    def data(self) -> Dict:
+        if self._data is None:
+            self.accessed = True
+            stored = self._loader() if self.token else None
+            if stored is None:
+                self._data = {}
+            else:
+                self._data, self.expires_at = stored
+            self.loaded_user = self._data.get(_USER_KEY)
+        return self._data
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    @property
+    def new(self) -> bool:
+        return self.expires_at is None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        if self._data is None and key in _REQUEST_KEYS:
+            return False
+        return key in self.data
+
+    def get(self, key, default=None):
+        if self._data is None and key in _REQUEST_KEYS:
+            return default
+        return self.data.get(key, default)
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        self.data.clear()
+        self.modified = True
+
+
+def _key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, store: SqlSessionStore, idle_timeout: timedelta):
+        self.store = store
+        self.idle_timeout = idle_timeout
+
+    def _lifetime(self, app, session: LazySession) -> timedelta:
+        return app.permanent_session_lifetime if session.permanent else self.idle_timeout
+
+    def _load(self, token: str) -> Optional[Tuple[Dict, datetime]]:
+        stored = self.store.load(_key(token), datetime.utcnow())
+        if stored is None:
+            return None
+        data, expires_at = stored
+        try:
+            return decode(data), expires_at
+        except (ValueError, IndexError, UnicodeDecodeError):
+            return None  # unreadable: start over rather than fail the request
+
+    def open_session(self, app, request) -> LazySession:
+        token = request.cookies.get(self.get_cookie_name(app))
+        if not token or not _TOKEN.match(token):
+            token = None
+        return LazySession(token, lambda: self._load(token))
+
+    def save_session(self, app, session: LazySession, response) -> None:
+        if not session.loaded:
+            return  # never touched: no read, no write, cookie unchanged
+        response.vary.add("Cookie")
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.token and not session.new:
+                self.store.delete(_key(session.token))
+            if session.token:
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        now = datetime.utcnow()
+        lifetime = self._lifetime(app, session)
+        if session.new or session.get(_USER_KEY) != session.loaded_user:
+            # New, or signed in or out: always under an id nobody has seen, so
+            # neither a planted cookie nor an old one reaches this session
+            if not session.new:
+                self.store.delete(_key(session.token))
+            session.token = secrets.token_urlsafe(32)
+            self.store.add(_key(session.token), encode(dict(session)), now + lifetime)
+        elif session.modified:
+            self.store.save(_key(session.token), encode(dict(session)), now + lifetime)
+        elif session.expires_at - now < lifetime / 2:
+            self.store.touch(_key(session.token), now + lifetime)
+        else:
+            return  # unchanged and not due for an expiry bump: the cookie stands
+
+        response.set_cookie(
+            name,
+            session.token,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
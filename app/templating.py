@@ -0,0 +1,56 @@
+"""Jinja environment setup shared by the app factory, CLI and gunicorn hooks"""
+import os
+from typing import Iterable, Iterator, List
+
+from flask import Flask, current_app, get_flashed_messages, stream_template
+from flask_wtf.csrf import generate_csrf
+from jinja2 import FileSystemBytecodeCache
+
+
+def configure_templates(app: Flask) -> None:
+    """Enable the on-disk bytecode cache; must run before `app.jinja_env` is first used."""
+    cache_dir = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_options = {
+            **app.jinja_options,
+            "bytecode_cache": FileSystemBytecodeCache(cache_dir),
+        }
+
+
+def _buffered(chunks: Iterable[str], size: int) -> Iterator[str]:
+    """Coalesce Jinja's many tiny events into socket-sized writes."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_page(template_name: str, **context):
+    """
+    Render a template as a streamed response
+    Rows passed as generators are consumed while the page is being sent
+    """
+    # The session cookie goes out with the headers, before the body renders,
+    # so anything that touches the session has to happen now.
+    get_flashed_messages(with_categories=True)
+    generate_csrf()
+    chunks = stream_template(template_name, **context)
+    return current_app.response_class(
+        _buffered(chunks, current_app.config["TEMPLATE_STREAM_BUFFER_SIZE"]),
+        mimetype="text/html",
+    )
+
+
+def precompile_templates(app: Flask) -> List[str]:
+    """Compile every HTML template into the in-memory cache (and the bytecode cache)."""
+    env = app.jinja_env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return names
@@ -0,0 +1,438 @@
+"""Lightweight request tracing, exported as OTLP/JSON.
+
+TracingMiddleware opens a SERVER span per request, continuing the caller's
+trace when it sends a W3C ``traceparent`` header. While a sampled request
+runs, every call to a service or repository method (``RequestService.
+approve_request``, ``RequestRepository.get_by_id`` ...) becomes a child span,
+and every SQL statement a CLIENT span under whichever of them issued it.
+Unsampled requests still get a trace id, so logs and the ``traceresponse``
+header can name the trace, but record nothing else.
+
+Finished spans go into a bounded queue (full: dropped and counted) that a
+background thread exports in batches as ExportTraceServiceRequest JSON: one
+object per line appended to a file (what the collector's ``otlpjsonfile``
+receiver reads) or POSTed to an OTLP/HTTP endpoint such as
+``http://collector:4318/v1/traces``.
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import re
+import secrets
+import socket
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+# OTLP SpanKind and StatusCode values
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+STATEMENT_LIMIT = 2000  # characters of SQL kept on a span
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_FLUSH = object()  # queued by flush(): export what came before it now
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_tracer: Optional["Tracer"] = None
+
+
+class Span:
+    """One timed operation; `sampled` spans are exported when they end"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+                 "start_ns", "end_ns", "attributes", "events", "status", "status_message")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: int, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes: Dict = {}
+        self.events: List[Dict] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.events.append({
+            "name": "exception",
+            "time_ns": time.time_ns(),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def child(self, name: str, kind: int = KIND_INTERNAL) -> "Span":
+        return Span(self.trace_id, self.span_id, name, kind, self.sampled)
+
+
+def parse_traceparent(header: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None if absent or invalid"""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: Iterable[Span], resource: Dict) -> Dict:
+    """An OTLP ExportTraceServiceRequest in its JSON encoding (ids as hex)"""
+    encoded = []
+    for span in spans:
+        entry = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": span.status, "message": span.status_message},
+        }
+        if span.parent_id:
+            entry["parentSpanId"] = span.parent_id
+        if span.events:
+            entry["events"] = [{
+                "name": event["name"],
+                "timeUnixNano": str(event["time_ns"]),
+                "attributes": _otlp_attributes(event["attributes"]),
+            } for event in span.events]
+        encoded.append(entry)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes(resource)},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": encoded}],
+    }]}
+
+
+class FileSpanExporter:
+    """Append one OTLP/JSON line per batch; the file is rotated to <path>.1 past max_bytes"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, payload: Dict) -> None:
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            try:
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+            except FileNotFoundError:
+                pass
+            # One write per line on an O_APPEND file, so workers never interleave
+            with open(self.path, "a") as fh:
+                fh.write(line)
+
+
+class HttpSpanExporter:
+    """POST each batch to an OTLP/HTTP JSON endpoint"""
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def export(self, payload: Dict) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        request = urllib.request.Request(self.url, body, {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def exporter_for(target: str, max_bytes: int):
+    if target.startswith(("http://", "https://")):
+        return HttpSpanExporter(target)
+    return FileSpanExporter(target[len("file://"):] if target.startswith("file://") else target, max_bytes)
+
+
+class BatchSpanProcessor:
+    """
+    Bounded queue of finished spans drained by one exporter thread
+    A batch goes out when batch_size spans are waiting or flush_interval has
+    passed; spans that do not fit in the queue, and batches the exporter
+    fails on, are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, exporter, resource: Dict, queue_size: int, batch_size: int, flush_interval: float):
+        self.exporter = exporter
+        self.resource = resource
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._flushed = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self) -> None:
+        # Threads do not survive fork, so each gunicorn worker starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # A forked child: the parent exports what it queued, and the
+                # inherited queue's mutex may have been held by a parent thread
+                self._queue = queue.Queue(self._queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _take(self, item, timeout: float):
+        """(batch, flush requested) starting from `item`, ending at batch_size, a flush or the timeout"""
+        batch, deadline = [], time.monotonic() + timeout
+        while item is not _FLUSH:
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                return batch, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(to_otlp(batch, dict(self.resource, **{"process.pid": os.getpid()})))
+        except Exception:  # a missing collector must not take the app down
+            self.dropped += len(batch)
+
+    def _run(self) -> None:
+        while True:
+            batch, flush = self._take(self._queue.get(), self.flush_interval)
+            if batch:
+                self._export(batch)
+            if flush:
+                self._flushed.set()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait (up to `timeout`) until the spans queued so far are exported"""
+        if self._thread is None or self._pid != os.getpid():
+            return  # nothing traced in this process since fork
+        self._flushed.clear()
+        try:
+            self._queue.put(_FLUSH, timeout=timeout)
+        except queue.Full:
+            return
+        self._flushed.wait(timeout)
+
+
+class Tracer:
+    def __init__(self, processor: BatchSpanProcessor, sample_rate: float):
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    def start_request_span(self, name: str, traceparent: Optional[str]) -> Span:
+        """A SERVER span continuing the caller's trace, or the root of a new one"""
+        parent = parse_traceparent(traceparent)
+        if parent:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = random.random() < self.sample_rate
+        return Span(trace_id, parent_id, name, KIND_SERVER, sampled)
+
+    def end(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if span.sampled:
+            self.processor.on_end(span)
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def activate(span: Span):
+    """Make `span` the parent of spans started on this thread; pass the token to deactivate()"""
+    return _current.set(span)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def start_span(name: str, kind: int = KIND_INTERNAL, attributes: Optional[Dict] = None):
+    """
+    A child of the current span for the duration of the block
+    Yields None, at no cost, when tracing is off or the request is not sampled.
+    """
+    parent = _current.get()
+    if _tracer is None or parent is None or not parent.sampled:
+        yield None
+        return
+    span = parent.child(name, kind)
+    if attributes:
+        span.attributes.update(attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_exception(exc)
+        raise
+    finally:
+        _current.reset(token)
+        _tracer.end(span)
+
+
+def _traced(name: str, func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def traced_async(*args, **kwargs):
+            with start_span(name):
+                return await func(*args, **kwargs)
+        traced_async.__traced__ = True
+        return traced_async
+
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        parent = _current.get()
+        if parent is None or not parent.sampled:
+            return func(*args, **kwargs)
+        with start_span(name):
+            return func(*args, **kwargs)
+    traced.__traced__ = True
+    return traced
+
+
+def instrument_classes(classes: Iterable[type]) -> None:
+    """Wrap the public static methods of each class so calls become "Class.method" spans"""
+    for cls in classes:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not isinstance(value, staticmethod):
+                continue
+            if getattr(value.__func__, "__traced__", False):
+                continue  # already wrapped by an earlier create_app()
+            setattr(cls, attr, staticmethod(_traced(f"{cls.__name__}.{attr}", value.__func__)))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current.get()
+    if _tracer is None or parent is None or not parent.sampled:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    span = parent.child(operation, KIND_CLIENT)
+    span.attributes.update({
+        "db.system": conn.dialect.name,
+        "db.operation.name": operation,
+        "db.query.text": statement[:STATEMENT_LIMIT],
+    })
+    if executemany:
+        span.set_attribute("db.operation.batch.size", len(parameters))
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        _tracer.end(spans.pop())
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans:
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        _tracer.end(span)
+
+
+def instrument_sql() -> None:
+    """Trace statements on every engine, including the async engine's sync core"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+
+def configure_tracer(config) -> Tracer:
+    """Build the process-wide tracer from TRACE_* settings; it replaces any earlier one"""
+    global _tracer
+    resource = {
+        "service.name": config["TRACE_SERVICE_NAME"],
+        "host.name": socket.gethostname(),
+    }
+    processor = BatchSpanProcessor(
+        exporter_for(config["TRACE_EXPORT"], config["TRACE_FILE_MAX_MB"] * 1024 * 1024),
+        resource,
+        config["TRACE_QUEUE_SIZE"],
+        config["TRACE_BATCH_SIZE"],
+        config["TRACE_FLUSH_SECONDS"],
+    )
+    if _tracer is None:
+        atexit.register(lambda: _tracer and _tracer.processor.flush())
+    _tracer = Tracer(processor, config["TRACE_SAMPLE_RATE"])
+    return _tracer
+
+
+def register_request_tracing(app) -> None:
+    """Name each request span after its route once Flask has matched it"""
+    from flask import g, request
+
+    @app.before_request
+    def name_request_span():
+        span = _current.get()
+        if span is None or not span.sampled:
+            return
+        if request.url_rule is not None:
+            span.name = f"{request.method} {request.url_rule.rule}"
+            span.set_attribute("http.route", request.url_rule.rule)
+            span.set_attribute("app.endpoint", request.endpoint)
+        if "request_id" in g:
+            span.set_attribute("app.request_id", g.request_id)
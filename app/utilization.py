@@ -0,0 +1,162 @@
+"""Vectorised loan-day, turnover and loan-duration statistics over assignment column batches"""
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DIMENSIONS = ("item", "category", "department")
+PERCENTILES = (50, 90)
+NO_DEPARTMENT = ""
+
+# Rows of a DailyUsage matrix
+ON_LOAN, STARTED, RETURNED, RETURNED_DAYS = range(4)
+
+
+def to_arrays(rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """Turn (item_id, department, allocation_date, return_date) rows into column arrays"""
+    rows = [row for row in rows if row[2] is not None]
+    if not rows:
+        return {
+            "item_id": np.array([], dtype=np.int64),
+            "department": np.array([], dtype=object),
+            "allocated": np.array([], dtype="datetime64[D]"),
+            "returned": np.array([], dtype="datetime64[D]"),
+        }
+    item_ids, departments, allocated, returned = zip(*rows)
+    return {
+        "item_id": np.array(item_ids, dtype=np.int64),
+        "department": np.array([name or NO_DEPARTMENT for name in departments], dtype=object),
+        "allocated": np.array(allocated, dtype="datetime64[D]"),
+        "returned": np.array(returned, dtype="datetime64[D]"),
+    }
+
+
+class DailyUsage:
+    """
+    Per (item, department) daily counts over the days first..last, accumulated batch by batch
+    A loan is on loan from its allocation date up to, but not including, its return date
+    """
+
+    def __init__(self, first: date, last: date):
+        self.first = first
+        self.days = max((last - first).days + 1, 0)
+        self.counts: Dict[Tuple[int, str], np.ndarray] = {}
+
+    def add(self, columns: Dict[str, np.ndarray]) -> None:
+        if not len(columns["item_id"]) or not self.days:
+            return
+        departments, department_codes = np.unique(columns["department"], return_inverse=True)
+        combined = columns["item_id"] * len(departments) + department_codes
+        keys, index = np.unique(combined, return_inverse=True)
+
+        first = np.datetime64(self.first, "D")
+        start = (columns["allocated"] - first).astype(np.int64)
+        open_loan = np.isnat(columns["returned"])
+        end = np.where(open_loan, self.days, (columns["returned"] - first).astype(np.int64))
+
+        block = np.zeros((4, len(keys), self.days + 1), dtype=np.int64)
+        np.add.at(block[ON_LOAN], (index, np.clip(start, 0, self.days)), 1)
+        np.add.at(block[ON_LOAN], (index, np.clip(end, 0, self.days)), -1)
+        block[ON_LOAN] = np.cumsum(block[ON_LOAN], axis=1)
+
+        started = (start >= 0) & (start < self.days)
+        np.add.at(block[STARTED], (index[started], start[started]), 1)
+        returned = ~open_loan & (end >= 0) & (end < self.days)
+        np.add.at(block[RETURNED], (index[returned], end[returned]), 1)
+        np.add.at(block[RETURNED_DAYS], (index[returned], end[returned]), (end - start)[returned])
+
+        block = block[:, :, :self.days]
+        for i, key in enumerate(keys.tolist()):
+            item_key = (key // len(departments), str(departments[key % len(departments)]))
+            if item_key in self.counts:
+                self.counts[item_key] += block[:, i]
+            else:
+                self.counts[item_key] = block[:, i].copy()
+
+    def rows(self) -> Iterator[tuple]:
+        """(day, item_id, department, on_loan, started, returned, returned_days) for non-empty days"""
+        for (item_id, department), counts in self.counts.items():
+            for day in np.flatnonzero(counts.any(axis=0)).tolist():
+                yield (
+                    self.first + timedelta(days=day), item_id, department,
+                    *(int(value) for value in counts[:, day]),
+                )
+
+    def totals(self) -> Dict[Tuple[int, str], Tuple[int, int]]:
+        """(item_id, department) -> (loan days, loans started) over the whole range"""
+        return {
+            key: (int(counts[ON_LOAN].sum()), int(counts[STARTED].sum()))
+            for key, counts in self.counts.items()
+        }
+
+
+def _label(dimension: str, item_id: int, department: str, items: Dict[int, tuple]):
+    if dimension == "item":
+        return item_id
+    if dimension == "category":
+        item = items.get(item_id)
+        return item[1] if item else "Unknown"
+    return department or NO_DEPARTMENT
+
+
+def summarize(dimension: str, days: int, usage: Dict[Tuple[int, str], Tuple[int, int]],
+              durations: Dict[str, np.ndarray], items: Dict[int, tuple]) -> List[Dict]:
+    """
+    Utilization, turnover and loan-duration statistics per item, category or department
+    usage is (item_id, department) -> (loan days, loans started) for the window, durations
+    the loans returned in it and items id -> (name, category, units owned). Utilization and
+    turnover are measured against units owned, so departments have neither
+    """
+    groups: Dict[object, Dict] = {}
+
+    def group(label) -> Dict:
+        if label not in groups:
+            groups[label] = {"key": label, "units": 0, "loan_days": 0, "loans": 0}
+        return groups[label]
+
+    if dimension != "department":
+        for item_id, item in items.items():
+            group(_label(dimension, item_id, NO_DEPARTMENT, items))["units"] += item[2]
+    for (item_id, department), (loan_days, loans) in usage.items():
+        row = group(_label(dimension, item_id, department, items))
+        row["loan_days"] += loan_days
+        row["loans"] += loans
+
+    # Loan durations, grouped with one sort rather than a pass per group
+    stats: Dict[object, Dict] = {}
+    if len(durations["item_id"]):
+        item_ids, item_index = np.unique(durations["item_id"], return_inverse=True)
+        if dimension == "department":
+            labels = durations["department"]
+        else:
+            labels = np.array(
+                [_label(dimension, item_id, NO_DEPARTMENT, items) for item_id in item_ids.tolist()],
+                dtype=object,
+            )[item_index]
+        keys, index = np.unique(labels, return_inverse=True)
+        lengths = (durations["returned"] - durations["allocated"]).astype(np.int64)
+        order = np.lexsort((lengths, index))
+        for key, chunk in zip(keys.tolist(), np.split(lengths[order], np.cumsum(np.bincount(index))[:-1])):
+            percentiles = np.percentile(chunk, PERCENTILES)
+            stats[key] = {
+                "returned": int(len(chunk)),
+                "mean_days": round(float(chunk.mean()), 1),
+                **{f"p{p}_days": round(float(value), 1) for p, value in zip(PERCENTILES, percentiles)},
+            }
+
+    empty = {"returned": 0, "mean_days": None, **{f"p{p}_days": None for p in PERCENTILES}}
+    results = []
+    for label in set(groups) | set(stats):
+        row = dict(groups.get(label) or {"key": label, "units": 0, "loan_days": 0, "loans": 0})
+        row.update(stats.get(label, empty))
+        if dimension == "item":
+            item = items.get(label)
+            row["label"] = item[0] if item else f"Item #{label}"
+        else:
+            row["label"] = label or "No department"
+        units: Optional[int] = row["units"] if dimension != "department" else None
+        row["units"] = units
+        row["utilization"] = round(row["loan_days"] / (units * days), 4) if units and days else None
+        row["turnover"] = round(row["loans"] / units, 2) if units else None
+        results.append(row)
+    return results
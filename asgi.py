@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+
+
+# Optional async read path: uvicorn asgi:app --workers 2
+app = create_asgi_app()
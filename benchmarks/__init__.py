@@ -0,0 +1,24 @@
+"""Benchmark and load-test suite.
+
+Runs against its own database, chosen with ``--database-url`` (default: a
+SQLite file under ``benchmarks/.data``). The URL is exported as
+DATABASE_URL before the app is imported, so never point it at production::
+
+    python -m benchmarks seed --scale medium          # small | medium | large
+    python -m benchmarks run                          # micro + load + system
+    python -m benchmarks run --suite micro --only Inventory
+    python -m benchmarks run --save-baseline          # store benchmarks/baseline.json
+    python -m benchmarks run --baseline benchmarks/baseline.json   # exit 1 on regressions
+    python -m benchmarks run --suite system --import-budget-ms 1500  # exit 1 on slow start-up imports
+    python -m benchmarks queries                      # exit 1 if a route's query count grows (N+1)
+
+MySQL: run ``flask migrate-locked`` against the database first so the schema
+(and audit partitioning) matches production, then seed and run as above.
+
+Reports are JSON with throughput, mean/p50/p99 latency and queries per
+operation for every result. Queue, allocation and forecast timings scale with
+the seed, so compare reports taken at the same ``--scale``.
+
+``queries`` resets its own database (``benchmarks/.data/queries.db`` unless
+``--database-url`` is given), so run it in CI next to the build.
+"""
@@ -0,0 +1,214 @@
+"""python -m benchmarks {seed,run} — see the package docstring for usage."""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_DATABASE_URL = f"sqlite:///{HERE / '.data' / 'bench.db'}"
+# `queries` drops every table first, so it never defaults to the seeded database
+QUERIES_DATABASE_URL = f"sqlite:///{HERE / '.data' / 'queries.db'}"
+DEFAULT_BASELINE = HERE / "baseline.json"
+SUITES = ("micro", "load", "system")
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"),
+                        help=f"SQLAlchemy URL of a throwaway database (default: {DEFAULT_DATABASE_URL}, "
+                             f"or {QUERIES_DATABASE_URL} for `queries`)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="fill the benchmark database")
+    seed.add_argument("--scale", choices=("small", "medium", "large"), default="small")
+    seed.add_argument("--seed", type=int, default=1, help="random seed")
+    seed.add_argument("--reset", action="store_true", help="drop every table first")
+
+    run = commands.add_parser("run", help="run suites and write a JSON report")
+    run.add_argument("--suite", action="append", choices=SUITES,
+                     help="repeatable; default: every suite")
+    run.add_argument("--only", help="micro: only cases whose name contains this")
+    run.add_argument("--iterations", type=int, default=30, help="micro: timed calls per case")
+    run.add_argument("--kernel-rows", type=int, default=1_000_000, help="micro: rows for the numpy kernels")
+    run.add_argument("--rounds", type=int, default=20, help="load: flow repetitions per virtual user")
+    run.add_argument("--concurrency", type=int, default=4, help="load: virtual users per flow")
+    run.add_argument("--gunicorn", action="store_true", help="system: also time a gunicorn boot")
+    run.add_argument("--import-budget-ms", type=float,
+                     help="system: exit 1 when create_app() spends longer than this importing")
+    run.add_argument("--output", type=Path, help="report path (default: benchmarks/reports/<timestamp>.json)")
+    run.add_argument("--baseline", type=Path, help="compare against this report; exit 1 on regressions")
+    run.add_argument("--save-baseline", action="store_true", help=f"also write the report to {DEFAULT_BASELINE}")
+    run.add_argument("--tolerance", type=float, default=0.2,
+                     help="allowed latency/throughput drift before a regression (default: %(default)s)")
+
+    queries = commands.add_parser("queries", help="fail when a route's query count grows with the data (N+1)")
+    queries.add_argument("--output", type=Path, help="also write the per-route counts as JSON")
+    return parser
+
+
+def _prepare_environment(database_url: str) -> None:
+    """Must run before anything imports config: Config reads the environment at class creation"""
+    from .harness import BENCH_API_TOKEN
+
+    if database_url.startswith("sqlite:///"):
+        Path(database_url[len("sqlite:///"):]).parent.mkdir(parents=True, exist_ok=True)
+    os.environ["DATABASE_URL"] = database_url
+    tokens = {token for token in os.getenv("API_TOKENS", "").split(",") if token}
+    os.environ["API_TOKENS"] = ",".join(sorted(tokens | {BENCH_API_TOKEN}))
+    # Every virtual user logs in and submits from 127.0.0.1
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+def _seed(app, args) -> None:
+    from app.extensions import db
+
+    from .seed import seed
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        sizes = seed(args.scale, args.seed)
+    print("seeded " + ", ".join(f"{name}={count}" for name, count in sizes.items()))
+
+
+def _row_counts() -> dict:
+    from sqlalchemy import func, select
+
+    from app.extensions import db
+    from app.models import Feedback, InventoryItem, ItemAssignment, ItemRequest, StaffUser
+
+    return {
+        model.__tablename__: db.session.scalar(select(func.count()).select_from(model))
+        for model in (StaffUser, InventoryItem, ItemRequest, ItemAssignment, Feedback)
+    }
+
+
+def _page_html(app) -> bytes:
+    """A real admin page for the compression benchmarks"""
+    from .load import _login
+
+    return _login(app, "admin", "admin@bench.example.com").get("/admin/requests").get_data()
+
+
+def _run(app, args) -> int:
+    from datetime import datetime
+
+    from app.extensions import db
+
+    from . import report
+    from .harness import QueryCounter
+
+    suites = args.suite or list(SUITES)
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        meta = {
+            "dialect": db.engine.dialect.name,
+            "rows": _row_counts(),
+            "options": {key: value for key, value in vars(args).items()
+                        if key not in ("command", "database_url", "output", "baseline", "save_baseline")},
+        }
+        if not meta["rows"]["staff_users"]:
+            print("benchmark database is empty; run `python -m benchmarks seed` first", file=sys.stderr)
+            return 2
+
+    sections = {}
+    if "micro" in suites:
+        from . import micro
+
+        page_html = _page_html(app)
+        with app.app_context():
+            sections["micro"] = micro.run(app, counter, args.iterations, args.kernel_rows, args.only, page_html)
+        if sections["micro"]["uncovered"]:
+            print("no micro-benchmark for: " + ", ".join(sections["micro"]["uncovered"]), file=sys.stderr)
+    if "load" in suites:
+        from . import load
+
+        sections["load"] = {"results": load.run(app, counter, args.rounds, args.concurrency)}
+    if "system" in suites:
+        from . import system
+
+        sections["system"] = system.run(args.gunicorn)
+
+    result = report.build(sections, **meta)
+    output = args.output or HERE / "reports" / f"{datetime.utcnow():%Y%m%dT%H%M%SZ}.json"
+    report.write(result, output)
+    print(f"report written to {output}")
+    if args.save_baseline:
+        report.write(result, DEFAULT_BASELINE)
+        print(f"baseline written to {DEFAULT_BASELINE}")
+
+    _print_summary(sections)
+    status = 0
+    if "system" in sections:
+        from .system import over_budget
+
+        for message in over_budget(sections["system"], args.import_budget_ms):
+            print(message)
+            status = 1
+    if args.baseline:
+        regressions = report.compare(result, report.load(args.baseline), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}:")
+            print(report.format_regressions(regressions))
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return status
+
+
+def _queries(app, args) -> int:
+    from app.extensions import db
+
+    from . import queries, report
+    from .harness import QueryCounter
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    result = queries.run(app, counter)
+    if args.output:
+        report.write(report.build({"queries": result}), args.output)
+        print(f"report written to {args.output}")
+    for name, route in result["routes"].items():
+        counts = " -> ".join(str(count) for count in route["queries"].values())
+        print(f"{name:45} {route.get('error') or counts}")
+    if result["failures"]:
+        print(f"{len(result['failures'])} route(s) failed the query-count guard:")
+        print("\n".join(f"  {failure}" for failure in result["failures"]))
+        return 1
+    print(f"query counts are flat across {', '.join(result['sizes'])} for {len(result['routes'])} routes")
+    return 0
+
+
+def _print_summary(sections: dict) -> None:
+    for section in ("micro", "load"):
+        for name, result in sections.get(section, {}).get("results", {}).items():
+            if "p50_ms" not in result:
+                print(f"{section:5} {name:60} {result.get('error') or result.get('skipped', '')}")
+                continue
+            print(
+                f"{section:5} {name:60} {result['ops_per_sec']:>10.1f}/s "
+                f"p50 {result['p50_ms']:>8.3f}ms p99 {result['p99_ms']:>8.3f}ms "
+                f"q/op {result.get('queries_per_op', '-'):>5}"
+            )
+    imports = sections.get("system", {}).get("import_time")
+    if imports:
+        print(f"system create_app() imports {imports['total_ms']}ms (import app {imports['import_app_ms']}ms)")
+
+
+def main(argv=None) -> int:
+    args = _parser().parse_args(argv)
+    default_url = QUERIES_DATABASE_URL if args.command == "queries" else DEFAULT_DATABASE_URL
+    _prepare_environment(args.database_url or default_url)
+
+    from .harness import create_bench_app
+
+    app = create_bench_app()
+    if args.command == "seed":
+        _seed(app, args)
+        return 0
+    if args.command == "queries":
+        return _queries(app, args)
+    return _run(app, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
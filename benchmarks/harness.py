@@ -0,0 +1,107 @@
+"""Timing, query counting and the benchmark app factory shared by every suite."""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import event
+
+BENCH_API_TOKEN = "bench-token"
+
+
+def create_bench_app():
+    """The production app against DATABASE_URL, with CSRF off, a known API token and quiet logs"""
+    import logging
+
+    from app import create_app
+
+    app = create_app()
+    app.logger.setLevel(logging.WARNING)
+    app.config.update(
+        WTF_CSRF_ENABLED=False,
+        API_TOKENS=frozenset({BENCH_API_TOKEN}),
+        TESTING=False,
+    )
+    return app
+
+
+class QueryCounter:
+    """Counts statements executed on an engine, per thread"""
+
+    def __init__(self, engine):
+        self._local = threading.local()
+        self.attach(engine)
+
+    def attach(self, engine) -> None:
+        """Also count statements run on another (sync) engine"""
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self._local.count = getattr(self._local, "count", 0) + 1
+
+    @property
+    def count(self) -> int:
+        return getattr(self._local, "count", 0)
+
+    @contextmanager
+    def counting(self):
+        """Yield a one-item list that holds the statements run inside the block once it exits"""
+        start = self.count
+        result = [0]
+        try:
+            yield result
+        finally:
+            result[0] = self.count - start
+
+
+def summarize(samples_ns: List[int], queries: List[int] = None, elapsed_s: float = None) -> Dict:
+    """Throughput, mean, p50 and p99 (milliseconds) and queries per operation for timed samples"""
+    if not samples_ns:
+        return {"iterations": 0}
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p99 = np.percentile(samples, (50, 99))
+    elapsed_s = elapsed_s if elapsed_s is not None else samples.sum() / 1e3
+    result = {
+        "iterations": int(len(samples)),
+        "ops_per_sec": round(len(samples) / elapsed_s, 2) if elapsed_s else None,
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+    if queries is not None:
+        result["queries_per_op"] = round(float(np.mean(queries)), 2)
+    return result
+
+
+def measure(fn: Callable[[object], object], setup: Optional[Callable[[], object]] = None,
+            teardown: Optional[Callable[[object], None]] = None, counter: QueryCounter = None,
+            iterations: int = 50, warmup: int = 3, max_seconds: float = 5.0) -> Dict:
+    """
+    Time fn(setup()) repeatedly; setup and teardown run outside the timed region
+    Stops early after max_seconds of timed work so slow cases stay bounded
+    """
+    samples, queries = [], []
+    spent = 0.0
+    for i in range(warmup + iterations):
+        state = setup() if setup else None
+        if counter is not None:
+            with counter.counting() as executed:
+                start = time.perf_counter_ns()
+                fn(state)
+                took = time.perf_counter_ns() - start
+        else:
+            executed = None
+            start = time.perf_counter_ns()
+            fn(state)
+            took = time.perf_counter_ns() - start
+        if teardown:
+            teardown(state)
+        if i >= warmup:
+            samples.append(took)
+            if executed is not None:
+                queries.append(executed[0])
+            spent += took / 1e9
+            if spent >= max_seconds:
+                break
+    return summarize(samples, queries if counter is not None else None)
@@ -0,0 +1,204 @@
+"""In-process load driver: replays admin, staff and API flows through the full WSGI stack.
+
+Every virtual user is a Flask test client on its own thread, logged in once,
+so each request still goes through the middleware, routing, forms, templates
+and the database. Streamed pages are read chunk by chunk, which gives a
+time-to-first-byte next to the total time.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import StaffUser
+
+from .harness import BENCH_API_TOKEN, QueryCounter, summarize
+from .seed import SEED_PASSWORD
+
+FEEDBACK_FORM = {
+    "rating": "4",
+    "question_1": "Assigning devices was quick.",
+    "question_2": "Stock levels were clear.",
+    "question_3": "Approval took about a day.",
+    "question_4": "Returns were straightforward.",
+    "question_5": "",
+}
+REQUEST_FORM = {"item_name": "USB-C dock", "justification": "Needed for the new desk setup."}
+HEADERS = {"Accept-Encoding": "gzip"}
+
+
+class Recorder:
+    """Per-endpoint latency, time-to-first-byte, query counts and failures, shared by threads"""
+
+    def __init__(self, counter: QueryCounter):
+        self.counter = counter
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[int]] = defaultdict(list)
+        self.first_byte: Dict[str, List[int]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def request(self, client, name: str, method: str, url: str, headers: Dict[str, str] = None, **kwargs) -> int:
+        headers = {**HEADERS, **(headers or {})}
+        with self.counter.counting() as executed:
+            start = time.perf_counter_ns()
+            response = client.open(url, method=method, buffered=False, headers=headers, **kwargs)
+            first = None
+            for _chunk in response.response:
+                if first is None:
+                    first = time.perf_counter_ns()
+            response.close()
+            end = time.perf_counter_ns()
+        with self._lock:
+            self.samples[name].append(end - start)
+            self.first_byte[name].append((first or end) - start)
+            self.queries[name].append(executed[0])
+            if response.status_code >= 400:
+                self.errors[name] += 1
+        return response.status_code
+
+    def results(self, elapsed: Dict[str, float]) -> Dict:
+        results = {}
+        for name, samples in self.samples.items():
+            result = summarize(samples, self.queries[name])
+            result["ops_per_sec"] = round(len(samples) / elapsed[name.split(" ", 1)[0]], 2)
+            result["ttfb_p50_ms"] = summarize(self.first_byte[name])["p50_ms"]
+            result["errors"] = self.errors[name]
+            results[name] = result
+        return results
+
+
+def _login(app, role: str, email: str):
+    client = app.test_client()
+    response = client.post(f"/{role}/login", data={"email": email, "password": SEED_PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f"Could not log in {email} as {role}")
+    return client
+
+
+def _admin_flow(app, recorder: Recorder, pending: List[int], stock_id: int, lock: threading.Lock):
+    client = _login(app, "admin", "admin@bench.example.com")
+
+    def step():
+        recorder.request(client, "admin GET /admin/requests", "GET", "/admin/requests")
+        with lock:
+            request_id = pending.pop() if pending else None
+        if request_id is not None:
+            recorder.request(
+                client, "admin POST /admin/requests/<id>/approve", "POST",
+                f"/admin/requests/{request_id}/approve", data={"item_id": str(stock_id)},
+            )
+        recorder.request(client, "admin GET /admin/inventory", "GET", "/admin/inventory")
+        recorder.request(client, "admin GET /admin/reports", "GET", "/admin/reports")
+
+    return step
+
+
+def _staff_flow(app, recorder: Recorder, email: str):
+    client = _login(app, "staff", email)
+
+    def step():
+        recorder.request(client, "staff GET /staff/", "GET", "/staff/")
+        recorder.request(client, "staff POST /staff/feedback", "POST", "/staff/feedback", data=FEEDBACK_FORM)
+        recorder.request(client, "staff POST /staff/requests", "POST", "/staff/requests", data=REQUEST_FORM)
+
+    return step
+
+
+def _api_flow(app, recorder: Recorder):
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {BENCH_API_TOKEN}"}
+
+    def step():
+        recorder.request(client, "api GET /api/v1/inventory", "GET", "/api/v1/inventory?limit=50", headers=headers)
+        recorder.request(client, "api GET /api/v1/requests", "GET", "/api/v1/requests?status=pending&limit=50",
+                         headers=headers)
+
+    return step
+
+
+def _drive(steps: List[Callable[[], None]], rounds: int) -> float:
+    """Run each user's step `rounds` times on its own thread; returns wall seconds"""
+    failures = []
+
+    def worker(step):
+        try:
+            for _ in range(rounds):
+                step()
+        except Exception as e:  # surface on the driving thread instead of dying silently
+            failures.append(e)
+
+    threads = [threading.Thread(target=worker, args=(step,)) for step in steps]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+    return time.perf_counter() - start
+
+
+def run(app, counter: QueryCounter, rounds: int = 20, concurrency: int = 1) -> Dict:
+    from .micro import Fixtures
+
+    with app.app_context():
+        fx = Fixtures()
+        pending = [fx.pending_request() for _ in range(rounds * concurrency)]
+        staff_emails = db.session.execute(
+            select(StaffUser.email).where(StaffUser.email.like("staff%@bench.example.com"))
+            .order_by(StaffUser.id).limit(concurrency)
+        ).scalars().all()
+        db.session.remove()
+
+    recorder = Recorder(counter)
+    lock = threading.Lock()
+    elapsed = {
+        "admin": _drive([_admin_flow(app, recorder, pending, fx.stock_id, lock) for _ in range(concurrency)], rounds),
+        "staff": _drive([_staff_flow(app, recorder, email) for email in staff_emails], rounds),
+        "api": _drive([_api_flow(app, recorder) for _ in range(concurrency)], rounds),
+    }
+    results = recorder.results(elapsed)
+    results.update(run_async(rounds * 10, concurrency * 10))
+    return results
+
+
+def run_async(requests: int, concurrency: int) -> Dict:
+    """Concurrent reads against the ASGI app, when httpx and an async driver are installed"""
+    name = "asgi GET /api/v1/inventory"
+    try:
+        import httpx
+
+        from app.asgi import AsyncReadApp
+        from app.async_db import dispose_async_engine, get_async_engine
+
+        get_async_engine()
+    except ImportError as e:
+        return {name: {"skipped": f"missing dependency: {e.name}"}}
+
+    async def drive():
+        samples = []
+        semaphore = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=AsyncReadApp())
+        headers = {"Authorization": f"Bearer {BENCH_API_TOKEN}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter_ns()
+                    response = await client.get("/api/v1/inventory?limit=50", headers=headers)
+                    samples.append(time.perf_counter_ns() - start)
+                    return response.status_code
+
+            start = time.perf_counter()
+            statuses = await asyncio.gather(*(one() for _ in range(requests)))
+            wall = time.perf_counter() - start
+        await dispose_async_engine()
+        result = summarize(samples, elapsed_s=wall)
+        result["errors"] = sum(1 for status in statuses if status >= 400)
+        return result
+
+    return {name: asyncio.run(drive())}
@@ -0,0 +1,743 @@
+"""Micro-benchmarks for every repository and service method, plus the NumPy/CPU kernels.
+
+Each case is timed inside one app context against the seeded database.
+Read cases run as-is. Writes that leave committing to the caller are rolled
+back after each call. Committing writes get fresh rows from an untimed setup
+step, so the seed data is only ever added to.
+
+Public static methods without a case are listed under ``uncovered`` in the
+report, so a new method cannot silently miss out on a benchmark.
+"""
+import asyncio
+import gzip
+import inspect
+import itertools
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app import forecasting, repositories, services, utilization, valuation
+from app.extensions import db
+from app.matching import TrigramIndex
+from app.models import AdminUser, AuditAction, AuditEntity, InventoryItem, ItemRequest, StaffUser
+
+from .harness import QueryCounter, measure
+from .seed import SEED_PASSWORD
+
+try:
+    import brotli
+except ImportError:  # optional, as in app.middleware
+    brotli = None
+
+INVENTORY_FIELDS = ["id", "name", "category", "quantity_available"]
+REQUEST_FIELDS = ["id", "staff_id", "item_name", "status"]
+ASSIGNMENT_FIELDS = ["id", "item_id", "staff_id", "status"]
+FEEDBACK_FIELDS = ["id", "staff_id", "rating"]
+
+
+class Case(NamedTuple):
+    name: str
+    fn: Callable[[object], object]
+    setup: Optional[Callable[[], object]] = None
+    rollback: bool = False
+    dialects: Optional[tuple] = None
+
+
+class Fixtures:
+    """Ids from the seeded database plus factories for rows that committing writes consume"""
+
+    def __init__(self):
+        self._serial = itertools.count(int(time.time()))
+        self.admin_id = db.session.scalar(select(func.min(AdminUser.id)))
+        staff = db.session.execute(select(StaffUser.id, StaffUser.email).order_by(StaffUser.id).limit(1)).first()
+        if staff is None or self.admin_id is None:
+            raise RuntimeError("The benchmark database is empty; run `python -m benchmarks seed` first")
+        self.staff_id, self.staff_email = staff
+        self.category = db.session.scalar(select(InventoryItem.category).limit(1))
+        self.item_id = db.session.scalar(select(InventoryItem.id).order_by(InventoryItem.id).limit(1))
+        self.request_id = db.session.scalar(
+            select(ItemRequest.id).where(ItemRequest.status == "pending").order_by(ItemRequest.id).limit(1)
+        )
+        self.item_ids = db.session.execute(select(InventoryItem.id).limit(200)).scalars().all()
+        # One deep-stock item so approvals and assignments never run out mid-run
+        self.stock_id = services.InventoryService.create_item(
+            f"Bench stock {self.serial()}", "Laptops", 10 ** 7, None, 999
+        ).id
+
+    def serial(self) -> int:
+        return next(self._serial)
+
+    def pending_request(self) -> int:
+        return services.RequestService.create_request(
+            self.staff_id, "ThinkPad laptop", "Benchmark request for timing."
+        ).id
+
+    def assignment(self, status: str = "assigned") -> int:
+        assignment = services.AssignmentService.create_assignment(self.stock_id, self.staff_id)
+        if status == "return_requested":
+            services.AssignmentService.request_return(assignment.id, self.staff_id)
+        return assignment.id
+
+    def held_request(self) -> int:
+        request_id = self.pending_request()
+        services.ReservationService.hold(request_id, self.stock_id)
+        return request_id
+
+    def spare_item(self) -> int:
+        return repositories.InventoryRepository.create(f"Spare {self.serial()}", "Spare", 1).id
+
+    def spare_staff(self) -> int:
+        serial = self.serial()
+        return repositories.StaffRepository.create(f"Spare {serial}", f"spare{serial}@bench.example.com", "x").id
+
+    def email(self, kind: str) -> str:
+        return f"{kind}{self.serial()}@bench.example.com"
+
+
+def _drain(iterable) -> int:
+    return sum(1 for _ in iterable)
+
+
+def repository_cases(fx: Fixtures) -> List[Case]:
+    R = repositories
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    now = datetime.utcnow()
+    stock = lambda: db.session.get(InventoryItem, fx.stock_id)  # noqa: E731
+    return [
+        Case("AdminRepository.find_by_email", lambda _: R.AdminRepository.find_by_email("admin@bench.example.com")),
+        Case("AdminRepository.find_by_id", lambda _: R.AdminRepository.find_by_id(fx.admin_id)),
+        Case("AdminRepository.create", lambda _: R.AdminRepository.create("Bench", fx.email("admin"), "x")),
+        Case("AdminRepository.get_all", lambda _: R.AdminRepository.get_all()),
+
+        Case("ArchiveRepository.get_closed_request_ids",
+             lambda _: R.ArchiveRepository.get_closed_request_ids(now, 500), rollback=True),
+        Case("ArchiveRepository.get_closed_assignment_ids",
+             lambda _: R.ArchiveRepository.get_closed_assignment_ids(now, 500), rollback=True),
+        Case("ArchiveRepository.move_requests",
+             lambda ids: R.ArchiveRepository.move_requests(ids),
+             setup=lambda: R.ArchiveRepository.get_closed_request_ids(now, 100), rollback=True),
+        Case("ArchiveRepository.move_assignments",
+             lambda ids: R.ArchiveRepository.move_assignments(ids),
+             setup=lambda: R.ArchiveRepository.get_closed_assignment_ids(now, 100), rollback=True),
+
+        Case("AssignmentRepository.find_by_id", lambda _: R.AssignmentRepository.find_by_id(1)),
+        Case("AssignmentRepository.find_by_staff_id",
+             lambda _: R.AssignmentRepository.find_by_staff_id(fx.staff_id, include_archived=True)),
+        Case("AssignmentRepository.create_many", lambda _: R.AssignmentRepository.create_many([
+            {"item_id": fx.stock_id, "staff_id": fx.staff_id, "allocation_date": today, "status": "assigned"}
+        ] * 100), rollback=True),
+        Case("AssignmentRepository.get_page", lambda _: R.AssignmentRepository.get_page(ASSIGNMENT_FIELDS)),
+        Case("AssignmentRepository.get_pending_returns", lambda _: R.AssignmentRepository.get_pending_returns()),
+        Case("AssignmentRepository.get_active_assignments_count",
+             lambda _: R.AssignmentRepository.get_active_assignments_count()),
+        Case("AssignmentRepository.get_pending_returns_count",
+             lambda _: R.AssignmentRepository.get_pending_returns_count()),
+        Case("AssignmentRepository.create", lambda _: R.AssignmentRepository.create(fx.stock_id, fx.staff_id)),
+        Case("AssignmentRepository.update_status",
+             lambda a: R.AssignmentRepository.update_status(a, "assigned"),
+             setup=lambda: R.AssignmentRepository.find_by_id(fx.assignment())),
+        Case("AssignmentRepository.request_return", lambda a: R.AssignmentRepository.request_return(a),
+             setup=lambda: R.AssignmentRepository.find_by_id(fx.assignment())),
+        Case("AssignmentRepository.complete_return", lambda a: R.AssignmentRepository.complete_return(a),
+             setup=lambda: R.AssignmentRepository.find_by_id(fx.assignment("return_requested"))),
+        Case("AssignmentRepository.delete_by_item_id",
+             lambda item_id: R.AssignmentRepository.delete_by_item_id(item_id), setup=fx.spare_item),
+        Case("AssignmentRepository.delete_by_staff_id",
+             lambda staff_id: R.AssignmentRepository.delete_by_staff_id(staff_id), setup=fx.spare_staff),
+
+        Case("AuditRepository.add", lambda _: R.AuditRepository.add(
+            AuditEntity.ITEM, fx.item_id, AuditAction.ASSIGNMENT_CREATED, item_id=fx.item_id), rollback=True),
+        Case("AuditRepository.add_many", lambda _: R.AuditRepository.add_many([
+            {"ts": now, "entity": 3, "entity_id": fx.item_id, "action": 10, "item_id": fx.item_id}
+        ] * 100), rollback=True),
+        Case("AuditRepository.get_entity_timeline",
+             lambda _: R.AuditRepository.get_entity_timeline(AuditEntity.ASSIGNMENT, 1)),
+        Case("AuditRepository.get_item_timeline", lambda _: R.AuditRepository.get_item_timeline(fx.item_id)),
+        Case("AuditRepository.get_staff_timeline", lambda _: R.AuditRepository.get_staff_timeline(fx.staff_id)),
+        Case("AuditRepository.get_partitions", lambda _: R.AuditRepository.get_partitions(), dialects=("mysql",)),
+        Case("AuditRepository.split_future_partition",
+             lambda _: R.AuditRepository.split_future_partition([]), dialects=("mysql",)),
+        Case("AuditRepository.drop_partitions", lambda _: R.AuditRepository.drop_partitions([]), dialects=("mysql",)),
+
+        Case("FeedbackRepository.create",
+             lambda _: R.FeedbackRepository.create(fx.staff_id, 4, "ok", "ok", "ok", "ok", "")),
+        Case("FeedbackRepository.get_recent", lambda _: R.FeedbackRepository.get_recent(10)),
+        Case("FeedbackRepository.get_page", lambda _: R.FeedbackRepository.get_page(FEEDBACK_FIELDS)),
+        Case("FeedbackRepository.get_count", lambda _: R.FeedbackRepository.get_count()),
+        Case("FeedbackRepository.get_average_rating", lambda _: R.FeedbackRepository.get_average_rating()),
+
+        Case("ForecastRepository.replace_all", lambda _: R.ForecastRepository.replace_all([]), rollback=True),
+        Case("ForecastRepository.get_reorders", lambda _: R.ForecastRepository.get_reorders(20)),
+        Case("ForecastRepository.get_generated_at", lambda _: R.ForecastRepository.get_generated_at()),
+
+        Case("InventoryRepository.find_by_id", lambda _: R.InventoryRepository.find_by_id(fx.item_id)),
+        Case("InventoryRepository.get_all", lambda _: R.InventoryRepository.get_all()),
+        Case("InventoryRepository.search", lambda _: R.InventoryRepository.search("dell")),
+        Case("InventoryRepository.get_columns",
+             lambda _: R.InventoryRepository.get_columns(fx.item_id, INVENTORY_FIELDS)),
+        Case("InventoryRepository.get_page", lambda _: R.InventoryRepository.get_page(INVENTORY_FIELDS)),
+        Case("InventoryRepository.iter_all", lambda _: _drain(R.InventoryRepository.iter_all())),
+        Case("InventoryRepository.get_change_signature", lambda _: R.InventoryRepository.get_change_signature()),
+        Case("InventoryRepository.get_match_rows", lambda _: R.InventoryRepository.get_match_rows()),
+        Case("InventoryRepository.get_valuation_rows", lambda _: R.InventoryRepository.get_valuation_rows()),
+        Case("InventoryRepository.get_capacity_rows", lambda _: R.InventoryRepository.get_capacity_rows()),
+        Case("InventoryRepository.get_available_items", lambda _: R.InventoryRepository.get_available_items()),
+        Case("InventoryRepository.get_available_items_for_choices",
+             lambda _: R.InventoryRepository.get_available_items_for_choices()),
+        Case("InventoryRepository.get_latest", lambda _: R.InventoryRepository.get_latest(3)),
+        Case("InventoryRepository.get_low_stock", lambda _: R.InventoryRepository.get_low_stock(3)),
+        Case("InventoryRepository.create", lambda _: R.InventoryRepository.create(f"Bench {fx.serial()}", "Spare", 1)),
+        Case("InventoryRepository.update", lambda item: R.InventoryRepository.update(
+            item, item.name, item.category, item.quantity_available), setup=stock),
+        Case("InventoryRepository.delete", lambda item_id: R.InventoryRepository.delete(item_id), setup=fx.spare_item),
+        Case("InventoryRepository.decrement_quantity",
+             lambda item: R.InventoryRepository.decrement_quantity(item), setup=stock),
+        Case("InventoryRepository.increment_quantity",
+             lambda item: R.InventoryRepository.increment_quantity(item), setup=stock),
+        Case("InventoryRepository.get_available_quantities",
+             lambda _: R.InventoryRepository.get_available_quantities()),
+        Case("InventoryRepository.get_stock_rows", lambda _: R.InventoryRepository.get_stock_rows()),
+        Case("InventoryRepository.lock_quantities",
+             lambda _: R.InventoryRepository.lock_quantities(fx.item_ids), rollback=True),
+        Case("InventoryRepository.decrement_many",
+             lambda _: R.InventoryRepository.decrement_many({fx.stock_id: 1}), rollback=True),
+        Case("InventoryRepository.hold_stock", lambda _: R.InventoryRepository.hold_stock(fx.stock_id), rollback=True),
+        Case("InventoryRepository.release_stock",
+             lambda _: R.InventoryRepository.release_stock(fx.stock_id), rollback=True),
+        Case("InventoryRepository.consume_reserved",
+             lambda _: R.InventoryRepository.consume_reserved(fx.stock_id), rollback=True),
+        Case("InventoryRepository.get_count", lambda _: R.InventoryRepository.get_count()),
+        Case("InventoryRepository.get_total_quantity", lambda _: R.InventoryRepository.get_total_quantity()),
+        Case("InventoryRepository.get_average_price", lambda _: R.InventoryRepository.get_average_price()),
+
+        Case("RequestRepository.find_by_id", lambda _: R.RequestRepository.find_by_id(fx.request_id)),
+        Case("RequestRepository.find_by_staff_id",
+             lambda _: R.RequestRepository.find_by_staff_id(fx.staff_id, include_archived=True)),
+        Case("RequestRepository.get_page", lambda _: R.RequestRepository.get_page(REQUEST_FIELDS, status="pending")),
+        Case("RequestRepository.get_pending_item_names", lambda _: R.RequestRepository.get_pending_item_names()),
+        Case("RequestRepository.iter_created", lambda _: _drain(R.RequestRepository.iter_created(
+            now - timedelta(weeks=26), now))),
+        Case("RequestRepository.get_pending_for_allocation",
+             lambda _: R.RequestRepository.get_pending_for_allocation()),
+        Case("RequestRepository.lock_pending",
+             lambda _: R.RequestRepository.lock_pending([fx.request_id]), rollback=True),
+        Case("RequestRepository.lock_by_id",
+             lambda _: R.RequestRepository.lock_by_id(fx.request_id), rollback=True),
+        Case("RequestRepository.set_status_many",
+             lambda _: R.RequestRepository.set_status_many([fx.request_id], "pending"), rollback=True),
+        Case("RequestRepository.get_pending", lambda _: R.RequestRepository.get_pending()),
+        Case("RequestRepository.iter_pending", lambda _: _drain(R.RequestRepository.iter_pending())),
+        Case("RequestRepository.get_pending_count", lambda _: R.RequestRepository.get_pending_count()),
+        Case("RequestRepository.get_history", lambda _: R.RequestRepository.get_history(10, include_archived=True)),
+        Case("RequestRepository.create",
+             lambda _: R.RequestRepository.create(fx.staff_id, "Dock", "Benchmark request for timing."),
+             rollback=True),
+        Case("RequestRepository.delete_by_staff_id",
+             lambda staff_id: R.RequestRepository.delete_by_staff_id(staff_id), setup=fx.spare_staff),
+
+        Case("ReservationRepository.add", lambda _: R.ReservationRepository.add(
+            fx.stock_id, fx.request_id, 1, now + timedelta(minutes=30)), rollback=True),
+        Case("ReservationRepository.find_held_for_request",
+             lambda _: R.ReservationRepository.find_held_for_request(fx.request_id)),
+        Case("ReservationRepository.get_held_for_request",
+             lambda _: R.ReservationRepository.get_held_for_request(fx.request_id), rollback=True),
+        Case("ReservationRepository.get_all_held", lambda _: R.ReservationRepository.get_all_held()),
+        Case("ReservationRepository.get_held_request_ids", lambda _: R.ReservationRepository.get_held_request_ids()),
+        Case("ReservationRepository.get_expired", lambda _: R.ReservationRepository.get_expired(now, 500)),
+        Case("ReservationRepository.lock_expired",
+             lambda _: R.ReservationRepository.lock_expired(list(range(1, 501)), now), rollback=True),
+        Case("ReservationRepository.lock_held_request_ids",
+             lambda _: R.ReservationRepository.lock_held_request_ids([fx.request_id]), rollback=True),
+        Case("ReservationRepository.get_quantities_by_item",
+             lambda _: R.ReservationRepository.get_quantities_by_item(list(range(1, 501)))),
+        Case("ReservationRepository.get_item_ids",
+             lambda _: R.ReservationRepository.get_item_ids(list(range(1, 501)))),
+        Case("ReservationRepository.set_status",
+             lambda _: R.ReservationRepository.set_status(list(range(1, 101)), "held"), rollback=True),
+        Case("ReservationRepository.delete_by_item_id",
+             lambda _: R.ReservationRepository.delete_by_item_id(fx.item_id), rollback=True),
+
+        Case("StaffRepository.find_by_email", lambda _: R.StaffRepository.find_by_email(fx.staff_email)),
+        Case("StaffRepository.find_by_id", lambda _: R.StaffRepository.find_by_id(fx.staff_id)),
+        Case("StaffRepository.create",
+             lambda _: R.StaffRepository.create("Bench Staff", fx.email("staff"), "x", "IT")),
+        Case("StaffRepository.get_all", lambda _: R.StaffRepository.get_all()),
+        Case("StaffRepository.get_all_for_choices", lambda _: R.StaffRepository.get_all_for_choices()),
+
+        Case("StockAlertRepository.get_levels", lambda _: R.StockAlertRepository.get_levels(3)),
+        Case("StockAlertRepository.get_open_by_item", lambda _: R.StockAlertRepository.get_open_by_item()),
+        Case("StockAlertRepository.open_many",
+             lambda _: R.StockAlertRepository.open_many([(fx.item_id, 0, 3)] * 100), rollback=True),
+        Case("StockAlertRepository.resolve_many",
+             lambda _: R.StockAlertRepository.resolve_many(list(range(1, 101))), rollback=True),
+        Case("StockAlertRepository.get_open", lambda _: R.StockAlertRepository.get_open(50)),
+        Case("StockAlertRepository.get_open_count", lambda _: R.StockAlertRepository.get_open_count()),
+        Case("StockAlertRepository.get_unnotified", lambda _: R.StockAlertRepository.get_unnotified(), rollback=True),
+        Case("StockAlertRepository.mark_notified",
+             lambda _: R.StockAlertRepository.mark_notified(list(range(1, 101))), rollback=True),
+        Case("StockAlertRepository.delete_by_item_id",
+             lambda _: R.StockAlertRepository.delete_by_item_id(fx.item_id), rollback=True),
+        Case("StockAlertRepository.find_category_threshold",
+             lambda _: R.StockAlertRepository.find_category_threshold(fx.category)),
+        Case("StockAlertRepository.get_category_thresholds",
+             lambda _: R.StockAlertRepository.get_category_thresholds()),
+        Case("StockAlertRepository.save_category_threshold",
+             lambda _: R.StockAlertRepository.save_category_threshold(fx.category, 3), rollback=True),
+        Case("StockAlertRepository.delete_category_threshold",
+             lambda _: R.StockAlertRepository.delete_category_threshold(fx.category), rollback=True),
+
+        Case("UtilizationRepository.iter_loans", lambda _: _drain(R.UtilizationRepository.iter_loans(
+            today - timedelta(days=90), today, 500))),
+        Case("UtilizationRepository.iter_returns", lambda _: _drain(R.UtilizationRepository.iter_returns(
+            today - timedelta(days=90), today, 500))),
+        Case("UtilizationRepository.get_first_loan_day", lambda _: R.UtilizationRepository.get_first_loan_day()),
+        Case("UtilizationRepository.get_last_snapshot_day",
+             lambda _: R.UtilizationRepository.get_last_snapshot_day()),
+        Case("UtilizationRepository.replace_snapshots",
+             lambda _: R.UtilizationRepository.replace_snapshots(month_ago, today, []), rollback=True),
+        Case("UtilizationRepository.get_snapshot_totals",
+             lambda _: R.UtilizationRepository.get_snapshot_totals(today - timedelta(days=90), today)),
+    ]
+
+
+def service_cases(fx: Fixtures) -> List[Case]:
+    S = services
+    today = date.today()
+
+    def cold_valuation(_):
+        from app.services import valuation_service
+
+        valuation_service._cached = None
+        return S.ValuationService.get_report()
+
+    def allocation_for_new_request():
+        request_id = fx.pending_request()
+        return [{"request_id": request_id, "staff_id": fx.staff_id, "item_id": fx.stock_id, "score": 1.0}]
+
+    return [
+        Case("AdminService.authenticate", lambda _: S.AdminService.authenticate("admin@bench.example.com", SEED_PASSWORD)),
+        Case("AdminService.register", lambda _: S.AdminService.register("Bench Admin", fx.email("admin"), "password123")),
+        Case("AdminService.get_dashboard_stats", lambda _: S.AdminService.get_dashboard_stats()),
+
+        Case("AllocationService.plan", lambda _: S.AllocationService.plan()),
+        Case("AllocationService.apply", lambda plan: S.AllocationService.apply(plan), setup=allocation_for_new_request),
+        Case("AllocationService.run", lambda _: S.AllocationService.run(dry_run=True, limit=100)),
+
+        Case("ArchiveService.archive_closed",
+             lambda _: S.ArchiveService.archive_closed(30, batch_size=50, max_batches=1)),
+
+        Case("AssignmentService.get_assignments_for_staff",
+             lambda _: S.AssignmentService.get_assignments_for_staff(fx.staff_id, include_archived=True)),
+        Case("AssignmentService.get_pending_returns", lambda _: S.AssignmentService.get_pending_returns()),
+        Case("AssignmentService.get_assignments_page",
+             lambda _: S.AssignmentService.get_assignments_page(ASSIGNMENT_FIELDS, status="assigned")),
+        Case("AssignmentService.create_assignment",
+             lambda _: S.AssignmentService.create_assignment(fx.stock_id, fx.staff_id, fx.admin_id)),
+        Case("AssignmentService.request_return",
+             lambda assignment_id: S.AssignmentService.request_return(assignment_id, fx.staff_id),
+             setup=fx.assignment),
+        Case("AssignmentService.complete_return",
+             lambda assignment_id: S.AssignmentService.complete_return(assignment_id, fx.admin_id),
+             setup=lambda: fx.assignment("return_requested")),
+        Case("AssignmentService.get_active_assignments_count",
+             lambda _: S.AssignmentService.get_active_assignments_count()),
+        Case("AssignmentService.get_pending_returns_count", lambda _: S.AssignmentService.get_pending_returns_count()),
+
+        Case("AuditService.record", lambda _: S.AuditService.record(
+            AuditEntity.ITEM, fx.item_id, AuditAction.ASSIGNMENT_CREATED, item_id=fx.item_id), rollback=True),
+        Case("AuditService.record_many", lambda _: S.AuditService.record_many(
+            AuditEntity.ITEM, AuditAction.ASSIGNMENT_CREATED, [{"entity_id": fx.item_id}] * 100), rollback=True),
+        Case("AuditService.get_item_timeline", lambda _: S.AuditService.get_item_timeline(fx.item_id)),
+        Case("AuditService.get_staff_timeline", lambda _: S.AuditService.get_staff_timeline(fx.staff_id)),
+        Case("AuditService.get_request_timeline", lambda _: S.AuditService.get_request_timeline(fx.request_id)),
+        Case("AuditService.ensure_partitions", lambda _: S.AuditService.ensure_partitions(), dialects=("mysql",)),
+        Case("AuditService.drop_partitions_older_than",
+             lambda _: S.AuditService.drop_partitions_older_than(120), dialects=("mysql",)),
+
+        Case("FeedbackService.submit_feedback",
+             lambda _: S.FeedbackService.submit_feedback(fx.staff_id, 5, "ok", "ok", "ok", "ok", "")),
+        Case("FeedbackService.get_recent_feedback", lambda _: S.FeedbackService.get_recent_feedback(10)),
+        Case("FeedbackService.get_feedback_page", lambda _: S.FeedbackService.get_feedback_page(FEEDBACK_FIELDS)),
+        Case("FeedbackService.get_stats", lambda _: S.FeedbackService.get_stats()),
+
+        Case("ForecastService.run", lambda _: S.ForecastService.run(dry_run=True)),
+        Case("ForecastService.get_reorders", lambda _: S.ForecastService.get_reorders(20)),
+        Case("ForecastService.get_generated_at", lambda _: S.ForecastService.get_generated_at()),
+
+        Case("InventoryService.get_item", lambda _: S.InventoryService.get_item(fx.item_id)),
+        Case("InventoryService.list_items", lambda _: S.InventoryService.list_items("monitor")),
+        Case("InventoryService.iter_items", lambda _: _drain(S.InventoryService.iter_items())),
+        Case("InventoryService.get_item_columns",
+             lambda _: S.InventoryService.get_item_columns(fx.item_id, INVENTORY_FIELDS)),
+        Case("InventoryService.get_items_page", lambda _: S.InventoryService.get_items_page(INVENTORY_FIELDS)),
+        Case("InventoryService.get_stats", lambda _: S.InventoryService.get_stats()),
+        Case("InventoryService.create_item",
+             lambda _: S.InventoryService.create_item(f"Bench {fx.serial()}", "Spare", 5, None, 10)),
+        Case("InventoryService.update_item", lambda item_id: S.InventoryService.update_item(
+            item_id, f"Spare {fx.serial()}", "Spare", 2), setup=fx.spare_item),
+        Case("InventoryService.delete_item", lambda item_id: S.InventoryService.delete_item(item_id),
+             setup=fx.spare_item),
+        Case("InventoryService.get_available_items_for_choices",
+             lambda _: S.InventoryService.get_available_items_for_choices()),
+        Case("InventoryService.get_latest_items", lambda _: S.InventoryService.get_latest_items(3)),
+        Case("InventoryService.get_low_stock_items", lambda _: S.InventoryService.get_low_stock_items(3)),
+        Case("InventoryService.is_item_available", lambda _: S.InventoryService.is_item_available(fx.item_id)),
+
+        Case("MatchingService.index_item", lambda item: S.MatchingService.index_item(item),
+             setup=lambda: db.session.get(InventoryItem, fx.stock_id)),
+        Case("MatchingService.remove_item", lambda _: S.MatchingService.remove_item(-1)),
+        Case("MatchingService.suggest", lambda _: S.MatchingService.suggest("thinkpad laptop")),
+        Case("MatchingService.best_matches",
+             lambda _: S.MatchingService.best_matches(["laptop", "dock", "standing desk", "webcam"])),
+        Case("MatchingService.suggest_for_pending", lambda _: S.MatchingService.suggest_for_pending()),
+
+        Case("RequestService.get_requests_for_staff",
+             lambda _: S.RequestService.get_requests_for_staff(fx.staff_id, include_archived=True)),
+        Case("RequestService.get_pending_requests", lambda _: S.RequestService.get_pending_requests()),
+        Case("RequestService.iter_pending_requests", lambda _: _drain(S.RequestService.iter_pending_requests())),
+        Case("RequestService.get_request_history",
+             lambda _: S.RequestService.get_request_history(10, include_archived=True)),
+        Case("RequestService.get_requests_page",
+             lambda _: S.RequestService.get_requests_page(REQUEST_FIELDS, status="pending")),
+        Case("RequestService.create_request",
+             lambda _: S.RequestService.create_request(fx.staff_id, "USB-C dock", "Benchmark request for timing.")),
+        Case("RequestService.approve_request",
+             lambda request_id: S.RequestService.approve_request(request_id, fx.stock_id, fx.admin_id),
+             setup=fx.pending_request),
+        Case("RequestService.reject_request",
+             lambda request_id: S.RequestService.reject_request(request_id, fx.admin_id), setup=fx.pending_request),
+        Case("RequestService.get_pending_count", lambda _: S.RequestService.get_pending_count()),
+
+        Case("ReservationService.get_holds_by_request", lambda _: S.ReservationService.get_holds_by_request()),
+        Case("ReservationService.get_hold", lambda _: S.ReservationService.get_hold(fx.request_id)),
+        Case("ReservationService.lock_for_request",
+             lambda _: S.ReservationService.lock_for_request(fx.request_id, [fx.stock_id]), rollback=True),
+        Case("ReservationService.hold",
+             lambda request_id: S.ReservationService.hold(request_id, fx.stock_id, fx.admin_id),
+             setup=fx.pending_request),
+        Case("ReservationService.release", lambda request_id: S.ReservationService.release(request_id, fx.admin_id),
+             setup=fx.held_request),
+        Case("ReservationService.release_for_request",
+             lambda request_id: S.ReservationService.release_for_request(request_id, fx.admin_id),
+             setup=fx.held_request, rollback=True),
+        Case("ReservationService.confirm_for_request",
+             lambda request_id: S.ReservationService.confirm_for_request(request_id, fx.stock_id),
+             setup=fx.held_request, rollback=True),
+        Case("ReservationService.expire_due", lambda _: S.ReservationService.expire_due(max_batches=1)),
+
+        Case("StaffService.authenticate", lambda _: S.StaffService.authenticate(fx.staff_email, SEED_PASSWORD)),
+        Case("StaffService.register",
+             lambda _: S.StaffService.register("Bench Staff", fx.email("staff"), "password123", "IT")),
+        Case("StaffService.get_staff_for_choices", lambda _: S.StaffService.get_staff_for_choices()),
+        Case("StaffService.get_staff", lambda _: S.StaffService.get_staff(fx.staff_id)),
+
+        Case("StockAlertService.check_items", lambda _: S.StockAlertService.check_items(fx.item_ids), rollback=True),
+        Case("StockAlertService.refresh_items", lambda _: S.StockAlertService.refresh_items(fx.item_ids)),
+        Case("StockAlertService.rescan", lambda _: S.StockAlertService.rescan()),
+        Case("StockAlertService.set_category_threshold",
+             lambda _: S.StockAlertService.set_category_threshold(fx.category, None)),
+        Case("StockAlertService.get_category_thresholds", lambda _: S.StockAlertService.get_category_thresholds()),
+        Case("StockAlertService.get_open_alerts", lambda _: S.StockAlertService.get_open_alerts(50)),
+        Case("StockAlertService.get_open_count", lambda _: S.StockAlertService.get_open_count()),
+        Case("StockAlertService.send_digest", lambda _: S.StockAlertService.send_digest()),
+
+        Case("UtilizationService.snapshot",
+             lambda _: S.UtilizationService.snapshot(since=today - timedelta(days=7))),
+        Case("UtilizationService.get_report", lambda _: S.UtilizationService.get_report(dimension="category")),
+
+        Case("ValuationService.get_report", cold_valuation),
+        Case("ValuationService.to_csv", lambda report: S.ValuationService.to_csv(report),
+             setup=S.ValuationService.get_report),
+    ]
+
+
+ASYNC_CASES = (
+    "AssignmentRepository.get_page_async",
+    "InventoryRepository.get_page_async",
+    "InventoryRepository.get_stats_async",
+    "AssignmentService.get_assignments_page_async",
+    "InventoryService.get_items_page_async",
+    "InventoryService.get_stats_async",
+)
+
+
+def async_cases(fx: Fixtures, counter: QueryCounter, loop: asyncio.AbstractEventLoop) -> List[Case]:
+    """
+    The ASGI read path's coroutines, each awaited on `loop`
+    Raises ImportError when the async driver for this database is not installed
+    """
+    from app.async_db import get_async_engine
+
+    # Async statements run in greenlets on the loop's thread, so the thread-local counter sees them
+    counter.attach(get_async_engine().sync_engine)
+    R, S = repositories, services
+
+    def awaited(factory):
+        return lambda _: loop.run_until_complete(factory())
+
+    return [
+        Case("AssignmentRepository.get_page_async",
+             awaited(lambda: R.AssignmentRepository.get_page_async(ASSIGNMENT_FIELDS, status="assigned"))),
+        Case("InventoryRepository.get_page_async",
+             awaited(lambda: R.InventoryRepository.get_page_async(INVENTORY_FIELDS))),
+        Case("InventoryRepository.get_stats_async", awaited(R.InventoryRepository.get_stats_async)),
+        Case("AssignmentService.get_assignments_page_async",
+             awaited(lambda: S.AssignmentService.get_assignments_page_async(ASSIGNMENT_FIELDS,
+                                                                            staff_id=fx.staff_id))),
+        Case("InventoryService.get_items_page_async",
+             awaited(lambda: S.InventoryService.get_items_page_async(INVENTORY_FIELDS, search_query=fx.category))),
+        Case("InventoryService.get_stats_async", awaited(S.InventoryService.get_stats_async)),
+    ]
+
+
+def uncovered(cases: List[Case]) -> List[str]:
+    """Public static methods of the exported repositories and services that have no case"""
+    covered = {case.name for case in cases}
+    missing = []
+    for module in (repositories, services):
+        for class_name in module.__all__:
+            cls = getattr(module, class_name)
+            for name, member in inspect.getmembers(cls, inspect.isfunction):
+                if not name.startswith("_") and f"{class_name}.{name}" not in covered:
+                    missing.append(f"{class_name}.{name}")
+    return sorted(missing)
+
+
+def run_cases(cases: List[Case], counter: QueryCounter, iterations: int, only: str = None) -> Dict:
+    dialect = db.engine.dialect.name
+    results = {}
+    for case in cases:
+        if only and only not in case.name:
+            continue
+        if case.dialects and dialect not in case.dialects:
+            results[case.name] = {"skipped": f"{dialect} not supported"}
+            continue
+
+        def teardown(_state, rollback=case.rollback):
+            if rollback:
+                db.session.rollback()
+            else:
+                db.session.expire_all()
+
+        try:
+            results[case.name] = measure(
+                case.fn, setup=case.setup, teardown=teardown, counter=counter, iterations=iterations
+            )
+        except Exception as e:  # keep going; one broken case should not sink the run
+            db.session.rollback()
+            results[case.name] = {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+# -- CPU kernels -------------------------------------------------------------
+
+def _valuation_loop(rows, today: date, life: float) -> Dict[str, float]:
+    """Reference pure-Python straight-line valuation, for the NumPy comparison"""
+    totals: Dict[str, float] = {}
+    for category, units, price, purchased in rows:
+        age = (today - purchased).days / valuation.DAYS_PER_YEAR if purchased else 0.0
+        value = units * price * min(max(1.0 - age / life, 0.0), 1.0)
+        totals[category] = totals.get(category, 0.0) + value
+    return totals
+
+
+def kernel_results(rows: int, page_html: bytes = None, iterations: int = 5) -> Dict:
+    """Vectorised kernels on synthetic data, independent of the database size"""
+    rng = np.random.default_rng(1)
+    today = date.today()
+    categories = np.array(["Laptops", "Monitors", "Phones", "Furniture", "Peripherals"], dtype=object)
+    purchased = np.datetime64(today, "D") - rng.integers(0, 2000, rows).astype("timedelta64[D]")
+    columns = {
+        "category": categories[rng.integers(0, len(categories), rows)],
+        "units": rng.integers(0, 20, rows),
+        "price": rng.uniform(10, 3000, rows),
+        "purchased": purchased,
+    }
+    python_rows = list(zip(
+        columns["category"].tolist(), columns["units"].tolist(), columns["price"].tolist(),
+        purchased.astype(object).tolist(),
+    ))
+    results = {
+        f"valuation.compute[{rows}]": measure(
+            lambda _: valuation.compute(columns, today, 4.0, {}), iterations=iterations, warmup=1),
+        f"valuation.python_loop[{rows}]": measure(
+            lambda _: _valuation_loop(python_rows, today, 4.0), iterations=iterations, warmup=0),
+    }
+
+    matrix = rng.poisson(1.5, (10_000, 26)).astype(np.float64)
+    results["forecasting.fit[10000x26]"] = measure(
+        lambda _: forecasting.fit(matrix, 0.3, 4), iterations=iterations, warmup=1)
+
+    loans = min(rows, 200_000)
+    allocated = np.datetime64(today, "D") - rng.integers(0, 365, loans).astype("timedelta64[D]")
+    returned = allocated + rng.integers(1, 90, loans).astype("timedelta64[D]")
+    loan_columns = {
+        "item_id": rng.integers(1, 10_000, loans),
+        "department": np.array(["IT", "HR", "Finance"], dtype=object)[rng.integers(0, 3, loans)],
+        "allocated": allocated,
+        "returned": np.where(rng.random(loans) < 0.2, np.datetime64("NaT"), returned),
+    }
+    results[f"utilization.DailyUsage.add[{loans}x31d]"] = measure(
+        lambda _: utilization.DailyUsage(today - timedelta(days=30), today).add(loan_columns),
+        iterations=iterations, warmup=1)
+
+    names = [f"{model} {i}" for i, model in enumerate(itertools.islice(
+        itertools.cycle(("ThinkPad T14", "Dell U2723QE", "MX Keys", "Standing desk", "Pixel 8")), 10_000))]
+
+    def build_index(_):
+        index = TrigramIndex()
+        for item_id, name in enumerate(names):
+            index.upsert(item_id, name, "Laptops")
+        return index
+
+    results["matching.TrigramIndex.build[10000]"] = measure(build_index, iterations=iterations, warmup=0)
+    index = build_index(None)
+    results["matching.TrigramIndex.top_k[10000]"] = measure(
+        lambda _: index.top_k("thinkpad laptop", 5), iterations=200, warmup=5)
+
+    if page_html:
+        results.update(compression_results(page_html))
+    return results
+
+
+def compression_results(body: bytes) -> Dict:
+    """Bytes saved and CPU per page for each encoding the middleware can pick"""
+    from flask import current_app
+
+    level = current_app.config["COMPRESS_GZIP_LEVEL"]
+    encoders = {f"gzip-{level}": lambda data: gzip.compress(data, level)}
+    if brotli is not None:
+        quality = current_app.config["COMPRESS_BROTLI_QUALITY"]
+        encoders[f"br-{quality}"] = lambda data: brotli.compress(data, quality=quality)
+    results = {}
+    for name, encode in encoders.items():
+        size = len(encode(body))
+        result = measure(lambda _: encode(body), iterations=50, warmup=2)
+        result.update({"bytes_in": len(body), "bytes_out": size, "ratio": round(size / len(body), 3)})
+        results[f"compression.{name}"] = result
+    return results
+
+
+def _page_contexts(fx: Fixtures) -> Dict[str, tuple]:
+    """
+    Template -> (signed-in user, context factory) for the pages worth timing
+    Each context is built the way its view builds it, with streamed rows read
+    into lists, so the timed region is rendering alone.
+    """
+    from flask import current_app
+
+    from app.blueprints.admin.forms import DeleteItemForm, ManualAssignmentForm, QueueActionForm
+    from app.blueprints.staff.forms import FeedbackForm, StaffRequestItemForm
+
+    fetch_size = current_app.config["STREAM_FETCH_SIZE"]
+    admin = db.session.get(AdminUser, fx.admin_id)
+    staff = db.session.get(StaffUser, fx.staff_id)
+
+    def requests_page():
+        item_choices = services.InventoryService.get_available_items_for_choices()
+        item_labels = dict(item_choices)
+        manual_form = ManualAssignmentForm()
+        manual_form.item_id.choices = item_choices
+        manual_form.staff_id.choices = services.StaffService.get_staff_for_choices()
+        return {
+            "pending_requests": list(services.RequestService.iter_pending_requests(fetch_size)),
+            "request_history": services.RequestService.get_request_history(10),
+            "returns_queue": services.AssignmentService.get_pending_returns(),
+            "queue_form": QueueActionForm(),
+            "item_choices": item_choices,
+            "holds": services.ReservationService.get_holds_by_request(),
+            "item_labels": item_labels,
+            "suggestions": services.MatchingService.suggest_for_pending(set(item_labels)),
+            "manual_form": manual_form,
+            "has_inventory": bool(item_choices),
+        }
+
+    def inventory_page():
+        return {
+            "items": list(services.InventoryService.iter_items(None, fetch_size)),
+            "search_query": "",
+            "stats": services.InventoryService.get_stats(),
+            "delete_form": DeleteItemForm(),
+        }
+
+    def admin_dashboard():
+        stats = services.AdminService.get_dashboard_stats()
+        return {
+            "latest_items": services.InventoryService.get_latest_items(3),
+            "inventory_count": stats["inventory_count"],
+            "inventory_quantity": stats["inventory_quantity"],
+            "pending_requests": stats["pending_requests"],
+            "pending_returns": stats["pending_returns"],
+        }
+
+    def staff_dashboard():
+        return {
+            "assignments": services.AssignmentService.get_assignments_for_staff(fx.staff_id),
+            "form": StaffRequestItemForm(),
+            "requests": services.RequestService.get_requests_for_staff(fx.staff_id),
+            "feedback_form": FeedbackForm(),
+            "full_history": False,
+        }
+
+    return {
+        "admin/requests.html": (admin, requests_page),
+        "admin/inventory_list.html": (admin, inventory_page),
+        "admin/dashboard.html": (admin, admin_dashboard),
+        "staff/dashboard.html": (staff, staff_dashboard),
+    }
+
+
+def template_results(app, fx: Fixtures, counter: QueryCounter) -> Dict:
+    """
+    Render time of the main pages over the seeded rows (q/op should stay 0:
+    the views load what their templates touch), then cold compile time for
+    every template with the bytecode cache bypassed
+    """
+    from flask import render_template
+    from flask_login import login_user
+
+    env = app.jinja_env
+    results = {}
+    for name, (user, context) in _page_contexts(fx).items():
+        with app.test_request_context():
+            login_user(user)
+            values = context()
+            results[f"template.render[{name}]"] = measure(
+                lambda _: render_template(name, **values), counter=counter, iterations=20, warmup=2)
+        db.session.remove()
+    for name in sorted(env.list_templates()):
+        if not name.endswith(".html"):
+            continue
+        source, filename, _ = env.loader.get_source(env, name)
+        results[f"template.compile[{name}]"] = measure(
+            lambda _: env.compile(source, name, filename), iterations=20, warmup=1)
+    return results
+
+
+def run(app, counter: QueryCounter, iterations: int = 30, kernel_rows: int = 1_000_000,
+        only: str = None, page_html: bytes = None) -> Dict:
+    fx = Fixtures()
+    cases = repository_cases(fx) + service_cases(fx)
+    results = run_cases(cases, counter, iterations, only)
+    loop = asyncio.new_event_loop()
+    try:
+        cases += async_cases(fx, counter, loop)
+    except ImportError as e:
+        cases += [Case(name, None) for name in ASYNC_CASES]
+        results.update({name: {"skipped": f"missing dependency: {e.name}"} for name in ASYNC_CASES})
+    else:
+        from app.async_db import dispose_async_engine
+
+        results.update(run_cases(cases[-len(ASYNC_CASES):], counter, iterations, only))
+        loop.run_until_complete(dispose_async_engine())
+    finally:
+        loop.close()
+    if not only:
+        results.update(kernel_results(kernel_rows, page_html))
+        results.update(template_results(app, fx, counter))
+    return {"results": results, "uncovered": uncovered(cases)}
+
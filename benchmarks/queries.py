@@ -0,0 +1,247 @@
+"""Query-count regression guard: statements per request for every route, at two data sizes.
+
+The database is reset and seeded at ``tiny`` scale, every endpoint of the
+public, admin, staff and API blueprints is requested once, then the ``small``
+scale is seeded on top and the same requests are made again. A route whose
+statement count goes up with the data is running a query per row (N+1), e.g.
+a template that reaches through ``req.staff_user`` without an eager load.
+
+Every call is made twice and the second one counted, so lazily filled caches
+(valuation, matching index) do not show up as growth.
+
+The server-side session store is checked too: a signed-in client requesting
+routes that never read the session (UNTOUCHED) must cause no store I/O.
+"""
+from datetime import timedelta
+from typing import Callable, Dict, List, Tuple
+
+from flask import current_app
+
+from app.extensions import db
+from app.profiling import ProfileStore
+from app.sessions import ServerSessionInterface, SqlSessionStore
+
+from .harness import BENCH_API_TOKEN, QueryCounter
+from .load import FEEDBACK_FORM, REQUEST_FORM, _login
+from .micro import Fixtures
+from .seed import SEED_PASSWORD, seed
+
+SIZES = ("tiny", "small")
+BLUEPRINTS = ("public", "admin", "staff", "api")
+API_HEADERS = {"Authorization": f"Bearer {BENCH_API_TOKEN}"}
+
+ITEM_FORM = {
+    "name": "Guard laptop", "category": "Laptops", "quantity": "3",
+    "purchase_date": "2024-01-15", "price": "1200.00", "reorder_threshold": "1",
+}
+
+
+def _stored_profile() -> Dict:
+    """A one-sample profile in PROFILE_DIR, for the profile download routes"""
+    store = ProfileStore(current_app.config["PROFILE_DIR"], current_app.config["PROFILE_KEEP"])
+    meta = {
+        "id": store.new_id(), "endpoint": "admin.dashboard", "method": "GET", "path": "/admin/",
+        "status": 200, "duration_ms": 5.0, "samples": 1, "interval_ms": 5.0, "trigger": "rate",
+        "pid": 0, "created_at": "2024-01-01T00:00:00",
+    }
+    store.save(meta, {"dashboard (app/blueprints/admin/routes.py:48)": 1})
+    return meta
+
+
+# endpoint -> fixtures -> (URL values, form data) for each POST; GETs that take
+# URL values get them from GET_VALUES, everything else is requested bare
+POSTS: Dict[str, Callable[[Fixtures], Tuple[dict, dict]]] = {
+    "admin.register": lambda fx: ({}, {
+        "full_name": "Guard Admin", "email": fx.email("admin"),
+        "password": SEED_PASSWORD, "confirm_password": SEED_PASSWORD,
+    }),
+    "admin.login": lambda fx: ({}, {"email": "admin@bench.example.com", "password": SEED_PASSWORD}),
+    "admin.approve_request": lambda fx: ({"request_id": fx.pending_request()}, {"item_id": fx.stock_id}),
+    "admin.hold_request": lambda fx: ({"request_id": fx.pending_request()}, {"item_id": fx.stock_id}),
+    "admin.release_hold": lambda fx: ({"request_id": fx.held_request()}, {}),
+    "admin.reject_request": lambda fx: ({"request_id": fx.pending_request()}, {}),
+    "admin.manual_assignment": lambda fx: ({}, {"staff_id": fx.staff_id, "item_id": fx.stock_id}),
+    "admin.complete_return": lambda fx: ({"assignment_id": fx.assignment("return_requested")}, {}),
+    "admin.inventory_create": lambda fx: ({}, ITEM_FORM),
+    "admin.inventory_edit": lambda fx: ({"item_id": fx.spare_item()}, ITEM_FORM),
+    "admin.inventory_delete": lambda fx: ({"item_id": fx.spare_item()}, {}),
+    "admin.profile_trigger": lambda fx: ({}, {"endpoint": "admin.requests_queue", "minutes": "1"}),
+    "admin.profile_stop": lambda fx: ({}, {}),
+    "admin.profiles_clear": lambda fx: ({}, {}),
+    "staff.submit_request": lambda fx: ({}, REQUEST_FORM),
+    "staff.submit_feedback": lambda fx: ({}, FEEDBACK_FORM),
+    "staff.request_return": lambda fx: ({"assignment_id": fx.assignment()}, {}),
+    "staff.register": lambda fx: ({}, {
+        "full_name": "Guard Staff", "department": "IT", "email": fx.email("staff"),
+        "password": SEED_PASSWORD, "confirm_password": SEED_PASSWORD,
+    }),
+    "staff.login": lambda fx: ({}, {"email": fx.staff_email, "password": SEED_PASSWORD}),
+}
+GET_VALUES: Dict[str, Callable[[Fixtures], dict]] = {
+    "admin.inventory_edit": lambda fx: {"item_id": fx.item_id},
+    "api.inventory_detail": lambda fx: {"item_id": fx.item_id},
+    "admin.profile_download": lambda fx: {"profile_id": _stored_profile()["id"], "fmt": "speedscope"},
+    "admin.profile_endpoint_download": lambda fx: {"name": _stored_profile()["endpoint"], "fmt": "collapsed"},
+}
+# Logging out ends the session, so these get a freshly logged-in client each call
+LOGOUTS = {"admin.logout": "admin", "staff.logout": "staff"}
+# Requested with a session cookie, these must not read or write the session store
+UNTOUCHED = ("api.inventory_list", "api.request_list")
+
+
+def _routes(app) -> List[Tuple[str, str, str]]:
+    """(endpoint, method, rule) for every GET/POST of the guarded blueprints"""
+    routes = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split(".", 1)[0] not in BLUEPRINTS:
+            continue
+        for method in sorted(rule.methods & {"GET", "POST"}):
+            routes.append((rule.endpoint, method, rule.rule))
+    return sorted(routes)
+
+
+class Probe:
+    """Logged-in clients and the per-route request builder for one database state"""
+
+    def __init__(self, app, counter: QueryCounter):
+        self.app = app
+        self.counter = counter
+        with app.app_context():
+            self.fx = Fixtures()
+        self.clients = {
+            "admin": _login(app, "admin", "admin@bench.example.com"),
+            "staff": _login(app, "staff", self.fx.staff_email),
+            "public": app.test_client(),
+        }
+
+    def _client(self, endpoint: str):
+        if endpoint in LOGOUTS:
+            role = LOGOUTS[endpoint]
+            email = "admin@bench.example.com" if role == "admin" else self.fx.staff_email
+            return _login(self.app, role, email)
+        if endpoint.endswith((".login", ".register")):
+            return self.app.test_client()  # a login would leave a shared client signed in
+        return self.clients.get(endpoint.split(".", 1)[0], self.clients["public"])
+
+    def count(self, endpoint: str, method: str) -> int:
+        """Statements run by one request to the route (the second of two, so caches are warm)"""
+        from flask import url_for
+
+        executed = None
+        for _ in range(2):
+            with self.app.app_context():
+                if method == "POST":
+                    values, data = POSTS[endpoint](self.fx)
+                else:
+                    values, data = GET_VALUES.get(endpoint, lambda fx: {})(self.fx), None
+                db.session.remove()
+            with self.app.test_request_context():
+                url = url_for(endpoint, **values)
+            client = self._client(endpoint)
+            headers = API_HEADERS if endpoint.startswith("api.") else None
+            with self.counter.counting() as executed:
+                response = client.open(url, method=method, data=data, headers=headers)
+                response.get_data()  # streamed pages query while the body is generated
+                response.close()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}")
+        return executed[0]
+
+
+def profile(app, counter: QueryCounter) -> Dict[str, Dict]:
+    """{"METHOD endpoint": {"queries": n} or {"error": ...}} for every guarded route"""
+    probe = Probe(app, counter)
+    results = {}
+    for endpoint, method, rule in _routes(app):
+        name = f"{method} {endpoint}"
+        if method == "POST" and endpoint not in POSTS:
+            results[name] = {"error": f"no form data for POST {rule}; add it to POSTS"}
+            continue
+        try:
+            results[name] = {"queries": probe.count(endpoint, method)}
+        except Exception as e:  # report every broken route, not just the first
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+class CountingSessionStore(SqlSessionStore):
+    """The database session store, recording each call made to it"""
+
+    def __init__(self):
+        super().__init__(lambda: db.engine, create_table=True)
+        self.calls: List[str] = []
+
+    def load(self, *args):
+        self.calls.append("load")
+        return super().load(*args)
+
+    def add(self, *args):
+        self.calls.append("add")
+        return super().add(*args)
+
+    def save(self, *args):
+        self.calls.append("save")
+        return super().save(*args)
+
+    def touch(self, *args):
+        self.calls.append("touch")
+        return super().touch(*args)
+
+    def delete(self, *args):
+        self.calls.append("delete")
+        return super().delete(*args)
+
+
+def session_io(app) -> List[str]:
+    """Failures for UNTOUCHED routes that reached the session store"""
+    from flask import url_for
+
+    store = CountingSessionStore()
+    previous = app.session_interface
+    app.session_interface = ServerSessionInterface(store, timedelta(hours=1))
+    try:
+        with app.app_context():
+            client = _login(app, "staff", Fixtures().staff_email)
+        failures = []
+        for endpoint in UNTOUCHED:
+            with app.test_request_context():
+                url = url_for(endpoint)
+            store.calls.clear()
+            client.get(url, headers=API_HEADERS).close()
+            if store.calls:
+                failures.append(f"GET {endpoint}: session store {', '.join(store.calls)} on an untouched request")
+        return failures
+    finally:
+        app.session_interface = previous
+
+
+def run(app, counter: QueryCounter, sizes=SIZES) -> Dict:
+    """
+    Reset the database, then seed and profile each size in turn
+    A route regresses when its count rises between sizes or it could not be requested
+    """
+    with app.app_context():
+        db.drop_all()
+    runs, rows = {}, {}
+    for size in sizes:
+        with app.app_context():
+            rows[size] = seed(size)
+            db.session.remove()
+        runs[size] = profile(app, counter)
+
+    first, last = runs[sizes[0]], runs[sizes[-1]]
+    routes, failures = {}, []
+    for name in sorted(first):
+        counts = {size: runs[size][name].get("queries") for size in sizes}
+        errors = [runs[size][name]["error"] for size in sizes if "error" in runs[size][name]]
+        routes[name] = {"queries": counts}
+        if errors:
+            routes[name]["error"] = errors[0]
+            failures.append(f"{name}: {errors[0]}")
+        elif last[name]["queries"] > first[name]["queries"]:
+            failures.append(
+                f"{name}: {first[name]['queries']} -> {last[name]['queries']} queries "
+                f"as the data grows ({sizes[0]} -> {sizes[-1]})"
+            )
+    failures.extend(session_io(app))
+    return {"sizes": dict(zip(sizes, (rows[size] for size in sizes))), "routes": routes, "failures": failures}
@@ -0,0 +1,106 @@
+"""JSON report assembly and regression comparison against a stored baseline."""
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# Metric -> True when a larger value is worse
+METRICS = {
+    "p50_ms": True,
+    "p99_ms": True,
+    "ops_per_sec": False,
+    "queries_per_op": True,
+}
+# Statement counts are deterministic, so any increase is a regression
+EXACT = {"queries_per_op"}
+# System section: result -> metrics, all of which are worse when larger
+SYSTEM_METRICS = {
+    "import_time": ("total_ms",),
+    "startup": ("import_ms", "create_app_ms", "max_rss_mb"),
+    "gunicorn_boot": ("ready_s", "rss_mb"),
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build(sections: Dict[str, Dict], **meta) -> Dict:
+    return {
+        "meta": {
+            "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            **meta,
+        },
+        **sections,
+    }
+
+
+def write(report: Dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True, default=str) + "\n")
+
+
+def load(path: Path) -> Dict:
+    return json.loads(path.read_text())
+
+
+def _results(report: Dict, section: str) -> Dict[str, Dict]:
+    if section == "system":
+        return {name: report.get("system", {}).get(name, {}) for name in SYSTEM_METRICS}
+    return report.get(section, {}).get("results", {})
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """
+    Regressions between matching results in the micro, load and system sections
+    Timings, throughput and memory may drift by `tolerance` (0.2 = 20%) before they count
+    """
+    regressions = []
+    for section in ("micro", "load", "system"):
+        current, previous = _results(report, section), _results(baseline, section)
+        for name, result in current.items():
+            before = previous.get(name)
+            if not before:
+                continue
+            metrics = (
+                {metric: True for metric in SYSTEM_METRICS[name]} if section == "system" else METRICS
+            )
+            for metric, higher_is_worse in metrics.items():
+                new, old = result.get(metric), before.get(metric)
+                if new is None or old is None:
+                    continue
+                allowed = 0.0 if metric in EXACT else tolerance
+                if higher_is_worse:
+                    worse = new > old * (1 + allowed) and new - old > 1e-9
+                else:
+                    worse = new < old * (1 - allowed)
+                if worse:
+                    regressions.append({
+                        "section": section, "name": name, "metric": metric,
+                        "baseline": old, "current": new,
+                        "change": round((new - old) / old, 3) if old else None,
+                    })
+    return regressions
+
+
+def format_regressions(regressions: List[Dict]) -> str:
+    lines = []
+    for entry in regressions:
+        change = f"{entry['change']:+.0%}" if entry["change"] is not None else "new"
+        lines.append(
+            f"  {entry['section']}: {entry['name']} {entry['metric']} "
+            f"{entry['baseline']} -> {entry['current']} ({change})"
+        )
+    return "\n".join(lines)
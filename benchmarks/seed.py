@@ -0,0 +1,177 @@
+"""Deterministic data seeder for the benchmark database.
+
+Rows are bulk-inserted with Core ``insert()`` in chunks, so a ``large`` seed
+(10k items, 10k pending requests) takes seconds rather than minutes. Every
+user's password is ``SEED_PASSWORD``.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import (
+    AdminUser,
+    AuditAction,
+    AuditEntity,
+    AuditEvent,
+    Feedback,
+    InventoryItem,
+    ItemAssignment,
+    ItemRequest,
+    StaffUser,
+)
+
+SEED_PASSWORD = "benchmark"
+CHUNK = 2000
+
+# staff, items, pending requests, closed requests, assignments, feedback
+SCALES = {
+    "tiny": dict(staff=5, items=20, pending=5, closed=20, assignments=10, feedback=5),
+    "small": dict(staff=50, items=200, pending=100, closed=1_000, assignments=500, feedback=100),
+    "medium": dict(staff=500, items=2_000, pending=1_000, closed=20_000, assignments=5_000, feedback=1_000),
+    "large": dict(staff=2_000, items=10_000, pending=10_000, closed=100_000, assignments=30_000, feedback=5_000),
+}
+
+DEPARTMENTS = ("IT", "Operations", "Finance", "HR", "Other")
+CATALOGUE = {
+    "Laptops": ("ThinkPad T14", "MacBook Pro 14", "Dell Latitude 5440", "HP EliteBook 840"),
+    "Monitors": ("Dell U2723QE", "LG 27UP850", "Samsung S80A", "BenQ PD2705U"),
+    "Peripherals": ("Logitech MX Keys", "MX Master 3S", "USB-C Dock", "Webcam C920"),
+    "Phones": ("iPhone 15", "Pixel 8", "Galaxy S23", "Yubikey 5C"),
+    "Furniture": ("Standing desk", "Ergonomic chair", "Monitor arm", "Footrest"),
+    "Networking": ("Travel router", "Ethernet adapter", "4G hotspot", "PoE switch"),
+}
+REQUEST_PHRASES = ("laptop", "new monitor", "mx keys", "dock", "standing desk", "headset", "iphone", "webcam")
+
+
+def _chunks(rows, size=CHUNK):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _insert(model, rows) -> None:
+    for chunk in _chunks(rows):
+        db.session.execute(insert(model), chunk)
+
+
+def _next_id(model) -> int:
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def seed(scale: str = "small", seed_value: int = 1) -> dict:
+    """Append one scale's worth of rows to the bound database and return the counts"""
+    sizes = SCALES[scale]
+    rng = random.Random(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+    password_hash = generate_password_hash(SEED_PASSWORD)
+
+    def past(days: int) -> datetime:
+        return now - timedelta(days=rng.uniform(0, days))
+
+    db.create_all()
+    run = _next_id(StaffUser)
+
+    if not db.session.scalar(select(AdminUser.id).where(AdminUser.email == "admin@bench.example.com")):
+        _insert(AdminUser, [{
+            "full_name": "Bench Admin", "email": "admin@bench.example.com", "password_hash": password_hash,
+            "created_at": now, "updated_at": now,
+        }])
+
+    _insert(StaffUser, [
+        {
+            "full_name": f"Staff {run + i}",
+            "email": f"staff{run + i}@bench.example.com",
+            "department": rng.choice(DEPARTMENTS),
+            "password_hash": password_hash,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(sizes["staff"])
+    ])
+    staff = db.session.execute(
+        select(StaffUser.id).where(StaffUser.id >= run)
+    ).scalars().all()
+
+    first_item = _next_id(InventoryItem)
+    items = []
+    for i in range(sizes["items"]):
+        category = rng.choice(list(CATALOGUE))
+        model = rng.choice(CATALOGUE[category])
+        created = past(720)
+        items.append({
+            "name": f"{model} #{first_item + i}",
+            "category": category,
+            "quantity_available": rng.choice((0, 1, 2, 3, 5, 8, 13, 20)),
+            "quantity_reserved": 0,
+            "purchase_date": (created - timedelta(days=rng.randint(0, 1500))).date(),
+            "price": round(rng.uniform(20, 2500), 2),
+            "created_at": created,
+            "updated_at": created,
+        })
+    _insert(InventoryItem, items)
+    item_ids = list(range(first_item, first_item + len(items)))
+
+    def request_row(status: str, days: int) -> dict:
+        created = past(days)
+        return {
+            "staff_id": rng.choice(staff),
+            "item_name": rng.choice(REQUEST_PHRASES),
+            "justification": "Needed for day-to-day work on the team.",
+            "status": status,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    _insert(ItemRequest, [request_row("pending", 14) for _ in range(sizes["pending"])])
+    _insert(ItemRequest, [
+        request_row(rng.choice(("approved", "approved", "rejected")), 365) for _ in range(sizes["closed"])
+    ])
+
+    first_assignment = _next_id(ItemAssignment)
+    assignments = []
+    for _ in range(sizes["assignments"]):
+        allocated = past(365)
+        status = rng.choice(("returned", "returned", "assigned", "return_requested"))
+        returned = allocated + timedelta(days=rng.randint(1, 120)) if status == "returned" else None
+        if returned and returned > now:
+            returned, status = None, "assigned"
+        assignments.append({
+            "item_id": rng.choice(item_ids),
+            "staff_id": rng.choice(staff),
+            "allocation_date": allocated.date(),
+            "return_date": returned.date() if returned else None,
+            "status": status,
+            "created_at": allocated,
+            "updated_at": returned or allocated,
+        })
+    _insert(ItemAssignment, assignments)
+    _insert(AuditEvent, [
+        {
+            "ts": row["created_at"],
+            "entity": int(AuditEntity.ASSIGNMENT),
+            "entity_id": first_assignment + i,
+            "action": int(AuditAction.ASSIGNMENT_CREATED),
+            "staff_id": row["staff_id"],
+            "item_id": row["item_id"],
+        }
+        for i, row in enumerate(assignments)
+    ])
+
+    _insert(Feedback, [
+        {
+            "staff_id": rng.choice(staff),
+            "rating": rng.randint(1, 5),
+            "question_1": "Assigning devices was quick.",
+            "question_2": "Stock levels were clear.",
+            "question_3": "Approval took about a day.",
+            "question_4": "Returns were straightforward.",
+            "question_5": "",
+            "created_at": past(180),
+            "updated_at": now,
+        }
+        for _ in range(sizes["feedback"])
+    ])
+    db.session.commit()
+    return {name: count for name, count in sizes.items()}
@@ -0,0 +1,156 @@
+"""Process-level measurements: import time, app start-up and memory, gunicorn boot."""
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_STARTUP_SNIPPET = """
+import json, resource, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+built = time.perf_counter()
+print(json.dumps({
+    "import_ms": round((imported - start) * 1e3, 1),
+    "create_app_ms": round((built - imported) * 1e3, 1),
+    "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+}))
+"""
+
+
+def _python(args: List[str], env: Dict[str, str] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env={**os.environ, **(env or {})},
+        capture_output=True, text=True, check=True,
+    )
+
+
+_STARTUP = "from app import create_app; create_app()"
+
+
+def _import_profile() -> Dict:
+    lines = _python(["-X", "importtime", "-c", _STARTUP]).stderr.splitlines()
+    total_ms, app_ms, modules = 0.0, 0.0, []
+    for line in lines:
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        depth, name, ms = (len(match.group(3)) - 1) // 2, match.group(4), int(match.group(2)) / 1e3
+        if depth == 0:
+            # Top-level entries do not overlap: `import app` and whatever create_app() imports lazily
+            total_ms += ms
+            if name == "app":
+                app_ms = ms
+        if depth <= 2 and name != "app":
+            modules.append((name, ms))
+    return {"total_ms": total_ms, "app_ms": app_ms, "modules": modules}
+
+
+def import_time(top: int = 10, runs: int = 3) -> Dict:
+    """
+    `python -X importtime` over create_app(): the time start-up spends importing
+    (`import app` plus the factory's lazy imports) and the slowest modules up to
+    two levels deep (flask, sqlalchemy, app.models...); best of `runs`
+    """
+    profile = min((_import_profile() for _ in range(runs)), key=lambda sample: sample["total_ms"])
+    slowest = sorted(profile["modules"], key=lambda entry: -entry[1])[:top]
+    return {
+        "total_ms": round(profile["total_ms"], 1),
+        "import_app_ms": round(profile["app_ms"], 1),
+        "slowest": [{"module": name, "ms": round(ms, 1)} for name, ms in slowest],
+    }
+
+
+def startup(runs: int = 3) -> Dict:
+    """Fresh-process import and create_app() time, and peak RSS; best of `runs`"""
+    samples = [json.loads(_python(["-c", _STARTUP_SNIPPET]).stdout) for _ in range(runs)]
+    return {key: min(sample[key] for sample in samples) for key in samples[0]}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _tree_rss_mb(pid: int) -> float:
+    """Resident memory of a process and its children, from /proc (Linux only)"""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+            total_kb += int(re.search(r"VmRSS:\s+(\d+)", status).group(1))
+            for task in Path(f"/proc/{current}/task").iterdir():
+                pending.extend(int(child) for child in (task / "children").read_text().split())
+        except (OSError, AttributeError):
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def gunicorn_boot(workers: int = 2, timeout: float = 60.0) -> Dict:
+    """Seconds until a fresh gunicorn answers /, and the RSS of master plus workers"""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(workers),
+    }
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "run:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                return {"error": f"gunicorn exited with {process.returncode}"}
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).close()
+                break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        else:
+            return {"error": f"no response within {timeout:.0f}s"}
+        ready = time.perf_counter() - start
+        time.sleep(0.5)  # let every worker finish booting before sampling memory
+        return {"workers": workers, "ready_s": round(ready, 2), "rss_mb": _tree_rss_mb(process.pid)}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def over_budget(results: Dict, import_budget_ms: float) -> List[str]:
+    """Messages for start-up import time above the budget"""
+    total = results.get("import_time", {}).get("total_ms")
+    if import_budget_ms is None or total is None or total <= import_budget_ms:
+        return []
+    return [f"create_app() imports took {total}ms, over the {import_budget_ms:g}ms budget"]
+
+
+def run(gunicorn: bool = False) -> Dict:
+    results = {"import_time": import_time(), "startup": startup()}
+    if gunicorn:
+        try:
+            import gunicorn as _gunicorn  # noqa: F401
+        except ImportError:
+            results["gunicorn_boot"] = {"skipped": "gunicorn is not installed"}
+        else:
+            results["gunicorn_boot"] = gunicorn_boot()
+    return results
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -16,6 +17,13 @@ if ENV_PATH.exists():
 # ------------------------------------------------------
 FLASK_ENV = os.getenv("FLASK_ENV", "development")
 
+
+def parse_name_map(raw: str, cast=int) -> dict:
+    """Parse "IT=2,Finance=1" into {"IT": 2, "Finance": 1}"""
+    pairs = (entry.split("=", 1) for entry in (raw or "").split(",") if "=" in entry)
+    return {name.strip(): cast(value) for name, value in pairs if name.strip()}
+
+
 # ------------------------------------------------------
 # CONFIG CLASS
 # ------------------------------------------------------
@@ -35,8 +43,9 @@ class Config:
     MYSQL_PORT = os.getenv("MYSQL_PORT", DEFAULT_PORT)
     MYSQL_DB = os.getenv("MYSQL_DB", DEFAULT_DB)
 
-    # Build the final DB URI
-    SQLALCHEMY_DATABASE_URI = (
+    # Build the final DB URI; DATABASE_URL (any SQLAlchemy URL, e.g.
+    # sqlite:///bench.db for the benchmarks suite) takes precedence
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL") or (
         f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}"
         f"@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
     )
@@ -44,9 +53,144 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
 
+    # JSON API (/api/v1): comma separated bearer tokens for integrations
+    API_TOKENS = frozenset(
+        token.strip() for token in os.getenv("API_TOKENS", "").split(",") if token.strip()
+    )
+    API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "50"))
+    API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+    # Optional ASGI read path (asgi.py); defaults to the sync URI with an async driver
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI")
+    ASYNC_ENGINE_OPTIONS = {"pool_pre_ping": True}
+    ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", "10"))
+
+    # Stock holds placed from the request queue lapse after this long
+    RESERVATION_TTL_MINUTES = int(os.getenv("RESERVATION_TTL_MINUTES", "30"))
+
+    # Request-to-item suggestions in the request queue (trigram similarity)
+    MATCH_SUGGESTIONS = int(os.getenv("MATCH_SUGGESTIONS", "3"))
+    MATCH_MIN_SCORE = float(os.getenv("MATCH_MIN_SCORE", "0.15"))
+    MATCH_CATEGORY_WEIGHT = float(os.getenv("MATCH_CATEGORY_WEIGHT", "0.25"))
+
+    # Batch auto-allocation: department priority (higher first), per-run quotas,
+    # and how many matched items each request may fall back through
+    ALLOCATION_PRIORITIES = parse_name_map(os.getenv("ALLOCATION_PRIORITIES", ""))
+    ALLOCATION_QUOTAS = parse_name_map(os.getenv("ALLOCATION_QUOTAS", ""))
+    ALLOCATION_CANDIDATES = int(os.getenv("ALLOCATION_CANDIDATES", "5"))
+
+    # Low-stock alerts: threshold for items and categories without their own,
+    # and how many open alerts the reports page lists
+    LOW_STOCK_DEFAULT_THRESHOLD = int(os.getenv("LOW_STOCK_DEFAULT_THRESHOLD", "3"))
+    LOW_STOCK_REPORT_LIMIT = int(os.getenv("LOW_STOCK_REPORT_LIMIT", "50"))
+
+    # Utilization report: default window, and days written per snapshot transaction
+    UTILIZATION_WINDOW_DAYS = int(os.getenv("UTILIZATION_WINDOW_DAYS", "90"))
+    UTILIZATION_SNAPSHOT_CHUNK_DAYS = int(os.getenv("UTILIZATION_SNAPSHOT_CHUNK_DAYS", "31"))
+
+    # Demand forecast: weeks of request history fitted, weeks of demand to cover,
+    # smoothing factor, moving-average window and safety-stock z (1.65 ~ 95% service)
+    FORECAST_HISTORY_WEEKS = int(os.getenv("FORECAST_HISTORY_WEEKS", "26"))
+    FORECAST_HORIZON_WEEKS = int(os.getenv("FORECAST_HORIZON_WEEKS", "4"))
+    FORECAST_SMOOTHING_ALPHA = float(os.getenv("FORECAST_SMOOTHING_ALPHA", "0.3"))
+    FORECAST_MOVING_AVERAGE_WEEKS = int(os.getenv("FORECAST_MOVING_AVERAGE_WEEKS", "4"))
+    FORECAST_SERVICE_Z = float(os.getenv("FORECAST_SERVICE_Z", "1.65"))
+    FORECAST_REPORT_LIMIT = int(os.getenv("FORECAST_REPORT_LIMIT", "20"))
+
+    # Valuation report: useful life in years, overridable per category ("Laptops=3,Furniture=7")
+    DEPRECIATION_USEFUL_LIFE_YEARS = float(os.getenv("DEPRECIATION_USEFUL_LIFE_YEARS", "4"))
+    DEPRECIATION_CATEGORY_LIFE = parse_name_map(os.getenv("DEPRECIATION_CATEGORY_LIFE", ""), float)
+    # A cached report is rebuilt after this long even if the change signature
+    # still matches (it misses edits stamped within the same second)
+    VALUATION_CACHE_SECONDS = float(os.getenv("VALUATION_CACHE_SECONDS", "60"))
+
+    # Compiled Jinja templates are cached here across workers and restarts
+    JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR")
+    # Large admin tables are streamed: characters per write and rows per DB fetch
+    TEMPLATE_STREAM_BUFFER_SIZE = int(os.getenv("TEMPLATE_STREAM_BUFFER_SIZE", "16384"))
+    STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "500"))
+
+    # /static is answered by WSGI middleware ahead of Flask; fingerprinted files
+    # from `flask assets build` are immutable, the rest are cached for STATIC_MAX_AGE
+    STATIC_FILES_MIDDLEWARE = os.getenv("STATIC_FILES_MIDDLEWARE", "true").lower() == "true"
+    STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+    # Response compression middleware (brotli when installed, else gzip)
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+    # Opt-in sampling profiler (sync/gthread workers): profiles a fraction of
+    # requests, any request sent with "X-Profile: <PROFILE_TOKEN>", and endpoints
+    # switched on from /admin/profiles. Profiles stay on the pod, in PROFILE_DIR.
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_MIN_DURATION_MS = float(os.getenv("PROFILE_MIN_DURATION_MS", "0"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "profiles"))
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+    PROFILE_REPORT_LIMIT = int(os.getenv("PROFILE_REPORT_LIMIT", "50"))
+
+    # Logging: one JSON line per record on stdout, written by a background
+    # thread. LOG_SAMPLING keeps a fraction of INFO records per logger, e.g.
+    # "app.access=0.1"; warnings and errors are always kept.
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records beyond this are dropped
+    LOG_SAMPLING = parse_name_map(os.getenv("LOG_SAMPLING", ""), cast=float)
+
+    # Request tracing: a span per request, service/repository call and SQL
+    # statement for TRACE_SAMPLE_RATE of requests (and any whose traceparent is
+    # sampled), written as OTLP/JSON to TRACE_EXPORT, a file path or an OTLP/HTTP
+    # URL such as http://otel-collector:4318/v1/traces.
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    TRACE_EXPORT = os.getenv("TRACE_EXPORT", os.path.join(tempfile.gettempdir(), "traces.jsonl"))
+    TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "inventory-app")
+    TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "4096"))  # finished spans beyond this are dropped
+    TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+    TRACE_FLUSH_SECONDS = float(os.getenv("TRACE_FLUSH_SECONDS", "5"))
+    TRACE_FILE_MAX_MB = int(os.getenv("TRACE_FILE_MAX_MB", "100"))
+
+    # Token-bucket limits on POSTs, as "<endpoint>:<ip|account>=<count>/<period>".
+    # Logins are limited per email, staff writes per signed-in user. Buckets are
+    # per worker with "memory"; a redis:// URL shares them across pods.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "memory")  # memory | fake | redis://host:6379/0
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # memory: buckets kept per worker
+    RATE_LIMITS = parse_name_map(os.getenv(
+        "RATE_LIMITS",
+        "admin.login:ip=60/minute,admin.login:account=10/minute,"
+        "staff.login:ip=60/minute,staff.login:account=10/minute,"
+        "staff.submit_request:ip=120/minute,staff.submit_request:account=30/hour,"
+        "staff.submit_feedback:ip=120/minute,staff.submit_feedback:account=10/hour",
+    ), cast=str)
+
+    # Sessions: "cookie" keeps Flask's signed cookie; "database" (the app's
+    # database, shared by every pod) or a SQLAlchemy URL such as
+    # sqlite:////tmp/sessions.db keeps the data server-side behind a random id.
+    # Sessions that are not permanent expire after SESSION_IDLE_HOURS unused.
+    SESSION_STORE = os.getenv("SESSION_STORE", "cookie")
+    SESSION_IDLE_HOURS = float(os.getenv("SESSION_IDLE_HOURS", "12"))
+
+    # Gunicorn runtime profile (read by gunicorn.conf.py)
+    GUNICORN_BIND = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+    GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", "0"))  # 0 = derive from CPUs
+    GUNICORN_WORKER_CLASS = os.getenv("GUNICORN_WORKER_CLASS", "sync")  # sync | gthread | gevent
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "4"))
+    GUNICORN_PRELOAD = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+    GUNICORN_TIMEOUT = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+    # Longer than the AWS load balancer idle timeout (60 s) so it never reuses a closed socket
+    GUNICORN_KEEPALIVE = int(os.getenv("GUNICORN_KEEPALIVE", "65"))
+    GUNICORN_MAX_REQUESTS = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
 
 
 class ProductionConfig(Config):
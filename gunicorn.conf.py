@@ -0,0 +1,75 @@
+"""Gunicorn settings, driven by the GUNICORN_* values on Config.
+
+Usage: gunicorn --config gunicorn.conf.py run:app
+"""
+import gc
+import os
+import sys
+
+# Gunicorn loads this file before --chdir takes effect.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import get_config  # noqa: E402
+
+_config = get_config()
+
+
+def _available_cpus() -> int:
+    """CPUs this container may use: cgroup v2 quota, else scheduler affinity."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as fh:
+            quota, period = fh.read().split()
+        if quota != "max":
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def _default_workers(worker_class: str, cpus: int) -> int:
+    if worker_class == "gevent":
+        return cpus
+    if worker_class == "gthread":
+        return cpus + 1
+    return cpus * 2 + 1
+
+
+bind = _config.GUNICORN_BIND
+# gevent needs the gevent package and is best run with GUNICORN_PRELOAD=false,
+# since the workers monkey-patch only after fork.
+worker_class = _config.GUNICORN_WORKER_CLASS
+workers = _config.GUNICORN_WORKERS or _default_workers(worker_class, _available_cpus())
+if worker_class == "gthread":
+    threads = _config.GUNICORN_THREADS
+preload_app = _config.GUNICORN_PRELOAD
+timeout = _config.GUNICORN_TIMEOUT
+keepalive = _config.GUNICORN_KEEPALIVE
+max_requests = _config.GUNICORN_MAX_REQUESTS
+max_requests_jitter = _config.GUNICORN_MAX_REQUESTS_JITTER
+# Heartbeat files on tmpfs; Docker's overlay filesystem can stall workers.
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def when_ready(server):
+    if preload_app:
+        # Compile templates once in the master so every forked worker starts warm.
+        from app.templating import precompile_templates
+        from run import app as flask_app
+
+        precompile_templates(flask_app)
+        # Move the preloaded app into the permanent generation so the GC does
+        # not touch (and copy-on-write) those pages in every worker.
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    # Connections opened in the master must not be shared across workers.
+    from app.extensions import db
+    from run import app as flask_app
+
+    with flask_app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,31 @@
+"""server-side web sessions
+
+Revision ID: 2b7f4e9a1c65
+Revises: 9d4e6b2a8c13
+Create Date: 2026-10-19 18:42:10.527391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7f4e9a1c65'
+down_revision = '9d4e6b2a8c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('web_sessions',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_web_sessions_expires_at'), 'web_sessions', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_web_sessions_expires_at'), table_name='web_sessions')
+    op.drop_table('web_sessions')
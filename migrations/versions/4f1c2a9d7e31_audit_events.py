@@ -0,0 +1,51 @@
+"""audit events
+
+Revision ID: 4f1c2a9d7e31
+Revises: db3db46662cc
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9d7e31'
+down_revision = 'db3db46662cc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_mysql = op.get_bind().dialect.name == 'mysql'
+
+    op.create_table('audit_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('ts', sa.DateTime(), nullable=False),
+    sa.Column('entity', sa.SmallInteger(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.SmallInteger(), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('item_id', sa.Integer(), nullable=True),
+    # MySQL requires the partitioning column in every unique key.
+    sa.PrimaryKeyConstraint('id', 'ts') if is_mysql else sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_events_entity_ts', 'audit_events', ['entity', 'entity_id', 'ts'], unique=False)
+    op.create_index('ix_audit_events_staff_ts', 'audit_events', ['staff_id', 'ts'], unique=False)
+    op.create_index('ix_audit_events_item_ts', 'audit_events', ['item_id', 'ts'], unique=False)
+
+    if is_mysql:
+        # Start with a single catch-all partition; `flask audit partitions`
+        # splits it into monthly ranges ahead of time.
+        op.execute(
+            "ALTER TABLE audit_events PARTITION BY RANGE (TO_DAYS(ts)) "
+            "(PARTITION p_future VALUES LESS THAN MAXVALUE)"
+        )
+
+
+def downgrade():
+    op.drop_index('ix_audit_events_item_ts', table_name='audit_events')
+    op.drop_index('ix_audit_events_staff_ts', table_name='audit_events')
+    op.drop_index('ix_audit_events_entity_ts', table_name='audit_events')
+    op.drop_table('audit_events')
@@ -0,0 +1,33 @@
+"""daily utilization snapshots
+
+Revision ID: 5a3f8c1e9b47
+Revises: e7d2b94c1f60
+Create Date: 2026-10-19 15:12:37.220914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a3f8c1e9b47'
+down_revision = 'e7d2b94c1f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('utilization_snapshots',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('item_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('department', sa.String(length=120), nullable=False),
+    sa.Column('on_loan', sa.Integer(), nullable=False),
+    sa.Column('started', sa.Integer(), nullable=False),
+    sa.Column('returned', sa.Integer(), nullable=False),
+    sa.Column('returned_days', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'item_id', 'department')
+    )
+
+
+def downgrade():
+    op.drop_table('utilization_snapshots')
@@ -0,0 +1,61 @@
+"""archive tables for closed requests and returned assignments
+
+Revision ID: 8b6e0d3f5a72
+Revises: 4f1c2a9d7e31
+Create Date: 2026-10-19 10:02:11.540913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6e0d3f5a72'
+down_revision = '4f1c2a9d7e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('item_requests_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('item_name', sa.String(length=150), nullable=False),
+    sa.Column('justification', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff_users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_item_requests_archive_staff_id'), 'item_requests_archive', ['staff_id'], unique=False)
+    op.create_table('item_assignments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('allocation_date', sa.Date(), nullable=True),
+    sa.Column('return_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff_users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_item_assignments_archive_item_id'), 'item_assignments_archive', ['item_id'], unique=False)
+    op.create_index(op.f('ix_item_assignments_archive_staff_id'), 'item_assignments_archive', ['staff_id'], unique=False)
+    # The archive job selects closed rows by (status, updated_at).
+    op.create_index('ix_item_requests_status_updated_at', 'item_requests', ['status', 'updated_at'], unique=False)
+    op.create_index('ix_item_assignments_status_updated_at', 'item_assignments', ['status', 'updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_item_assignments_status_updated_at', table_name='item_assignments')
+    op.drop_index('ix_item_requests_status_updated_at', table_name='item_requests')
+    op.drop_index(op.f('ix_item_assignments_archive_staff_id'), table_name='item_assignments_archive')
+    op.drop_index(op.f('ix_item_assignments_archive_item_id'), table_name='item_assignments_archive')
+    op.drop_table('item_assignments_archive')
+    op.drop_index(op.f('ix_item_requests_archive_staff_id'), table_name='item_requests_archive')
+    op.drop_table('item_requests_archive')
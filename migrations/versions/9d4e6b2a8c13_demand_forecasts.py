@@ -0,0 +1,41 @@
+"""demand forecasts
+
+Revision ID: 9d4e6b2a8c13
+Revises: 5a3f8c1e9b47
+Create Date: 2026-10-19 16:03:52.418306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4e6b2a8c13'
+down_revision = '5a3f8c1e9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('demand_forecasts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=150), nullable=False),
+    sa.Column('category', sa.String(length=120), nullable=True),
+    sa.Column('item_id', sa.Integer(), nullable=True),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('weekly_forecast', sa.Float(), nullable=False),
+    sa.Column('demand', sa.Float(), nullable=False),
+    sa.Column('safety_stock', sa.Float(), nullable=False),
+    sa.Column('available', sa.Integer(), nullable=False),
+    sa.Column('reorder_quantity', sa.Integer(), nullable=False),
+    sa.Column('model', sa.String(length=20), nullable=False),
+    sa.Column('generated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_demand_forecasts_reorder_quantity', 'demand_forecasts', ['reorder_quantity'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_demand_forecasts_reorder_quantity', table_name='demand_forecasts')
+    op.drop_table('demand_forecasts')
@@ -0,0 +1,49 @@
+"""item reservations and reserved quantity
+
+Revision ID: c41e7a9b2d58
+Revises: 8b6e0d3f5a72
+Create Date: 2026-10-19 11:20:37.118254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a9b2d58'
+down_revision = '8b6e0d3f5a72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quantity_reserved', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('item_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ),
+    sa.ForeignKeyConstraint(['request_id'], ['item_requests.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_item_reservations_item_id'), 'item_reservations', ['item_id'], unique=False)
+    op.create_index(op.f('ix_item_reservations_request_id'), 'item_reservations', ['request_id'], unique=False)
+    op.create_index('ix_item_reservations_status_expires_at', 'item_reservations', ['status', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_item_reservations_status_expires_at', table_name='item_reservations')
+    op.drop_index(op.f('ix_item_reservations_request_id'), table_name='item_reservations')
+    op.drop_index(op.f('ix_item_reservations_item_id'), table_name='item_reservations')
+    op.drop_table('item_reservations')
+
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.drop_column('quantity_reserved')
@@ -0,0 +1,52 @@
+"""reorder thresholds and stock alerts
+
+Revision ID: e7d2b94c1f60
+Revises: c41e7a9b2d58
+Create Date: 2026-10-19 12:41:05.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7d2b94c1f60'
+down_revision = 'c41e7a9b2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('category_thresholds',
+    sa.Column('category', sa.String(length=120), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('category')
+    )
+    op.create_table('stock_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('opened_at', sa.DateTime(), nullable=False),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('notified_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stock_alerts_item_status', 'stock_alerts', ['item_id', 'status'], unique=False)
+    op.create_index('ix_stock_alerts_status_notified_at', 'stock_alerts', ['status', 'notified_at'], unique=False)
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reorder_threshold', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.drop_column('reorder_threshold')
+
+    op.drop_index('ix_stock_alerts_status_notified_at', table_name='stock_alerts')
+    op.drop_index('ix_stock_alerts_item_status', table_name='stock_alerts')
+    op.drop_table('stock_alerts')
+    op.drop_table('category_thresholds')